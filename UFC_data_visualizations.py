@@ -1,33 +1,34 @@
-import pandas as pd
+import argparse
+import hashlib
+import json
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from fighter_store import load_store, division_name
+from tracing import traced
 
 def preprocess_data(file_path):
     """
     Preprocess the data from the CSV file for visualization.
     """
-    df = pd.read_csv(file_path)
+    # Percentages are fractions and 'Outcome' maps fight results (Win = 1, Loss = 0)
+    store = load_store(os.path.dirname(file_path))
+    return store.frame(division_name(file_path))
 
-    # Process percentage columns (convert to numeric)
-    for col in ["Str. Acc.", "Str. Def.", "TD Acc.", "TD Def."]:
-        df[col] = df[col].str.rstrip('%').astype(float) / 100.0
 
-    # Add a new column to map fight outcomes for correlation analysis
-    df['Outcome'] = df['Last Fight Result'].apply(lambda x: 1 if x.startswith('W') else 0)
+# Bump when the chart code changes in a way the style settings below don't capture
+CHART_STYLE_VERSION = 1
+CHART_THEME = {"style": "whitegrid"}
+CORRELATION_COLUMNS = [
+    "Age", "Reach (in)", "SLpM", "Str. Acc.", "SApM",
+    "Str. Def.", "TD Avg.", "TD Acc.", "TD Def.", "Sub. Avg.", "Outcome"
+]
 
-    return df
 
-
-def create_charts(df, division_name):
-    """
-    Generate charts for important statistics and correlations.
-    """
-    output_folder = "charts"
-    os.makedirs(output_folder, exist_ok=True)
-
-    # Set style
-    sns.set_theme(style="whitegrid")
+@traced("strike_accuracy_histogram")
+def strike_accuracy_histogram(df, division_name, output_folder):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # 1. Histogram for Strike Accuracy
     plt.figure(figsize=(8, 6))
@@ -38,6 +39,12 @@ def create_charts(df, division_name):
     plt.savefig(os.path.join(output_folder, f"{division_name}_strike_accuracy_histogram.png"))
     plt.close()
 
+
+@traced("slpm_boxplot")
+def slpm_boxplot(df, division_name, output_folder):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # 2. Boxplot for Strikes Landed per Minute (SLpM)
     plt.figure(figsize=(8, 6))
     sns.boxplot(x=df["SLpM"], color="green")
@@ -46,6 +53,12 @@ def create_charts(df, division_name):
     plt.savefig(os.path.join(output_folder, f"{division_name}_slpm_boxplot.png"))
     plt.close()
 
+
+@traced("accuracy_vs_defense_scatter")
+def accuracy_vs_defense_scatter(df, division_name, output_folder):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # 3. Scatter plot: Strike Accuracy vs. Strike Defense with Fighter Names
     plt.figure(figsize=(10, 8))
     scatter = sns.scatterplot(
@@ -62,12 +75,17 @@ def create_charts(df, division_name):
     plt.ylabel("Strike Defense")
     plt.legend(title="Outcome", loc="upper left", labels=["Loss", "Win"])
 
-    # Add fighter names to the data points
-    for i, point in df.iterrows():
-        plt.text(
-            point["Str. Acc."],
-            point["Str. Def."],
-            point["Fighter Name"],
+    # Add fighter names to the data points. Matplotlib has no batched text
+    # artist, so this stays one Text per fighter on purpose: the chart is then
+    # pixel-identical to the original. Only the per-row Series of iterrows is
+    # avoided by reading the column arrays.
+    axes = plt.gca()
+    for x, y, name in zip(df["Str. Acc."].to_numpy(), df["Str. Def."].to_numpy(),
+                          df["Fighter Name"].to_numpy()):
+        axes.text(
+            x,
+            y,
+            name,
             fontsize=9,
             ha='right',  # horizontal alignment can be adjusted
             va='bottom'  # vertical alignment can be adjusted
@@ -76,22 +94,160 @@ def create_charts(df, division_name):
     plt.savefig(os.path.join(output_folder, f"{division_name}_accuracy_vs_defense_scatter.png"))
     plt.close()
 
+
+@traced("correlation_heatmap")
+def correlation_heatmap(df, division_name, output_folder):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # 4. Correlation heatmap
-    correlation_columns = [
-        "Age", "Reach (in)", "SLpM", "Str. Acc.", "SApM",
-        "Str. Def.", "TD Avg.", "TD Acc.", "TD Def.", "Sub. Avg.", "Outcome"
-    ]
-    corr_matrix = df[correlation_columns].corr()
+    corr_matrix = df[CORRELATION_COLUMNS].corr()
     plt.figure(figsize=(10, 8))
     sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
     plt.title(f"Correlation Heatmap - {division_name}")
     plt.savefig(os.path.join(output_folder, f"{division_name}_correlation_heatmap.png"))
     plt.close()
 
+
+# Chart name -> (renderer, output file suffix)
+CHARTS = {
+    "strike_accuracy_histogram": (strike_accuracy_histogram, "_strike_accuracy_histogram.png"),
+    "slpm_boxplot": (slpm_boxplot, "_slpm_boxplot.png"),
+    "accuracy_vs_defense_scatter": (accuracy_vs_defense_scatter, "_accuracy_vs_defense_scatter.png"),
+    "correlation_heatmap": (correlation_heatmap, "_correlation_heatmap.png"),
+}
+
+
+@traced("create_charts")
+def create_charts(df, division_name):
+    """
+    Generate charts for important statistics and correlations.
+    """
+    import seaborn as sns
+
+    output_folder = "charts"
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Set style
+    sns.set_theme(**CHART_THEME)
+
+    for render, _ in CHARTS.values():
+        render(df, division_name, output_folder)
+
     print(f"Charts for {division_name} saved to the '{output_folder}' folder.")
 
 
+def style_hash():
+    """
+    Hash everything besides the data that affects how a chart looks.
+    """
+    # Read the versions from package metadata so up-to-date runs skip the imports
+    style = {
+        "version": CHART_STYLE_VERSION,
+        "theme": CHART_THEME,
+        "correlation_columns": CORRELATION_COLUMNS,
+        "matplotlib": version("matplotlib"),
+        "seaborn": version("seaborn"),
+    }
+    return hashlib.sha1(json.dumps(style, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def render_chart(task):
+    """
+    Render one chart of one division on the non-interactive backend.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    folder, division, chart, output_folder = task
+    plt.switch_backend("Agg")
+    sns.set_theme(**CHART_THEME)
+    df = load_store(folder).frame(division)
+    render, _ = CHARTS[chart]
+    render(df, division, output_folder)
+    return division, chart
+
+
+def read_manifest(manifest_path):
+    """
+    Return the chart manifest (file name -> render key), or {} without one.
+    """
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remove_division_charts(division, output_folder="charts"):
+    """
+    Delete the charts of a division and their manifest entries.
+
+    Returns the names of the chart files that were deleted.
+    """
+    manifest_path = os.path.join(output_folder, "manifest.json")
+    manifest = read_manifest(manifest_path)
+    removed = []
+    for _, suffix in CHARTS.values():
+        file_name = f"{division}{suffix}"
+        manifest.pop(file_name, None)
+        path = os.path.join(output_folder, file_name)
+        if os.path.exists(path):
+            os.remove(path)
+            removed.append(file_name)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return removed
+
+
+@traced("render_all_divisions")
+def render_all_divisions(folder="ufc_stats", output_folder="charts", workers=None, force=False, divisions=None):
+    """
+    Render every chart of every division (or of the given divisions) in a process pool.
+
+    A chart is skipped when its division data and the chart style match the
+    entry recorded in the output folder's manifest.json. Returns the list of
+    (division, chart) pairs that were rendered.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = os.path.join(output_folder, "manifest.json")
+    manifest = read_manifest(manifest_path)
+
+    store = load_store(folder)
+    style = style_hash()
+    keys = {}
+    tasks = []
+    for division in store.divisions if divisions is None else divisions:
+        for chart, (_, suffix) in CHARTS.items():
+            file_name = f"{division}{suffix}"
+            keys[file_name] = hashlib.sha1(f"{store.division_hash(division)}:{chart}:{style}".encode("utf-8")).hexdigest()
+            up_to_date = manifest.get(file_name) == keys[file_name]
+            if force or not up_to_date or not os.path.exists(os.path.join(output_folder, file_name)):
+                tasks.append((folder, division, chart, output_folder))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        rendered = [render_chart(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_chart, tasks))
+
+    for division, chart in rendered:
+        file_name = f"{division}{CHARTS[chart][1]}"
+        manifest[file_name] = keys[file_name]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return rendered
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate charts for UFC divisions.")
+    parser.add_argument("--all", action="store_true", help="render every division without prompting")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --all")
+    parser.add_argument("--force", action="store_true", help="re-render charts even if they are up to date")
+    args = parser.parse_args()
+
     folder_path = "ufc_stats"
     if not os.path.exists(folder_path):
         print(f"The folder '{folder_path}' does not exist.")
@@ -102,6 +258,12 @@ def main():
         print(f"No division files found in the '{folder_path}' folder.")
         return
 
+    if args.all:
+        rendered = render_all_divisions(folder_path, workers=args.workers, force=args.force)
+        skipped = len(files) * len(CHARTS) - len(rendered)
+        print(f"Rendered {len(rendered)} chart(s), {skipped} already up to date, in the 'charts' folder.")
+        return
+
     print("Available divisions:")
     for i, file_name in enumerate(files):
         print(f"{i + 1}: {file_name}")
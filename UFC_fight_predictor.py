@@ -3,100 +3,137 @@
 # Date: 11/25/2024
 # Purpose: 
 import os
+import numpy as np
 import pandas as pd
+from fighter_store import load_store, format_value, frame_cache, CHAMPION_RANK, FEATURES
+from name_index import locate, resolve_name
+from ratings import load_ratings, with_ratings, RATING_COLUMNS
+from tracing import traced
 
 def load_division_data(folder):
     """
     Load all division data from the specified folder.
+
+    When the folder has a fight history, every division gets 'Elo' and
+    'Glicko' rating columns.
     """
-    division_files = [f for f in os.listdir(folder) if f.endswith('_top15.csv')]
-    divisions = {}
-    for file in division_files:
-        division_name = file.split('_top15.csv')[0].capitalize()
-        divisions[division_name] = pd.read_csv(os.path.join(folder, file))
-    return divisions
+    store = load_store(folder)
+    ratings = load_ratings(folder)
+    if ratings is None:
+        return {division_name: store.frame(division_name) for division_name in store.divisions}
+    return {division_name: with_ratings(store.frame(division_name), ratings) for division_name in store.divisions}
 
-def compare_fighters(division_data, fighter1, fighter2):
+# List of numerical columns to compare (the ratings only when present)
+NUMERIC_COLUMNS = [
+    'Rank', 'Age', 'Reach (in)', 'SLpM', 'Str. Acc.', 'SApM',
+    'Str. Def.', 'TD Avg.', 'TD Acc.', 'TD Def.', 'Sub. Avg.'
+] + RATING_COLUMNS
+
+# Metrics where the lower value is the advantage
+LOWER_IS_BETTER = ['Rank', 'Age']
+
+
+def advantage_matrix(division_data):
     """
-    Compare two fighters based on their statistics and count advantages.
+    Compare every pair of fighters in a division at once.
+
+    Returns (counts, wins, metrics): wins[i, j, m] is True when fighter i has
+    the advantage over fighter j in metrics[m], and counts[i, j] is the number
+    of advantages i holds over j. Rows follow the order of division_data.
+    When both fighters are champions neither holds the Rank advantage here;
+    pair_advantages gives it to the first fighter.
     """
-    # Extract fighters' data
-    f1_stats = division_data[division_data['Fighter Name'].str.lower() == fighter1.lower()]
-    f2_stats = division_data[division_data['Fighter Name'].str.lower() == fighter2.lower()]
+    return frame_cache(division_data, "advantage_matrix", _build_advantage_matrix)
 
-    if f1_stats.empty or f2_stats.empty:
-        return None, f"One or both fighters not found in the division."
 
-    f1_stats = f1_stats.iloc[0]
-    f2_stats = f2_stats.iloc[0]
+@traced("advantage_matrix")
+def _build_advantage_matrix(division_data):
+    metrics = [column for column in NUMERIC_COLUMNS if column in division_data.columns]
 
-    # List of numerical columns to compare
-    numeric_columns = [
-        'Rank', 'Age', 'Reach (in)', 'SLpM', 'Str. Acc.', 'SApM',
-        'Str. Def.', 'TD Avg.', 'TD Acc.', 'TD Def.', 'Sub. Avg.'
-    ]
+    # Flip the sign of lower-is-better metrics so every comparison is "greater wins"
+    signs = np.array([-1.0 if column in LOWER_IS_BETTER else 1.0 for column in metrics])
+    values = division_data[metrics].to_numpy(dtype=float) * signs
+    wins = values[:, None, :] > values[None, :, :]
 
-    advantages = {fighter1: 0, fighter2: 0}
-    advantage_categories = {fighter1: [], fighter2: []}
+    # A champion always takes the Rank advantage over a non-champion
+    if 'Rank' in metrics:
+        champion = division_data['Rank'].to_numpy() == CHAMPION_RANK
+        wins[:, :, metrics.index('Rank')] |= champion[:, None] & ~champion[None, :]
 
-    # Compare each metric
-    for column in numeric_columns:
-        if column in division_data.columns:
-            f1_value = f1_stats[column]
-            f2_value = f2_stats[column]
-
-            # Handle categorical rank values like "C" (Champion)
-            if column == 'Rank':
-                if f1_value == 'C':
-                    advantages[fighter1] += 1
-                    advantage_categories[fighter1].append(column)
-                elif f2_value == 'C':
-                    advantages[fighter2] += 1
-                    advantage_categories[fighter2].append(column)
-                else:
-                    # Convert rank to numeric for comparison (lower is better)
-                    f1_value = int(f1_value)
-                    f2_value = int(f2_value)
-                    if f1_value < f2_value:
-                        advantages[fighter1] += 1
-                        advantage_categories[fighter1].append(column)
-                    elif f2_value < f1_value:
-                        advantages[fighter2] += 1
-                        advantage_categories[fighter2].append(column)
-            # Handle Age (younger is better)
-            elif column == 'Age':
-                if f1_value < f2_value:
-                    advantages[fighter1] += 1
-                    advantage_categories[fighter1].append(column)
-                elif f2_value < f1_value:
-                    advantages[fighter2] += 1
-                    advantage_categories[fighter2].append(column)
-            # For all other metrics, higher is better
-            else:
-                try:
-                    f1_value = float(str(f1_value).replace('%', ''))
-                    f2_value = float(str(f2_value).replace('%', ''))
-                except ValueError:
-                    continue
-
-                if f1_value > f2_value:
-                    advantages[fighter1] += 1
-                    advantage_categories[fighter1].append(column)
-                elif f2_value > f1_value:
-                    advantages[fighter2] += 1
-                    advantage_categories[fighter2].append(column)
-
-    # Compare Last Fight Result
+    # A win against a loss in the last fight is one more advantage
     if 'Last Fight Result' in division_data.columns:
-        f1_result = f1_stats['Last Fight Result'].strip().lower()
-        f2_result = f2_stats['Last Fight Result'].strip().lower()
+        results = division_data['Last Fight Result'].str.strip().str.lower()
+        won = results.str.startswith('w').to_numpy(dtype=bool)
+        lost = results.str.startswith('l').to_numpy(dtype=bool)
+        wins = np.concatenate([wins, (won[:, None] & lost[None, :])[:, :, None]], axis=2)
+        metrics = metrics + ['Last Fight Result']
+
+    counts = wins.sum(axis=2)
+    return counts, wins, metrics
 
-        if f1_result.startswith('w') and f2_result.startswith('l'):
-            advantages[fighter1] += 1
-            advantage_categories[fighter1].append('Last Fight Result')
-        elif f1_result.startswith('l') and f2_result.startswith('w'):
-            advantages[fighter2] += 1
-            advantage_categories[fighter2].append('Last Fight Result')
+
+def pair_advantages(division_data, first, second):
+    """
+    Return (first_wins, second_wins, metrics) for fighters at row positions
+    `first` against `second` (scalars or arrays): the advantages each side
+    holds over the other, per metric.
+
+    When both fighters are champions the first one takes the Rank advantage.
+    """
+    _, wins, metrics = advantage_matrix(division_data)
+    first_wins = wins[first, second].copy()
+    second_wins = wins[second, first]
+    if 'Rank' in metrics:
+        champion = division_data['Rank'].to_numpy() == CHAMPION_RANK
+        first_wins[..., metrics.index('Rank')] |= champion[first] & champion[second]
+    return first_wins, second_wins, metrics
+
+
+def matchup_table(division_data):
+    """
+    List every possible matchup in a division with its advantage counts and predicted winner.
+    """
+    first, second = np.triu_indices(len(division_data), k=1)
+    names = division_data['Fighter Name'].to_numpy()
+    first_wins, second_wins, _ = pair_advantages(division_data, first, second)
+    f1_advantages = first_wins.sum(axis=1)
+    f2_advantages = second_wins.sum(axis=1)
+    winners = np.where(f1_advantages > f2_advantages, names[first],
+                       np.where(f2_advantages > f1_advantages, names[second], "Draw"))
+    return pd.DataFrame({
+        'Fighter 1': names[first],
+        'Fighter 2': names[second],
+        'Fighter 1 Advantages': f1_advantages,
+        'Fighter 2 Advantages': f2_advantages,
+        'Predicted Winner': winners,
+    })
+
+
+@traced("compare_fighters")
+def compare_fighters(division_data, fighter1, fighter2):
+    """
+    Compare two fighters based on their statistics and count advantages.
+    """
+    # Extract fighters' positions
+    f1_position = locate(division_data, fighter1)
+    f2_position = locate(division_data, fighter2)
+
+    if f1_position is None or f2_position is None:
+        return None, f"One or both fighters not found in the division."
+
+    f1_stats = division_data.iloc[f1_position]
+    f2_stats = division_data.iloc[f2_position]
+
+    # Look the pair up in the division's advantage matrix
+    f1_wins, f2_wins, metrics = pair_advantages(division_data, f1_position, f2_position)
+    advantages = {
+        fighter1: int(f1_wins.sum()),
+        fighter2: int(f2_wins.sum()),
+    }
+    advantage_categories = {
+        fighter1: [metric for metric, won in zip(metrics, f1_wins) if won],
+        fighter2: [metric for metric, won in zip(metrics, f2_wins) if won],
+    }
 
     # Predict the winner
     if advantages[fighter1] > advantages[fighter2]:
@@ -109,7 +146,7 @@ def compare_fighters(division_data, fighter1, fighter2):
     # Create a detailed comparison for console output
     comparison = {
         column: (f1_stats[column], f2_stats[column])
-        for column in numeric_columns if column in division_data.columns
+        for column in NUMERIC_COLUMNS if column in division_data.columns
     }
 
     # Include Last Fight Result in the comparison
@@ -118,6 +155,55 @@ def compare_fighters(division_data, fighter1, fighter2):
 
     return advantages, winner, comparison, advantage_categories
 
+
+@traced("compare_across_divisions")
+def compare_across_divisions(cross, fighter1, fighter2):
+    """
+    Compare two fighters from any divisions and count advantages.
+
+    Stats are compared on each fighter's percentile standing within their
+    own division (from the precomputed normalization tables of `cross`, see
+    cross_division.py), since raw values differ between weight classes.
+    Returns the same tuple as compare_fighters, with raw values in the comparison.
+    """
+    result = cross.matchup(fighter1, fighter2)
+    if result is None:
+        return None, "One or both fighters not found (or the name is ambiguous across divisions)."
+    first, second, _ = result
+
+    advantage_categories = {fighter1: [], fighter2: []}
+    # A champion always takes the Rank advantage, as the first fighter when both are champions
+    if first['Rank'] < second['Rank'] or first['Rank'] == CHAMPION_RANK:
+        advantage_categories[fighter1].append('Rank')
+    elif second['Rank'] < first['Rank'] or second['Rank'] == CHAMPION_RANK:
+        advantage_categories[fighter2].append('Rank')
+    for column, p1, p2 in zip(FEATURES, first['percentiles'], second['percentiles']):
+        if column in LOWER_IS_BETTER:
+            p1, p2 = -p1, -p2
+        if p1 > p2:
+            advantage_categories[fighter1].append(column)
+        elif p2 > p1:
+            advantage_categories[fighter2].append(column)
+    results = [first['Last Fight Result'].strip().lower()[:1], second['Last Fight Result'].strip().lower()[:1]]
+    if results == ['w', 'l']:
+        advantage_categories[fighter1].append('Last Fight Result')
+    elif results == ['l', 'w']:
+        advantage_categories[fighter2].append('Last Fight Result')
+
+    advantages = {fighter: len(categories) for fighter, categories in advantage_categories.items()}
+    if advantages[fighter1] > advantages[fighter2]:
+        winner = fighter1
+    elif advantages[fighter2] > advantages[fighter1]:
+        winner = fighter2
+    else:
+        winner = "Draw"
+
+    comparison = {'Division': (first['Division'], second['Division']), 'Rank': (first['Rank'], second['Rank'])}
+    for column in FEATURES:
+        comparison[column] = (first['values'][column], second['values'][column])
+    comparison['Last Fight Result'] = (first['Last Fight Result'], second['Last Fight Result'])
+    return advantages, winner, comparison, advantage_categories
+
 def main():
     folder = input("Enter the folder path containing division CSV files (e.g., ufc_stats): ").strip()
 
@@ -126,18 +212,31 @@ def main():
         return
 
     divisions = load_division_data(folder)
-    division_name = input(f"Enter the division (available: {', '.join(divisions.keys())}): ").capitalize()
+    division_name = input(f"Enter the division (available: {', '.join(divisions.keys())}, "
+                          f"or All to compare across divisions): ").capitalize()
 
-    if division_name not in divisions:
+    if division_name != "All" and division_name not in divisions:
         print("Division not found. Exiting.")
         return
 
-    division_data = divisions[division_name]
-
     fighter1 = input("Enter the first fighter's name: ").strip()
     fighter2 = input("Enter the second fighter's name: ").strip()
 
-    result = compare_fighters(division_data, fighter1, fighter2)
+    # Only exact or surname matches are used; show the full names they resolve to
+    if division_name == "All":
+        from cross_division import load_cross_division
+
+        cross = load_cross_division(load_store(folder))
+        fighter1, fighter2 = cross.store.name_index.resolve(fighter1), cross.store.name_index.resolve(fighter2)
+        if fighter1 is None or fighter2 is None:
+            return
+        result = compare_across_divisions(cross, fighter1, fighter2)
+    else:
+        division_data = divisions[division_name]
+        fighter1, fighter2 = resolve_name(division_data, fighter1), resolve_name(division_data, fighter2)
+        if fighter1 is None or fighter2 is None:
+            return
+        result = compare_fighters(division_data, fighter1, fighter2)
 
     if result[0] is None:
         print(result[1])  # Error message
@@ -155,7 +254,12 @@ def main():
             advantage = fighter1
         elif metric in advantage_categories[fighter2]:
             advantage = fighter2
-        print(f"{metric:<20}{str(f1_value):<20}{str(f2_value):<20}{advantage:<20}")
+        if metric in RATING_COLUMNS:
+            f1_value, f2_value = f"{f1_value:.0f}", f"{f2_value:.0f}"
+        else:
+            f1_value = format_value(metric, f1_value)
+            f2_value = format_value(metric, f2_value)
+        print(f"{metric:<20}{f1_value:<20}{f2_value:<20}{advantage:<20}")
 
     # Print results
     print("\nComparison Results:")
@@ -1,30 +1,38 @@
-import pandas as pd
 import os
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report
+import numpy as np
+import pandas as pd
+from fighter_store import load_store, division_name, FEATURES
+from name_index import locate, resolve_name
+from model_cache import load_or_fit
+from ratings import load_ratings, with_ratings, RATING_COLUMNS
+from tracing import span, traced
 
 
-def preprocess_data(file_path):
+def model_features(ratings=None):
     """
-    Preprocess the data from the CSV file for modeling.
+    Return the model features, with the rating columns when ratings are used.
+    """
+    return FEATURES + RATING_COLUMNS if ratings is not None else FEATURES
+
+
+@traced("preprocess_data")
+def preprocess_data(file_path, ratings=None):
     """
-    df = pd.read_csv(file_path)
+    Preprocess the data from the CSV file for modeling.
 
-    # Process percentage columns (convert to numeric)
-    for col in ["Str. Acc.", "Str. Def.", "TD Acc.", "TD Def."]:
-        df[col] = df[col].str.rstrip('%').astype(float) / 100.0
+    With a rating engine, the fighters' Elo and Glicko ratings are features too.
+    """
+    store = load_store(os.path.dirname(file_path))
+    df = store.frame(division_name(file_path))
+    if ratings is not None:
+        df = with_ratings(df, ratings)
 
     # Define features and target
-    features = [
-        "Age", "Reach (in)", "SLpM", "Str. Acc.", "SApM",
-        "Str. Def.", "TD Avg.", "TD Acc.", "TD Def.", "Sub. Avg."
-    ]
+    features = model_features(ratings)
     target = "Last Fight Result"
 
     # Map fight results to numerical values (Win = 1, Loss = 0)
-    df[target] = df[target].apply(lambda x: 1 if x.startswith('W') else 0)
+    df[target] = df["Outcome"]
 
     # Return features (X) and target (y)
     X = df[features]
@@ -33,12 +41,45 @@ def preprocess_data(file_path):
     return X, y, df
 
 
-def train_models(X, y):
+# Training configuration; part of the model cache key
+TEST_SIZE = 0.3
+SPLIT_RANDOM_STATE = 42
+RF_PARAMS = {"random_state": 42}
+GB_PARAMS = {"random_state": 42}
+
+
+def model_config(ratings=None):
     """
-    Train Random Forest and Gradient Boosting models.
+    Return the features and hyperparameters that define a trained model.
     """
+    config = {
+        "features": model_features(ratings),
+        "test_size": TEST_SIZE,
+        "split_random_state": SPLIT_RANDOM_STATE,
+        "rf_params": RF_PARAMS,
+        "gb_params": GB_PARAMS,
+    }
+    if ratings is not None:
+        # New fights change the rating features, so they retrain the models
+        config["ratings"] = ratings.fingerprint
+    return config
+
+
+@traced("fit_models")
+def fit_models(X, y):
+    """
+    Fit the scaler and both models, returning them with the evaluation report text.
+    """
+    # sklearn takes about a second to import; cached models don't need it up front
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import classification_report
+
     # Split data into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE
+    )
 
     # Standardize features
     scaler = StandardScaler()
@@ -46,76 +87,178 @@ def train_models(X, y):
     X_test_scaled = scaler.transform(X_test)
 
     # Train Random Forest
-    rf_model = RandomForestClassifier(random_state=42)
-    rf_model.fit(X_train_scaled, y_train)
+    rf_model = RandomForestClassifier(**RF_PARAMS)
+    with span("fit_random_forest"):
+        rf_model.fit(X_train_scaled, y_train)
     rf_preds = rf_model.predict(X_test_scaled)
 
     # Train Gradient Boosting
-    gb_model = GradientBoostingClassifier(random_state=42)
-    gb_model.fit(X_train_scaled, y_train)
+    gb_model = GradientBoostingClassifier(**GB_PARAMS)
+    with span("fit_gradient_boosting"):
+        gb_model.fit(X_train_scaled, y_train)
     gb_preds = gb_model.predict(X_test_scaled)
 
     # Evaluate both models
-    print("\nRandom Forest Model Performance:")
-    print(classification_report(y_test, rf_preds, target_names=["Loss", "Win"]))
+    report = (
+        "\nRandom Forest Model Performance:\n"
+        + classification_report(y_test, rf_preds, target_names=["Loss", "Win"])
+        + "\n\nGradient Boosting Model Performance:\n"
+        + classification_report(y_test, gb_preds, target_names=["Loss", "Win"])
+    )
+    return rf_model, gb_model, scaler, report
 
-    print("\nGradient Boosting Model Performance:")
-    print(classification_report(y_test, gb_preds, target_names=["Loss", "Win"]))
+
+def train_models(X, y):
+    """
+    Train Random Forest and Gradient Boosting models.
+    """
+    rf_model, gb_model, scaler, report = fit_models(X, y)
+    print(report)
 
     # Return trained models and scaler
     return rf_model, gb_model, scaler
 
 
-def predict_matchup_with_models(df, rf_model, gb_model, scaler, fighter1, fighter2):
+def load_or_train_models(file_path, X, y, ratings=None):
     """
-    Predict a matchup using trained models.
+    Load the models for a division file from the model cache, training them only
+    when the division data or the training configuration changed.
     """
-    features = [
-        "Age", "Reach (in)", "SLpM", "Str. Acc.", "SApM",
-        "Str. Def.", "TD Avg.", "TD Acc.", "TD Def.", "Sub. Avg."
-    ]
-
-    # Get data for the fighters
-    fighter1_data = df[df['Fighter Name'].str.lower() == fighter1.lower()]
-    fighter2_data = df[df['Fighter Name'].str.lower() == fighter2.lower()]
-
-    if fighter1_data.empty or fighter2_data.empty:
-        print(f"Error: One or both fighters not found in the division.")
-        return
+    store = load_store(os.path.dirname(file_path))
+    division = division_name(file_path)
+    entry = load_or_fit(store, division, model_config(ratings), lambda: fit_models(X, y))
+    print(entry["report"])
+    rf_model, gb_model, scaler = entry["models"]
+    return rf_model, gb_model, scaler
 
-    # Prepare data for prediction
-    fighter1_features = fighter1_data[features]
-    fighter2_features = fighter2_data[features]
 
-    # Standardize features
-    fighter1_scaled = scaler.transform(fighter1_features)
-    fighter2_scaled = scaler.transform(fighter2_features)
+def division_models(store, division):
+    """
+    Return (df, features, models) for a division, training the models on a miss.
 
-    # Calculate probabilities
-    fighter1_rf_prob = rf_model.predict_proba(fighter1_scaled)[0][1]
-    fighter2_rf_prob = rf_model.predict_proba(fighter2_scaled)[0][1]
+    The frame has the rating columns when the folder has a fight history, and
+    the models are the cached ones trained on those features.
+    """
+    ratings = load_ratings(store.folder)
+    df = store.frame(division)
+    if ratings is not None:
+        df = with_ratings(df, ratings)
+    features = model_features(ratings)
+    entry = load_or_fit(store, division, model_config(ratings),
+                        lambda: fit_models(df[features], df["Outcome"]))
+    return df, features, entry["models"]
+
+
+@traced("predict_matchups")
+def predict_matchups(df, rf_model, gb_model, scaler, matchups):
+    """
+    Predict a list of (fighter1, fighter2) matchups in one batch.
 
-    fighter1_gb_prob = gb_model.predict_proba(fighter1_scaled)[0][1]
-    fighter2_gb_prob = gb_model.predict_proba(fighter2_scaled)[0][1]
+    Every fighter that appears in the list is scaled and scored once per model.
+    Returns a DataFrame with one row per matchup holding each model's
+    normalized win percentages; 'Found' is False (and the percentages NaN)
+    when either fighter is not in the division.
+    """
+    # The features the scaler was fitted on (with or without the ratings)
+    features = list(getattr(scaler, "feature_names_in_", FEATURES))
+    matchups = list(matchups)
+
+    # Resolve every name to a row position (-1 when not found)
+    positions = np.array([
+        [-1 if position is None else position for position in (locate(df, f1), locate(df, f2))]
+        for f1, f2 in matchups
+    ], dtype=np.int64).reshape(-1, 2)
+    found = (positions >= 0).all(axis=1)
+
+    # Stack the unique fighters into one matrix, scale once, predict once per model
+    unique_positions, pair_rows = np.unique(positions[found], return_inverse=True)
+    pair_rows = pair_rows.reshape(-1, 2)
+    probabilities = {}
+    if len(unique_positions):
+        scaled = scaler.transform(df.iloc[unique_positions][features].astype(float))
+        probabilities["RF"] = rf_model.predict_proba(scaled)[:, 1]
+        probabilities["GB"] = gb_model.predict_proba(scaled)[:, 1]
+
+    results = pd.DataFrame({
+        "Fighter 1": [f1 for f1, _ in matchups],
+        "Fighter 2": [f2 for _, f2 in matchups],
+        "Found": found,
+    })
+    for model in ("RF", "GB"):
+        fighter1_win = np.full(len(matchups), np.nan)
+        fighter2_win = np.full(len(matchups), np.nan)
+        if model in probabilities:
+            # Normalize the two win probabilities of each pair into percentages
+            pair_probs = probabilities[model][pair_rows]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pair_wins = pair_probs / pair_probs.sum(axis=1, keepdims=True) * 100
+            fighter1_win[found] = pair_wins[:, 0]
+            fighter2_win[found] = pair_wins[:, 1]
+        results[f"{model} Fighter 1 Win (%)"] = fighter1_win
+        results[f"{model} Fighter 2 Win (%)"] = fighter2_win
+    return results
 
-    # Normalize and calculate percentages
-    rf_total = fighter1_rf_prob + fighter2_rf_prob
-    gb_total = fighter1_gb_prob + fighter2_gb_prob
 
-    fighter1_rf_win = (fighter1_rf_prob / rf_total) * 100
-    fighter2_rf_win = (fighter2_rf_prob / rf_total) * 100
+def predict_matchup_with_models(df, rf_model, gb_model, scaler, fighter1, fighter2):
+    """
+    Predict a matchup using trained models.
+    """
+    prediction = predict_matchups(df, rf_model, gb_model, scaler, [(fighter1, fighter2)]).iloc[0]
 
-    fighter1_gb_win = (fighter1_gb_prob / gb_total) * 100
-    fighter2_gb_win = (fighter2_gb_prob / gb_total) * 100
+    if not prediction["Found"]:
+        print(f"Error: One or both fighters not found in the division.")
+        return
 
     # Display results
     print("\nMatchup Prediction:")
     print(f"Using Random Forest:")
-    print(f"  {fighter1}: {fighter1_rf_win:.2f}% chance of winning")
-    print(f"  {fighter2}: {fighter2_rf_win:.2f}% chance of winning")
+    print(f"  {fighter1}: {prediction['RF Fighter 1 Win (%)']:.2f}% chance of winning")
+    print(f"  {fighter2}: {prediction['RF Fighter 2 Win (%)']:.2f}% chance of winning")
     print(f"\nUsing Gradient Boosting:")
-    print(f"  {fighter1}: {fighter1_gb_win:.2f}% chance of winning")
-    print(f"  {fighter2}: {fighter2_gb_win:.2f}% chance of winning")
+    print(f"  {fighter1}: {prediction['GB Fighter 1 Win (%)']:.2f}% chance of winning")
+    print(f"  {fighter2}: {prediction['GB Fighter 2 Win (%)']:.2f}% chance of winning")
+
+
+@traced("predict_matchup_across_divisions")
+def predict_matchup_across_divisions(cross, fighter1, fighter2):
+    """
+    Predict a matchup between fighters of any divisions.
+
+    Both fighters' stats are mapped to the scale of each fighter's division
+    through the normalization tables of `cross` (see cross_division.py) and
+    scored with that division's models; the normalized win percentages are
+    averaged over those divisions. Returns {model: (fighter1 %, fighter2 %)},
+    or None if a fighter is not found.
+    """
+    result = cross.matchup(fighter1, fighter2)
+    if result is None:
+        print(f"Error: One or both fighters not found (or the name is ambiguous across divisions).")
+        return None
+    first, second, references = result
+
+    store = cross.store
+    ratings = load_ratings(store.folder)
+    if ratings is not None:
+        # Ratings come from the fight history and need no translation
+        fighter_ratings = np.column_stack(ratings.lookup([first["Fighter Name"], second["Fighter Name"]]))
+    wins = {"RF": [], "GB": []}
+    for division, (values1, values2) in references.items():
+        _, features, (rf_model, gb_model, scaler) = division_models(store, division)
+        values = np.array([values1, values2])
+        if ratings is not None:
+            values = np.column_stack([values, fighter_ratings])
+        scaled = scaler.transform(pd.DataFrame(values, columns=features))
+        for model_name, model in (("RF", rf_model), ("GB", gb_model)):
+            probabilities = model.predict_proba(scaled)[:, 1]
+            wins[model_name].append(probabilities[0] / probabilities.sum() * 100)
+    chances = {model_name: (float(np.mean(values)), 100 - float(np.mean(values))) for model_name, values in wins.items()}
+
+    print(f"\nMatchup Prediction ({first['Division']} vs {second['Division']}):")
+    for label, model_name in (("Random Forest", "RF"), ("Gradient Boosting", "GB")):
+        print(f"Using {label}:")
+        print(f"  {fighter1}: {chances[model_name][0]:.2f}% chance of winning")
+        print(f"  {fighter2}: {chances[model_name][1]:.2f}% chance of winning")
+    return chances
 
 
 def main():
@@ -132,6 +275,7 @@ def main():
 
     # Display available files
     print("Available divisions:")
+    print("0: All divisions (cross-division matchups)")
     for i, file_name in enumerate(files):
         print(f"{i + 1}: {file_name}")
 
@@ -139,21 +283,42 @@ def main():
     while True:
         try:
             choice = int(input("Enter the number of the division you want to analyze: "))
-            if 1 <= choice <= len(files):
-                selected_file = files[choice - 1]
+            if 0 <= choice <= len(files):
                 break
             else:
-                print(f"Please select a number between 1 and {len(files)}.")
+                print(f"Please select a number between 0 and {len(files)}.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
+    if choice == 0:
+        from cross_division import load_cross_division
+
+        cross = load_cross_division(load_store(folder_path))
+        while True:
+            print("\nEnter the names of two fighters from any divisions (or type 'exit' to quit):")
+            fighter1 = input("Fighter 1: ").strip()
+            if fighter1.lower() == 'exit':
+                break
+            fighter2 = input("Fighter 2: ").strip()
+            if fighter2.lower() == 'exit':
+                break
+            # Only exact or surname matches are used; show the full names they resolve to
+            fighter1, fighter2 = cross.store.name_index.resolve(fighter1), cross.store.name_index.resolve(fighter2)
+            if fighter1 is not None and fighter2 is not None:
+                predict_matchup_across_divisions(cross, fighter1, fighter2)
+        return
+
     # Process the selected file
+    selected_file = files[choice - 1]
     file_path = os.path.join(folder_path, selected_file)
     print(f"\nAnalyzing {selected_file}...")
-    X, y, df = preprocess_data(file_path)
+    ratings = load_ratings(folder_path)
+    if ratings is not None:
+        print(f"Using Elo and Glicko ratings from {ratings.recorded} recorded fights.")
+    X, y, df = preprocess_data(file_path, ratings)
 
-    # Train models
-    rf_model, gb_model, scaler = train_models(X, y)
+    # Load the cached models, training them if needed
+    rf_model, gb_model, scaler = load_or_train_models(file_path, X, y, ratings)
 
     # Predict a hypothetical fight between two fighters
     while True:
@@ -165,7 +330,10 @@ def main():
         if fighter2.lower() == 'exit':
             break
 
-        predict_matchup_with_models(df, rf_model, gb_model, scaler, fighter1, fighter2)
+        # Only exact or surname matches are used; show the full names they resolve to
+        fighter1, fighter2 = resolve_name(df, fighter1), resolve_name(df, fighter2)
+        if fighter1 is not None and fighter2 is not None:
+            predict_matchup_with_models(df, rf_model, gb_model, scaler, fighter1, fighter2)
 
 
 if __name__ == "__main__":
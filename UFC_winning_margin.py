@@ -1,42 +1,41 @@
-import pandas as pd
+import argparse
 import os
-
-
-def calculate_winning_chance(file_path):
-    # Define weights for the metrics
-    weights = {
-        "Age": -0.1,  # Negative weight for age (younger fighters preferred)
-        "Reach (in)": 0.2,
-        "SLpM": 0.3,  # Strikes landed per minute
-        "Str. Acc.": 0.2,  # Strike accuracy
-        "SApM": -0.2,  # Strikes absorbed per minute (lower is better)
-        "Str. Def.": 0.2,  # Strike defense
-        "TD Avg.": 0.2,  # Takedown average
-        "TD Acc.": 0.15,  # Takedown accuracy
-        "TD Def.": 0.2,  # Takedown defense
-        "Sub. Avg.": 0.1  # Submission average
-    }
-
-    # Load CSV file
-    df = pd.read_csv(file_path)
-
-    # Process percentage columns (convert to numeric)
-    for col in ["Str. Acc.", "Str. Def.", "TD Acc.", "TD Def."]:
-        df[col] = df[col].str.rstrip('%').astype(float) / 100.0
-
+import numpy as np
+from fighter_store import load_store, division_name, formatted, FEATURES
+from name_index import find_fighter, resolve_name
+from tracing import traced
+
+
+# Define weights for the metrics
+WEIGHTS = {
+    "Age": -0.1,  # Negative weight for age (younger fighters preferred)
+    "Reach (in)": 0.2,
+    "SLpM": 0.3,  # Strikes landed per minute
+    "Str. Acc.": 0.2,  # Strike accuracy
+    "SApM": -0.2,  # Strikes absorbed per minute (lower is better)
+    "Str. Def.": 0.2,  # Strike defense
+    "TD Avg.": 0.2,  # Takedown average
+    "TD Acc.": 0.15,  # Takedown accuracy
+    "TD Def.": 0.2,  # Takedown defense
+    "Sub. Avg.": 0.1  # Submission average
+}
+
+
+def weight_vector(weights=WEIGHTS):
+    """
+    Return the weights as an array in FEATURES order.
+    """
+    return np.array([weights[column] for column in FEATURES], dtype=float)
+
+
+@traced("score_division")
+def score_division(df, weights=WEIGHTS):
+    """
+    Add 'Performance Score' and 'Winning Chance (%)' to a division frame,
+    sorted by winning chance.
+    """
     # Initialize performance score
-    df['Performance Score'] = (
-            weights["Age"] * df["Age"] +
-            weights["Reach (in)"] * df["Reach (in)"] +
-            weights["SLpM"] * df["SLpM"] +
-            weights["Str. Acc."] * df["Str. Acc."] +
-            weights["SApM"] * df["SApM"] +
-            weights["Str. Def."] * df["Str. Def."] +
-            weights["TD Avg."] * df["TD Avg."] +
-            weights["TD Acc."] * df["TD Acc."] +
-            weights["TD Def."] * df["TD Def."] +
-            weights["Sub. Avg."] * df["Sub. Avg."]
-    )
+    df['Performance Score'] = df[FEATURES].to_numpy(dtype=float) @ weight_vector(weights)
 
     # Normalize scores to calculate winning chances
     max_score = df['Performance Score'].max()
@@ -45,36 +44,98 @@ def calculate_winning_chance(file_path):
                 max_score - min_score)) * 99 + 1  # Ensures no 0%
 
     # Sort by winning chance for display
-    df = df.sort_values(by="Winning Chance (%)", ascending=False)
+    return df.sort_values(by="Winning Chance (%)", ascending=False)
+
+
+@traced("calculate_winning_chance")
+def calculate_winning_chance(file_path, weights=WEIGHTS):
+    # Load the division from the fighter store (percentages are already fractions)
+    store = load_store(os.path.dirname(file_path))
+    df = score_division(store.frame(division_name(file_path)), weights)
 
     print("\nDivision Analysis (Sorted by Winning Chance):")
-    print(df[["Rank", "Fighter Name", "Winning Chance (%)"]])
+    print(formatted(df[["Rank", "Fighter Name", "Winning Chance (%)"]]))
     return df
 
 
-def predict_matchup(df, fighter1, fighter2):
+def win_chances(score1, score2, learned=False):
+    """
+    Return both fighters' winning chances (%) from their Performance Scores.
+
+    Hand-picked weights give positive scores and use the score ratio. Learned
+    weights can give negative scores, so there the score difference is the
+    win logit the weights were fitted on: sigmoid(score1 - score2).
+    """
+    if learned:
+        fighter1_chance = 100 / (1 + np.exp(score2 - score1))
+        return fighter1_chance, 100 - fighter1_chance
+    total_score = score1 + score2
+    return (score1 / total_score) * 100, (score2 / total_score) * 100
+
+
+@traced("predict_matchup")
+def predict_matchup(df, fighter1, fighter2, learned=False):
     # Get the performance scores for the two fighters
-    fighter1_data = df[df['Fighter Name'].str.lower() == fighter1.lower()]
-    fighter2_data = df[df['Fighter Name'].str.lower() == fighter2.lower()]
+    fighter1_data = find_fighter(df, fighter1)
+    fighter2_data = find_fighter(df, fighter2)
 
-    if fighter1_data.empty or fighter2_data.empty:
+    if fighter1_data is None or fighter2_data is None:
         print(f"Error: One or both fighters not found in the division.")
-        return
+        return None
 
-    fighter1_score = fighter1_data['Performance Score'].values[0]
-    fighter2_score = fighter2_data['Performance Score'].values[0]
+    fighter1_score = fighter1_data['Performance Score']
+    fighter2_score = fighter2_data['Performance Score']
 
     # Calculate winning chances for each fighter
-    total_score = fighter1_score + fighter2_score
-    fighter1_chance = (fighter1_score / total_score) * 100
-    fighter2_chance = (fighter2_score / total_score) * 100
+    fighter1_chance, fighter2_chance = win_chances(fighter1_score, fighter2_score, learned)
 
     print(f"\nHypothetical Fight Prediction:")
     print(f"{fighter1}: {fighter1_chance:.2f}% chance of winning")
     print(f"{fighter2}: {fighter2_chance:.2f}% chance of winning")
+    return fighter1_chance, fighter2_chance
+
+
+@traced("predict_matchup_across_divisions")
+def predict_matchup_across_divisions(cross, fighter1, fighter2, weights=WEIGHTS, learned=None):
+    """
+    Predict a matchup between fighters of any divisions.
+
+    Both fighters' stats are mapped to the scale of each fighter's division
+    through the normalization tables of `cross` (see cross_division.py) and
+    scored there; the winning chances are averaged over those divisions.
+    With learned ('pairwise' or 'logistic'), each division is scored with its
+    own learned weights instead of `weights`, as win_chances does for them.
+    Returns the two chances in percent, or None if a fighter is not found.
+    """
+    result = cross.matchup(fighter1, fighter2)
+    if result is None:
+        print(f"Error: One or both fighters not found (or the name is ambiguous across divisions).")
+        return None
+    first, second, references = result
+
+    chances = []
+    for division, (values1, values2) in references.items():
+        if learned:
+            from weight_fit import learned_weights
+            w = weight_vector(learned_weights(cross.store, division, learned))
+        else:
+            w = weight_vector(weights)
+        chances.append(win_chances(values1 @ w, values2 @ w, bool(learned))[0])
+    fighter1_chance = float(np.mean(chances))
+    fighter2_chance = 100 - fighter1_chance
+
+    print(f"\nHypothetical Fight Prediction ({first['Division']} vs {second['Division']}):")
+    print(f"{fighter1}: {fighter1_chance:.2f}% chance of winning")
+    print(f"{fighter2}: {fighter2_chance:.2f}% chance of winning")
+    return fighter1_chance, fighter2_chance
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Weighted-score division analysis and matchup prediction.")
+    parser.add_argument("--learned", choices=["pairwise", "logistic"],
+                        help="use weights learned from fight outcomes instead of the hand-picked ones")
+    args = parser.parse_args()
+
     # List available files in the ufc_stats folder
     folder_path = "ufc_stats"
     if not os.path.exists(folder_path):
@@ -88,6 +149,7 @@ def main():
 
     # Display available files
     print("Available divisions:")
+    print("0: All divisions (cross-division matchups)")
     for i, file_name in enumerate(files):
         print(f"{i + 1}: {file_name}")
 
@@ -95,18 +157,27 @@ def main():
     while True:
         try:
             choice = int(input("Enter the number of the division you want to analyze: "))
-            if 1 <= choice <= len(files):
-                selected_file = files[choice - 1]
+            if 0 <= choice <= len(files):
                 break
             else:
-                print(f"Please select a number between 1 and {len(files)}.")
+                print(f"Please select a number between 0 and {len(files)}.")
         except ValueError:
             print("Invalid input. Please enter a number.")
 
-    # Process the selected file
-    file_path = os.path.join(folder_path, selected_file)
-    print(f"\nAnalyzing {selected_file}...")
-    df = calculate_winning_chance(file_path)
+    if choice == 0:
+        from cross_division import load_cross_division
+
+        cross = load_cross_division(load_store(folder_path))
+    else:
+        # Process the selected file
+        selected_file = files[choice - 1]
+        file_path = os.path.join(folder_path, selected_file)
+        print(f"\nAnalyzing {selected_file}...")
+        weights = WEIGHTS
+        if args.learned:
+            from weight_fit import learned_weights
+            weights = learned_weights(load_store(folder_path), division_name(selected_file), args.learned)
+        df = calculate_winning_chance(file_path, weights)
 
     # Predict a hypothetical fight between two fighters
     while True:
@@ -118,7 +189,15 @@ def main():
         if fighter2.lower() == 'exit':
             break
 
-        predict_matchup(df, fighter1, fighter2)
+        # Only exact or surname matches are used; show the full names they resolve to
+        if choice == 0:
+            fighter1, fighter2 = cross.store.name_index.resolve(fighter1), cross.store.name_index.resolve(fighter2)
+            if fighter1 is not None and fighter2 is not None:
+                predict_matchup_across_divisions(cross, fighter1, fighter2, learned=args.learned)
+        else:
+            fighter1, fighter2 = resolve_name(df, fighter1), resolve_name(df, fighter2)
+            if fighter1 is not None and fighter2 is not None:
+                predict_matchup(df, fighter1, fighter2, learned=bool(args.learned))
 
 
 if __name__ == "__main__":
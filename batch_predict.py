@@ -0,0 +1,127 @@
+import argparse
+import json
+import sys
+from itertools import islice
+
+from prediction_service import PredictionService
+
+ENGINES = ["advantage", "weighted", "ml"]
+
+
+def division_key(division):
+    """
+    Normalize a division name the way the interactive tools do (e.g. 'light heavyweight').
+    """
+    return str(division).strip().replace(" ", "_").replace("-", "_").capitalize()
+
+
+def iter_records(lines):
+    """
+    Parse JSONL matchup records lazily.
+
+    Yields (line_number, record, error); blank lines are skipped and error is
+    None for valid records.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Line is not valid JSON."
+            continue
+        if not isinstance(record, dict) or not all(record.get(k) for k in ("division", "fighter1", "fighter2")):
+            yield line_number, record, "Expected 'division', 'fighter1' and 'fighter2'."
+            continue
+        yield line_number, record, None
+
+
+def iter_batches(iterable, size):
+    """
+    Yield lists of at most `size` consecutive items.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def predict_stream(service, lines, engines=ENGINES, batch_size=256):
+    """
+    Yield one result dict per matchup record, in input order.
+
+    Records are read and scored batch_size at a time, so memory does not
+    grow with the length of the input.
+    """
+    handlers = {
+        "advantage": service.score_advantage,
+        "weighted": service.score_weighted,
+        "ml": service.score_ml,
+    }
+    for batch in iter_batches(iter_records(lines), batch_size):
+        items = [
+            {
+                "division": division_key(record["division"]),
+                "fighter1": str(record["fighter1"]),
+                "fighter2": str(record["fighter2"]),
+            }
+            for _, record, error in batch if error is None
+        ]
+        scored = {engine: iter(handlers[engine](items)) for engine in engines}
+
+        for line_number, record, error in batch:
+            result = {"line": line_number}
+            if isinstance(record, dict):
+                result.update({key: record.get(key) for key in ("division", "fighter1", "fighter2")})
+            if error is not None:
+                result["error"] = error
+                yield result
+                continue
+            for engine in engines:
+                engine_result = dict(next(scored[engine]))
+                if engine_result.pop("status", 200) != 200:
+                    engine_result = {"error": engine_result["error"]}
+                result[engine] = engine_result
+            yield result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Predict matchups from JSONL records ({\"division\", \"fighter1\", \"fighter2\"} per line)."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file to read ('-' for stdin)")
+    parser.add_argument("--output", default="-", help="JSONL file to write ('-' for stdout)")
+    parser.add_argument("--engines", default="advantage,weighted,ml",
+                        help="comma-separated engines to run (advantage, weighted, ml)")
+    parser.add_argument("--batch-size", type=int, default=256, help="matchups scored per batch")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    args = parser.parse_args()
+
+    engines = [engine.strip() for engine in args.engines.split(",") if engine.strip()]
+    unknown = [engine for engine in engines if engine not in ENGINES]
+    if unknown or not engines:
+        parser.error(f"unknown engine(s): {', '.join(unknown) or '(none)'}; choose from {', '.join(ENGINES)}")
+
+    service = PredictionService(args.folder, load_models="ml" in engines)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for number, result in enumerate(predict_stream(service, source, engines, args.batch_size), start=1):
+            target.write(json.dumps(result) + "\n")
+            # Results of a finished batch are written out right away
+            if number % args.batch_size == 0:
+                target.flush()
+        target.flush()
+    except BrokenPipeError:
+        pass
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == "__main__":
+    main()
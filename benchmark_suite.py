@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+import fighter_store
+from fighter_store import load_store, division_name, CACHE_FOLDER
+from synthetic_roster import generate_roster
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+# Matchups per compare / predict stage (sklearn predictions are ~10 ms each)
+COMPARE_MATCHUPS = 1000
+PREDICT_MATCHUPS = 100
+
+
+def _fresh_store(context):
+    # Drop the in-process store so the cached columns are read again
+    fighter_store._loaded_stores.clear()
+    return load_store(context["folder"])
+
+
+def _matchups(context, count):
+    store = load_store(context["folder"])
+    names = np.asarray(store.column("Fighter Name", context["division"]))
+    rng = np.random.default_rng(0)
+    return [tuple(names[rng.choice(len(names), 2, replace=False)]) for _ in range(count)]
+
+
+def stage_load_cold(context):
+    shutil.rmtree(os.path.join(context["folder"], CACHE_FOLDER), ignore_errors=True)
+    from loadData import load_ufc_data
+
+    fighter_store._loaded_stores.clear()
+    return len(load_ufc_data(context["folder"]))
+
+
+def stage_load_warm(context):
+    from loadData import load_ufc_data
+
+    fighter_store._loaded_stores.clear()
+    return len(load_ufc_data(context["folder"]))
+
+
+def stage_preprocess(context):
+    from UFC_non_linear_predictor import preprocess_data
+
+    _fresh_store(context)
+    X, y, df = preprocess_data(context["file"])
+    return len(df)
+
+
+def stage_compare(context):
+    from UFC_fight_predictor import compare_fighters
+
+    # A new frame, so the advantage matrix is built inside the timed call
+    df = _fresh_store(context).frame(context["division"])
+    for fighter1, fighter2 in context["matchups"]:
+        compare_fighters(df, fighter1, fighter2)
+    return len(context["matchups"])
+
+
+def stage_winning_chance(context):
+    from UFC_winning_margin import calculate_winning_chance
+
+    _fresh_store(context)
+    return len(calculate_winning_chance(context["file"]))
+
+
+def stage_train(context):
+    from UFC_non_linear_predictor import preprocess_data, train_models
+
+    X, y, df = preprocess_data(context["file"])
+    context["models"] = train_models(X, y)
+    return len(df)
+
+
+def stage_predict(context):
+    from UFC_non_linear_predictor import preprocess_data, predict_matchup_with_models
+
+    if "models" not in context:
+        stage_train(context)
+    X, y, df = preprocess_data(context["file"])
+    matchups = context["matchups"][:PREDICT_MATCHUPS]
+    for fighter1, fighter2 in matchups:
+        predict_matchup_with_models(df, *context["models"], fighter1, fighter2)
+    return len(matchups)
+
+
+def stage_charts(context):
+    from UFC_data_visualizations import preprocess_data, create_charts
+
+    df = preprocess_data(context["file"])
+    # create_charts writes to ./charts; keep synthetic charts out of the project
+    cwd = os.getcwd()
+    os.chdir(context["workdir"])
+    try:
+        create_charts(df, context["division"])
+    finally:
+        os.chdir(cwd)
+    return len(df)
+
+
+# (stage name, function, unit of the items it returns)
+STAGES = [
+    ("load_ufc_data (cold)", stage_load_cold, "rows"),
+    ("load_ufc_data (warm)", stage_load_warm, "rows"),
+    ("preprocess_data", stage_preprocess, "rows"),
+    ("compare_fighters", stage_compare, "matchups"),
+    ("calculate_winning_chance", stage_winning_chance, "rows"),
+    ("train_models", stage_train, "rows"),
+    ("predict_matchup_with_models", stage_predict, "matchups"),
+    ("create_charts", stage_charts, "rows"),
+]
+
+
+def run_stage(function, context, repeats):
+    """
+    Time a stage (best of `repeats`, output silenced), then run it once more
+    under tracemalloc for its peak memory.
+
+    Returns (items, seconds, peak_bytes).
+    """
+    times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            items = function(context)
+            times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            function(context)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return items, min(times), peak
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeats=3, stages=None, workdir=None, seed=42, log=print):
+    """
+    Generate a synthetic roster for each size and time every stage on it.
+
+    Per-division stages use the first division. Returns a list of result dicts.
+    """
+    selected = [stage for stage in STAGES if stages is None or stage[0].split(" ")[0] in stages]
+    results = []
+    for rows in sizes:
+        folder = tempfile.mkdtemp(prefix=f"roster_{rows}_", dir=workdir)
+        try:
+            start = time.perf_counter()
+            paths = generate_roster(os.path.join(folder, "ufc_stats"), rows, seed)
+            log(f"{rows} rows: generated {len(paths)} division files in {time.perf_counter() - start:.1f} s")
+
+            context = {
+                "workdir": folder,
+                "folder": os.path.join(folder, "ufc_stats"),
+                "file": paths[0],
+                "division": division_name(paths[0]),
+            }
+            load_store(context["folder"])
+            context["matchups"] = _matchups(context, COMPARE_MATCHUPS)
+
+            for name, function, unit in selected:
+                items, seconds, peak = run_stage(function, context, repeats)
+                results.append({
+                    "rows": rows,
+                    "stage": name,
+                    "items": items,
+                    "unit": unit,
+                    "seconds": seconds,
+                    "throughput": items / seconds if seconds else None,
+                    "peak_mb": peak / 2 ** 20,
+                })
+                log(f"  {name:<30}{seconds * 1000:>12.2f} ms{items / seconds:>14.0f} {unit}/s"
+                    f"{peak / 2 ** 20:>10.1f} MB")
+        finally:
+            fighter_store._loaded_stores.clear()
+            shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def environment():
+    """
+    Describe the commit and library versions a benchmark ran on.
+    """
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare_results(old, new):
+    """
+    Join two result files on (rows, stage) with the time ratio new / old.
+    """
+    columns = ["rows", "stage", "seconds", "peak_mb"]
+    joined = pd.DataFrame(old["results"])[columns].merge(
+        pd.DataFrame(new["results"])[columns], on=["rows", "stage"], suffixes=(" old", " new"))
+    joined["time ratio"] = joined["seconds new"] / joined["seconds old"]
+    return joined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the loaders, predictors and charts on synthetic rosters.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="roster sizes in rows")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per stage (best is reported)")
+    parser.add_argument("--stages", nargs="+", help="only run these stages (e.g. load_ufc_data train_models)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--workdir", help="folder for the generated rosters (default: system temp)")
+    args = parser.parse_args()
+
+    report = {"environment": environment(), "results": run_benchmarks(args.sizes, args.repeats, args.stages,
+                                                                     args.workdir)}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to '{args.output}'.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        pd.set_option("display.width", 200)
+        print(compare_results(old, report).to_string(index=False, float_format="{:.4g}".format))
+
+
+if __name__ == "__main__":
+    main()
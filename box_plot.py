@@ -1,13 +1,30 @@
-import matplotlib.pyplot as plt
+from loadData import partition_divisions
+from plot_output import new_figure, show_or_render
 
-def plot_box(data, metric, division=None):
-    filtered_data = data if division is None else data[data["Division"] == division]
+def plot_box(data, metric, division=None, headless=False, image_format="png"):
+    """
+    Box plot of a metric per division, drawn from the precomputed quartiles.
 
-    plt.figure(figsize=(10, 6))
-    filtered_data.boxplot(column=metric, by="Division", grid=False, figsize=(12, 8))
-    plt.title(f"Box Plot of {metric} by Division")
-    plt.suptitle("")  # Remove default title for grouped boxplot
-    plt.xlabel("Division")
-    plt.ylabel(metric)
-    plt.xticks(rotation=45)
-    plt.show()
\ No newline at end of file
+    With headless the plot is not shown; its image bytes are returned instead.
+    """
+    partitions = partition_divisions(data)
+    divisions = sorted(partitions.divisions) if division is None else [division]
+    stats = []
+    for div in divisions:
+        summary = partitions.summary(metric, div)
+        if summary is not None and summary["count"]:
+            stats.append({"label": div, "med": summary["median"], "q1": summary["q1"], "q3": summary["q3"],
+                          "whislo": summary["whislo"], "whishi": summary["whishi"], "fliers": summary["fliers"]})
+    if not stats:
+        print(f"No '{metric}' values to plot.")
+        return None
+
+    fig = new_figure((12, 8), headless)
+    ax = fig.add_subplot()
+    ax.bxp(stats)
+    ax.set_title(f"Box Plot of {metric} by Division")
+    ax.set_xlabel("Division")
+    ax.set_ylabel(metric)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    return show_or_render(fig, headless, image_format)
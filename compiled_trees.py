@@ -0,0 +1,227 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store
+
+FOREST = "forest"
+BOOSTING = "boosting"
+
+
+class CompiledTrees:
+    """
+    A fitted RandomForestClassifier or GradientBoostingClassifier flattened into
+    contiguous node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right, value);
+    leaves point to themselves, so every tree can be walked for max_depth
+    levels at once. predict_proba matches the sklearn model, so a compiled
+    model can stand in for it (e.g. in predict_matchups).
+    """
+
+    def __init__(self, kind, feature, threshold, left, right, missing_left, value, roots, max_depth,
+                 classes, init=None, learning_rate=1.0, outputs=1):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.init = init
+        self.learning_rate = learning_rate
+        self.outputs = outputs
+        # Left and right child of node i at 2 * i and 2 * i + 1
+        self.children = np.column_stack([left, right]).ravel()
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X):
+        """
+        Return the (rows, trees) array of leaf node indices reached by each row.
+        """
+        # sklearn compares float32 features against the thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        flat = X.ravel()
+        row_starts = (np.arange(len(X)) * X.shape[1])[:, None]
+        nodes = np.tile(self.roots, (len(X), 1))
+        for _ in range(self.max_depth):
+            values = flat[row_starts + self.feature[nodes]]
+            go_right = ~(values <= self.threshold[nodes])
+            if self.missing_left is not None:
+                go_right &= ~(np.isnan(values) & self.missing_left[nodes])
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def decision_function(self, X):
+        """
+        Raw boosting scores, (rows,) for binary models and (rows, classes) otherwise.
+        """
+        if self.kind != BOOSTING:
+            raise ValueError("decision_function is only available for boosting models.")
+        leaves = self.value[self.apply(X), 0]
+        raw = self.init + self.learning_rate * leaves.reshape(len(leaves), -1, self.outputs).sum(axis=1)
+        return raw[:, 0] if self.outputs == 1 else raw
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, (rows, classes).
+        """
+        if self.kind == FOREST:
+            return self.value[self.apply(X)].mean(axis=1)
+        raw = self.decision_function(X)
+        if self.outputs == 1:
+            positive = 1.0 / (1.0 + np.exp(-raw))
+            return np.column_stack([1.0 - positive, positive])
+        raw = raw - raw.max(axis=1, keepdims=True)
+        exp = np.exp(raw)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _flatten(trees, normalize):
+    """
+    Concatenate sklearn tree structures into global node arrays.
+    """
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+    feature, threshold, left, right, missing_left, value = [], [], [], [], [], []
+    for offset, tree in zip(offsets, trees):
+        is_leaf = tree.children_left < 0
+        own = np.arange(tree.node_count) + offset
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, own, tree.children_left + offset))
+        right.append(np.where(is_leaf, own, tree.children_right + offset))
+        missing = getattr(tree, "missing_go_to_left", None)
+        missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None else missing.astype(bool))
+        node_value = tree.value[:, 0, :].astype(np.float64)
+        if normalize:
+            totals = node_value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            node_value = node_value / totals
+        value.append(node_value)
+
+    missing_left = np.concatenate(missing_left)
+    return {
+        "feature": np.ascontiguousarray(np.concatenate(feature), dtype=np.intp),
+        "threshold": np.ascontiguousarray(np.concatenate(threshold), dtype=np.float64),
+        "left": np.ascontiguousarray(np.concatenate(left), dtype=np.intp),
+        "right": np.ascontiguousarray(np.concatenate(right), dtype=np.intp),
+        "missing_left": missing_left if missing_left.any() else None,
+        "value": np.ascontiguousarray(np.concatenate(value)),
+        "roots": offsets[:-1].astype(np.intp),
+        "max_depth": max(tree.max_depth for tree in trees),
+    }
+
+
+def compile_model(model):
+    """
+    Flatten a fitted RandomForestClassifier or GradientBoostingClassifier.
+    """
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+
+    if isinstance(model, RandomForestClassifier):
+        if model.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled.")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        return CompiledTrees(FOREST, classes=model.classes_, **_flatten(trees, normalize=True))
+
+    if isinstance(model, GradientBoostingClassifier):
+        if model.init not in (None, "zero"):
+            raise ValueError("Only boosting models with the default init estimator can be compiled.")
+        stages, outputs = model.estimators_.shape
+        trees = [estimator.tree_ for estimator in model.estimators_.ravel()]
+        compiled = CompiledTrees(BOOSTING, classes=model.classes_, learning_rate=model.learning_rate,
+                                 outputs=outputs, **_flatten(trees, normalize=False))
+        # Recover the constant initial score from a single row
+        row = np.zeros((1, model.n_features_in_))
+        raw = model.decision_function(row).reshape(1, -1)
+        leaves = compiled.value[compiled.apply(row), 0].reshape(1, stages, outputs).sum(axis=1)
+        compiled.init = (raw - model.learning_rate * leaves)[0]
+        return compiled
+
+    raise TypeError(f"Cannot compile a {type(model).__name__}.")
+
+
+def compile_models(rf_model, gb_model):
+    """
+    Compile the models returned by train_models.
+    """
+    return compile_model(rf_model), compile_model(gb_model)
+
+
+def _latency(function, repeats):
+    """
+    Median wall-clock time of function() in microseconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e6
+
+
+def benchmark(folder="ufc_stats", division="Lightweight", batch_rows=10000, repeats=50, seed=42):
+    """
+    Compare single-row and batch predict_proba latency of the sklearn models
+    and their compiled versions, and the largest probability difference.
+    """
+    from UFC_non_linear_predictor import division_models
+
+    df, features, (rf_model, gb_model, scaler) = division_models(load_store(folder), division)
+
+    scaled = scaler.transform(df[features].astype(float))
+    rng = np.random.default_rng(seed)
+    batch = rng.normal(size=(batch_rows, scaled.shape[1])) * scaled.std(axis=0) + scaled.mean(axis=0)
+    single = scaled[:1]
+
+    rows = []
+    for name, model in (("Random Forest", rf_model), ("Gradient Boosting", gb_model)):
+        start = time.perf_counter()
+        compiled = compile_model(model)
+        compile_ms = (time.perf_counter() - start) * 1000
+        for label, X in (("single row", single), (f"batch of {batch_rows}", batch)):
+            sklearn_us = _latency(lambda: model.predict_proba(X), repeats)
+            compiled_us = _latency(lambda: compiled.predict_proba(X), repeats)
+            rows.append({
+                "Model": name,
+                "Input": label,
+                "Nodes": compiled.n_nodes,
+                "Compile (ms)": compile_ms,
+                "sklearn (us)": sklearn_us,
+                "Compiled (us)": compiled_us,
+                "Speedup": sklearn_us / compiled_us,
+                "Max Abs Diff": float(np.abs(model.predict_proba(X) - compiled.predict_proba(X)).max()),
+            })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled tree models against sklearn.")
+    parser.add_argument("division", nargs="?", default="Lightweight", help="division name, e.g. Lightweight")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--batch-rows", type=int, default=10000, help="rows in the batch benchmark")
+    parser.add_argument("--repeats", type=int, default=50, help="timed calls per measurement")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"The folder '{args.folder}' does not exist.")
+        return
+    pd.set_option("display.width", 200)
+    report = benchmark(args.folder, args.division.capitalize(), args.batch_rows, args.repeats)
+    print(report.to_string(index=False, float_format="{:.3g}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+
+import numpy as np
+
+from fighter_store import load_store, format_value, FEATURES
+
+# Renamed when the layout of the tables changes
+NORMALIZATION_ARTIFACT = "normalization_v2"
+
+
+def division_table(X, sha1):
+    """
+    Normalization table of one division's N x F feature matrix: mean, std,
+    the quantile table, and each fighter's z-scores and percentile standing.
+
+    The quantile table holds the sorted values, row i being the quantile at
+    i / (N - 1); interpolating between its rows gives np.quantile exactly.
+    """
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+
+    # Percentile standing from the average rank among ties, so that mapping
+    # it back through the quantile table returns the fighter's own value
+    ordered = np.sort(X, axis=0)
+    percentiles = np.empty_like(X)
+    for f in range(X.shape[1]):
+        below = np.searchsorted(ordered[:, f], X[:, f], side="left")
+        through = np.searchsorted(ordered[:, f], X[:, f], side="right")
+        percentiles[:, f] = (below + through - 1) / 2
+    percentiles = percentiles / (len(X) - 1) if len(X) > 1 else np.full_like(X, 0.5)
+
+    return {
+        "sha1": sha1,
+        "mean": mean,
+        "std": std,
+        "quantiles": ordered,
+        "z": (X - mean) / std,
+        "percentiles": percentiles,
+    }
+
+
+def build_tables(store, previous=None):
+    """
+    Build the normalization table of every division.
+
+    Tables of divisions whose file did not change are taken from `previous`.
+    """
+    previous = previous or {}
+    tables = {}
+    for division in store.divisions:
+        sha1 = store.division_hash(division)
+        old = previous.get(division)
+        if old is not None and old["sha1"] == sha1:
+            tables[division] = old
+        else:
+            rows = store.division_slice(division)
+            X = np.column_stack([np.asarray(store.columns[f][rows], dtype=float) for f in FEATURES])
+            tables[division] = division_table(X, sha1)
+    return tables
+
+
+class CrossDivision:
+    """
+    Puts fighters from different divisions on a common scale.
+
+    A fighter's percentile standing in their own division is mapped through
+    another division's quantile table to the value with the same standing
+    there, so every lookup is a table access rather than a recomputation.
+    """
+
+    def __init__(self, store, tables):
+        self.store = store
+        self.tables = tables
+
+    def locate(self, name, division=None):
+        """
+        Return (division, row within the division) for a fighter, or None.
+        """
+        match = self.store.name_index.lookup(name, division)
+        if match is None:
+            return None
+        division, row = match
+        return division, row - self.store.division_slice(division).start
+
+    def profile(self, name, division=None):
+        """
+        Return a fighter's division, raw features, z-scores and percentile
+        standing (arrays in FEATURES order), or None if not found.
+        """
+        match = self.locate(name, division)
+        if match is None:
+            return None
+        division, row = match
+        table = self.tables[division]
+        start = self.store.division_slice(division).start
+        return {
+            "Division": division,
+            "Fighter Name": str(self.store.columns["Fighter Name"][start + row]),
+            "Rank": int(self.store.columns["Rank"][start + row]),
+            "Last Fight Result": str(self.store.columns["Last Fight Result"][start + row]),
+            "values": {f: self.store.columns[f][start + row] for f in FEATURES},
+            "raw": np.array([float(self.store.columns[f][start + row]) for f in FEATURES]),
+            "z": table["z"][row],
+            "percentiles": table["percentiles"][row],
+        }
+
+    def translate(self, percentiles, target):
+        """
+        Map percentile standings (FEATURES order) to the values at those
+        standings in the target division.
+        """
+        quantiles = self.tables[target]["quantiles"]
+        last = len(quantiles) - 1
+        position = np.asarray(percentiles) * last
+        lower = np.clip(np.floor(position).astype(np.int64), 0, max(last - 1, 0))
+        upper = np.minimum(lower + 1, last)
+        fraction = position - lower
+        columns = np.arange(quantiles.shape[1])
+        low = quantiles[lower, columns]
+        return low + fraction * (quantiles[upper, columns] - low)
+
+    def matchup(self, fighter1, fighter2, division1=None, division2=None):
+        """
+        Look up two fighters and express both in each of their divisions.
+
+        Returns (profile1, profile2, {reference division: (values1, values2)}),
+        or None if either fighter is not found.
+        """
+        first = self.profile(fighter1, division1)
+        second = self.profile(fighter2, division2)
+        if first is None or second is None:
+            return None
+        references = {}
+        for division in dict.fromkeys([first["Division"], second["Division"]]):
+            references[division] = (self.translate(first["percentiles"], division),
+                                    self.translate(second["percentiles"], division))
+        return first, second, references
+
+
+def load_cross_division(store):
+    """
+    Return the cross-division lookups of a store, with the normalization
+    tables loaded from the cache folder (only changed divisions are rebuilt).
+    """
+    tables = store.load_artifact(NORMALIZATION_ARTIFACT, build_tables, update=build_tables)
+    return CrossDivision(store, tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two fighters from any divisions on a common scale.")
+    parser.add_argument("fighter1")
+    parser.add_argument("fighter2")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    args = parser.parse_args()
+
+    cross = load_cross_division(load_store(args.folder))
+    result = cross.matchup(args.fighter1, args.fighter2)
+    if result is None:
+        print("One or both fighters not found (or the name is ambiguous across divisions).")
+        return
+    first, second, _ = result
+
+    print(f"\n{'Metric':<14}{first['Fighter Name'][:24]:>26}{second['Fighter Name'][:24]:>26}")
+    print(f"{'Division':<14}{first['Division']:>26}{second['Division']:>26}")
+    print(f"{'Rank':<14}{format_value('Rank', first['Rank']):>26}{format_value('Rank', second['Rank']):>26}")
+    for f, feature in enumerate(FEATURES):
+        cells = [f"{format_value(feature, p['values'][feature])} (p{p['percentiles'][f] * 100:.0f}, z {p['z'][f]:+.2f})"
+                 for p in (first, second)]
+        print(f"{feature:<14}{cells[0]:>26}{cells[1]:>26}")
+
+
+if __name__ == "__main__":
+    main()
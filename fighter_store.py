@@ -0,0 +1,394 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from tracing import span, traced
+
+# Division files and the cache folder that lives next to them
+DIVISION_SUFFIX = "_top15.csv"
+CACHE_FOLDER = ".cache"
+CACHE_VERSION = 3
+
+# Column layout shared by every tool
+PERCENT_COLUMNS = ["Str. Acc.", "Str. Def.", "TD Acc.", "TD Def."]
+FEATURES = [
+    "Age", "Reach (in)", "SLpM", "Str. Acc.", "SApM",
+    "Str. Def.", "TD Avg.", "TD Acc.", "TD Def.", "Sub. Avg."
+]
+CSV_COLUMNS = ["Rank", "Fighter Name"] + FEATURES + ["Last Fight Result"]
+COLUMNS = ["Division"] + CSV_COLUMNS + ["Outcome"]
+
+# The champion ("C" in the CSV files) is stored as rank 0
+CHAMPION_RANK = 0
+
+# Stats are float64, so a missing value (a blank or "--" cell) is stored as NaN
+_DTYPES = {"Division": np.int16, "Rank": np.int16, "Outcome": np.int8}
+MISSING_VALUES = ["--"]
+
+# Dtypes used while reading the CSV files; percentages are parsed per chunk
+_READ_DTYPES = {
+    "Rank": str, "Fighter Name": str, "Last Fight Result": str,
+    **{column: str if column in PERCENT_COLUMNS else _DTYPES.get(column, np.float64) for column in FEATURES},
+}
+
+# Rows read per chunk from a division file
+CHUNK_ROWS = 50_000
+
+_loaded_stores = {}
+_frame_caches = {}
+
+
+class FighterStore:
+    """
+    Typed NumPy columns for every fighter in every division.
+
+    Rows are grouped by division (in file-name order), so each division is a
+    contiguous slice of every column.
+    """
+
+    def __init__(self, folder, columns, divisions, sources):
+        self.folder = folder
+        self.columns = columns
+        self.divisions = divisions
+        self.sources = sources
+        self._name_index = None
+
+        counts = np.bincount(columns["Division"], minlength=len(divisions))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def __len__(self):
+        return len(self.columns["Division"])
+
+    def division_slice(self, division):
+        """
+        Return the row slice holding the given division.
+        """
+        code = self.divisions.index(division)
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def source_file(self, division):
+        """
+        Return the file name a division was loaded from.
+        """
+        return list(self.sources)[self.divisions.index(division)]
+
+    def division_hash(self, division):
+        """
+        Return the content hash of a division's file.
+        """
+        return self.sources[self.source_file(division)]["sha1"]
+
+    def column(self, name, division=None):
+        """
+        Return one column, optionally restricted to a division.
+        """
+        if division is None:
+            return self.columns[name]
+        return self.columns[name][self.division_slice(division)]
+
+    @property
+    def fingerprint(self):
+        """
+        Content hash of every division file in the store.
+        """
+        digest = hashlib.sha1()
+        for file, entry in self.sources.items():
+            digest.update(f"{file}:{entry['sha1']};".encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def name_index(self):
+        """
+        Name index over every fighter, keyed to (division, global row).
+        """
+        if self._name_index is None:
+            from name_index import build_store_index
+            self._name_index = self.load_artifact("name_index", build_store_index)
+        return self._name_index
+
+    def load_artifact(self, name, build, update=None):
+        """
+        Load an object derived from the store from the cache folder.
+
+        The object is rebuilt with build(store) and saved again whenever the
+        division files changed since it was written. When update is given, an
+        out-of-date object is refreshed with update(store, old_object) instead.
+        """
+        path = os.path.join(self.folder, CACHE_FOLDER, f"{name}.pkl")
+        fingerprint = self.fingerprint
+        stale = None
+        try:
+            with open(path, "rb") as f:
+                saved_fingerprint, artifact = pickle.load(f)
+            if saved_fingerprint == fingerprint:
+                return artifact
+            stale = artifact
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+            pass
+
+        artifact = build(self) if update is None or stale is None else update(self, stale)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump((fingerprint, artifact), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+        return artifact
+
+    def frame(self, division=None):
+        """
+        Build a DataFrame for one division (or all of them).
+
+        Percentage columns are fractions and the champion has rank 0. The index
+        holds the global row number, so it stays valid after sorting.
+        """
+        rows = slice(0, len(self)) if division is None else self.division_slice(division)
+        data = {name: np.asarray(self.columns[name][rows]) for name in CSV_COLUMNS + ["Outcome"]}
+        data["Division"] = np.asarray(self.divisions, dtype=object)[self.columns["Division"][rows]]
+        return pd.DataFrame(data, index=pd.RangeIndex(rows.start, rows.stop))
+
+
+def division_name(file_name):
+    """
+    Turn a file name such as 'light_heavyweight_top15.csv' into 'Light_heavyweight'.
+    """
+    return os.path.basename(file_name)[:-len(DIVISION_SUFFIX)].capitalize()
+
+
+def format_value(column, value):
+    """
+    Format a stored value the way it is written in the CSV files.
+    """
+    if column == "Rank":
+        return "C" if value == CHAMPION_RANK else str(value)
+    if value != value:
+        return "--"
+    if column in PERCENT_COLUMNS:
+        return f"{value * 100:g}%"
+    if column == "Age":
+        return f"{value:g}"
+    return str(value)
+
+
+def formatted(df):
+    """
+    Return a copy of a store frame with ranks and percentages in CSV form.
+    """
+    df = df.copy()
+    for column in ["Rank"] + PERCENT_COLUMNS:
+        if column in df.columns:
+            df[column] = [format_value(column, v) for v in df[column]]
+    return df
+
+
+def frame_cache(df, name, build):
+    """
+    Return build(df) for a DataFrame, computing it only once per frame.
+
+    Entries are dropped when the frame is garbage collected or changes length.
+    """
+    key = id(df)
+    entry = _frame_caches.get(key)
+    if entry is None or entry[0]() is not df or entry[1] != len(df):
+        ref = weakref.ref(df, lambda _: _frame_caches.pop(key, None))
+        entry = (ref, len(df), {})
+        _frame_caches[key] = entry
+    if name not in entry[2]:
+        entry[2][name] = build(df)
+    return entry[2][name]
+
+
+@traced("load_store")
+def load_store(folder="ufc_stats"):
+    """
+    Load the fighter store for a folder of division files.
+
+    A warm start memory-maps the cached columns. Files whose mtime changed are
+    hashed, and only files whose content changed are parsed again.
+    """
+    files = sorted(f for f in os.listdir(folder) if f.endswith(DIVISION_SUFFIX))
+    cache_dir = os.path.join(folder, CACHE_FOLDER)
+    manifest = _read_manifest(cache_dir)
+
+    sources = {}
+    changed = []
+    for file in files:
+        path = os.path.join(folder, file)
+        stat = os.stat(path)
+        entry = manifest["sources"].get(file) if manifest else None
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            sources[file] = entry
+            continue
+        digest = _file_hash(path)
+        sources[file] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest}
+        if not entry or entry["sha1"] != digest:
+            changed.append(file)
+
+    key = os.path.abspath(folder)
+    cached = _loaded_stores.get(key)
+    if cached is not None and not changed and cached.sources == sources:
+        return cached
+
+    old_columns = _read_columns(cache_dir) if manifest else None
+    if old_columns is not None and not changed and list(manifest["sources"]) == files:
+        columns = old_columns
+        if sources != manifest["sources"]:
+            # Only timestamps moved; the content hashes still match
+            _write_manifest(cache_dir, sources)
+    else:
+        if old_columns is None:
+            changed = files
+        columns = _build_columns(folder, files, changed, manifest, old_columns)
+        _write_cache(cache_dir, columns, sources)
+
+    store = FighterStore(folder, columns, [division_name(f) for f in files], sources)
+    _loaded_stores[key] = store
+    return store
+
+
+@traced("parse_division_file")
+def parse_division_file(path, chunk_rows=CHUNK_ROWS):
+    """
+    Parse one division CSV file into typed columns (without the division code).
+
+    The file is read chunk_rows rows at a time with explicit dtypes; ranks,
+    percentages and fight results are converted chunk by chunk straight into
+    preallocated arrays. Blank or "--" stats are stored as NaN. The text columns are joined from their chunks at the
+    end, so besides the result and one copy of those, the memory used stays
+    proportional to the chunk size.
+    """
+    capacity = _count_rows(path)
+    columns = {name: np.empty(capacity, dtype=_DTYPES.get(name, np.float64))
+               for name in ["Rank"] + FEATURES + ["Outcome"]}
+    names, results = [], []
+
+    rows = 0
+    reader = pd.read_csv(path, usecols=CSV_COLUMNS, dtype=_READ_DTYPES, na_values=MISSING_VALUES,
+                         chunksize=chunk_rows)
+    while True:
+        with span("read_csv"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+        stop = rows + len(chunk)
+        if stop > capacity:
+            # Quoted line breaks or a changing file; grow the arrays
+            capacity = max(stop, 2 * capacity)
+            columns = {name: np.resize(values, capacity) for name, values in columns.items()}
+        rank = chunk["Rank"].astype(str).str.strip()
+        columns["Rank"][rows:stop] = np.where(rank == "C", str(CHAMPION_RANK), rank).astype(_DTYPES["Rank"])
+        for column in FEATURES:
+            if column in PERCENT_COLUMNS:
+                with span("parse_percent"):
+                    columns[column][rows:stop] = chunk[column].str.rstrip('%').astype(float) / 100.0
+            else:
+                columns[column][rows:stop] = chunk[column].to_numpy()
+        result = chunk["Last Fight Result"].astype(str)
+        columns["Outcome"][rows:stop] = result.str.startswith('W').to_numpy(dtype=_DTYPES["Outcome"])
+        names.append(chunk["Fighter Name"].astype(str).to_numpy(dtype=str))
+        results.append(result.to_numpy(dtype=str))
+        rows = stop
+
+    if rows != capacity:
+        columns = {name: values[:rows].copy() for name, values in columns.items()}
+    columns["Fighter Name"] = np.concatenate(names) if names else np.empty(0, dtype=str)
+    columns["Last Fight Result"] = np.concatenate(results) if results else np.empty(0, dtype=str)
+    return columns
+
+
+def _count_rows(path):
+    # Number of data rows, assuming one line per row; used to preallocate the columns
+    lines, last = 0, b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return max(lines + (last != b"\n") - 1, 0)
+
+
+def _build_columns(folder, files, changed, manifest, old_columns):
+    # Reuse the cached slices of unchanged divisions and parse the rest
+    old_slices = {}
+    if manifest and old_columns is not None:
+        old_files = list(manifest["sources"])
+        counts = np.bincount(old_columns["Division"], minlength=len(old_files))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        old_slices = {f: slice(offsets[i], offsets[i + 1]) for i, f in enumerate(old_files)}
+
+    parts = []
+    for code, file in enumerate(files):
+        if file in old_slices and file not in changed:
+            rows = old_slices[file]
+            part = {name: np.asarray(old_columns[name][rows]) for name in COLUMNS if name != "Division"}
+        else:
+            part = parse_division_file(os.path.join(folder, file))
+        part["Division"] = np.full(len(part["Rank"]), code, dtype=_DTYPES["Division"])
+        parts.append(part)
+
+    if not parts:
+        return {name: np.empty(0, dtype=_DTYPES.get(name, np.float64)) for name in COLUMNS}
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+def _file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _column_file(cache_dir, name):
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    return os.path.join(cache_dir, f"{slug}.npy")
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir, sources):
+    manifest = {"version": CACHE_VERSION, "sources": sources}
+    tmp_path = os.path.join(cache_dir, "manifest.json.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(cache_dir, "manifest.json"))
+    except OSError:
+        pass
+
+
+def _read_columns(cache_dir):
+    try:
+        return {name: np.load(_column_file(cache_dir, name), mmap_mode="r") for name in COLUMNS}
+    except (OSError, ValueError):
+        return None
+
+
+@traced("write_cache")
+def _write_cache(cache_dir, columns, sources):
+    # The manifest is written last, so a half-written cache is never trusted
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(cache_dir, "manifest.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        for name, values in columns.items():
+            path = _column_file(cache_dir, name)
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, values)
+            os.replace(path + ".tmp", path)
+    except OSError:
+        return
+    _write_manifest(cache_dir, sources)
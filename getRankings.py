@@ -5,9 +5,37 @@
 #          using html parsing. Starts with Pound for Pound rankings and contains all
 #          women's and men's divisions. Saves to a csv file titled ufc_rankings.csv which
 #          contains fields for Division,Rank,Name,Rank Change.
-from bs4 import BeautifulSoup
-import requests
+#          Pages are fetched with a pooled async session and conditional requests
+#          (ETag / If-Modified-Since), and only division sections that changed are
+#          serialized again; unchanged sections are copied from the existing csv file.
+#          Every scrape also adds a snapshot to the rank history store (see rank_history.py).
+import argparse
+import asyncio
 import csv
+import io
+import json
+import os
+
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
+
+from rank_history import RankHistory, history_folder
+from tracing import traced
+
+# URL for UFC rankings
+RANKINGS_URL = "https://www.ufc.com/rankings"
+OUTPUT_FILE = "ufcrankings.csv"
+FIELDNAMES = ["Division", "Rank", "Name", "Rank Change"]
+
+# ETag / Last-Modified of every fetched URL, stored next to the csv file
+VALIDATORS_FILE = ".rankings_http.json"
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 
 # Function to parse a single division's data
 def parse_division(div_content):
@@ -33,29 +61,183 @@ def parse_division(div_content):
     return division_name, division_data
 
 
-# URL for UFC rankings
-url = "https://www.ufc.com/rankings"
+@traced("parse_rankings")
+def parse_rankings(html):
+    """
+    Parse every division on the rankings page into {division: [fighter rows]}.
+
+    Only the division blocks are built into a tree, using lxml when it is installed.
+    """
+    only_divisions = SoupStrainer("div", class_="view-grouping")
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=only_divisions)
+
+    all_division_data = {}
+    for division in soup.select(".view-grouping"):
+        division_name, division_data = parse_division(division)
+        all_division_data[division_name] = division_data
+    return all_division_data
+
+
+@traced("fetch_page")
+async def fetch_page(session, url, validator):
+    """
+    Fetch one page, sending the saved validators as conditional request headers.
+
+    Returns (status, text, validator); text is None when the page is unchanged (304).
+    """
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304:
+            return 304, None, validator
+        response.raise_for_status()
+        text = await response.text()
+        new_validator = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        return response.status, text, new_validator
+
+
+async def fetch_pages(urls, validators=None, concurrency=4, timeout=30):
+    """
+    Fetch several pages concurrently over one pooled session.
+
+    Returns {url: (status, text, validator)}.
+    """
+    validators = validators or {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        results = await asyncio.gather(*(fetch_page(session, url, validators.get(url, {})) for url in urls))
+    return dict(zip(urls, results))
 
-# Fetch the webpage content
-response = requests.get(url)
-soup = BeautifulSoup(response.text, 'html.parser')
 
-# Select all divisions
-divisions = soup.select(".view-grouping")
+def read_sections(path):
+    """
+    Read an existing rankings csv file into {division: (fighter rows, section text)}.
 
-# Parse all divisions
-all_division_data = {}
-for division in divisions:
-    division_name, division_data = parse_division(division)
-    all_division_data[division_name] = division_data
+    The section text holds the section's lines exactly as they are in the file.
+    """
+    sections = {}
+    if not os.path.exists(path):
+        return sections
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        lines = csvfile.read().splitlines(keepends=True)
+    header = next(csv.reader(lines[:1]), [])
+    for line in lines[1:]:
+        values = next(csv.reader([line]), None)
+        if not values:
+            continue
+        row = dict(zip(header, values))
+        division_name = row.pop("Division")
+        rows, text = sections.setdefault(division_name, ([], []))
+        rows.append(row)
+        text.append(line)
+    return {division_name: (rows, "".join(text)) for division_name, (rows, text) in sections.items()}
 
-# Save to a CSV file
-with open("ufcrankings.csv", "w", newline="", encoding="utf-8") as csvfile:
-    fieldnames = ["Division", "Rank", "Name", "Rank Change"]
-    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+
+@traced("write_rankings")
+def write_rankings(path, all_division_data):
+    """
+    Write the rankings csv file, serializing only the sections that changed.
+
+    The lines of unchanged sections are copied from the existing file as they
+    are, and the new file replaces the old one atomically. Returns the list of
+    changed or removed divisions; the file is not touched when nothing changed.
+    """
+    old_sections = read_sections(path)
+    changed = [
+        division_name for division_name, fighters in all_division_data.items()
+        if division_name not in old_sections or old_sections[division_name][0] != fighters
+    ]
+    removed = [division_name for division_name in old_sections if division_name not in all_division_data]
+    if not changed and not removed and list(old_sections) == list(all_division_data):
+        return []
+
+    # Keep the line endings of the existing file
+    line_terminator = "\r\n"
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            first_line = f.readline()
+        if first_line and not first_line.endswith(b"\r\n"):
+            line_terminator = "\n"
+
+    buffer = io.StringIO(newline="")
+    writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES, lineterminator=line_terminator)
     writer.writeheader()
     for division_name, fighters in all_division_data.items():
-        for fighter in fighters:
-            writer.writerow({"Division": division_name, **fighter})
+        if division_name in changed:
+            for fighter in fighters:
+                writer.writerow({"Division": division_name, **fighter})
+            continue
+        text = old_sections[division_name][1]
+        if not text.endswith(("\n", "\r")):
+            text += line_terminator
+        buffer.write(text)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+        csvfile.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+    return changed + removed
+
+
+def load_validators(output):
+    path = os.path.join(os.path.dirname(os.path.abspath(output)), VALIDATORS_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_validators(output, validators):
+    path = os.path.join(os.path.dirname(os.path.abspath(output)), VALIDATORS_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(validators, f, indent=2)
+
+
+@traced("scrape")
+async def scrape(url=RANKINGS_URL, output=OUTPUT_FILE, conditional=True):
+    """
+    Fetch the rankings page and update the csv file.
+
+    Returns the list of changed divisions, or None when the server reported
+    the page as unchanged.
+    """
+    validators = load_validators(output) if conditional and os.path.exists(output) else {}
+    status, html, validator = (await fetch_pages([url], validators))[url]
+    if status == 304:
+        return None
+
+    changed = write_rankings(output, parse_rankings(html))
+    validators[url] = validator
+    save_validators(output, validators)
+    # Keep a snapshot of every scrape; an unchanged file is not stored twice
+    RankHistory(history_folder(output)).record(output)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch UFC rankings into a csv file.")
+    parser.add_argument("--url", default=RANKINGS_URL, help="rankings page to fetch")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="csv file to update")
+    parser.add_argument("--force", action="store_true", help="ignore saved ETag / Last-Modified values")
+    args = parser.parse_args()
+
+    changed = asyncio.run(scrape(args.url, args.output, conditional=not args.force))
+    if changed is None:
+        print(f"UFC rankings page not modified; '{args.output}' is up to date.")
+    elif not changed:
+        print(f"UFC rankings unchanged in '{args.output}'.")
+    else:
+        print(f"UFC rankings saved to '{args.output}' ({len(changed)} division(s) updated: {', '.join(changed)}).")
+
 
-print("UFC rankings saved to 'ufcrankings.csv'.")
+if __name__ == "__main__":
+    main()
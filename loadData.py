@@ -1,17 +1,152 @@
+import numpy as np
 import pandas as pd
-import os
+from fighter_store import load_store, frame_cache
+from tracing import traced
 
+# Label of the view over every division at once
+ALL_DIVISIONS = "All"
+
+
+class DivisionPartitions:
+    """
+    Contiguous per-division slices of a frame, plus summary statistics of
+    every numeric metric per division and for all divisions.
+    """
+
+    def __init__(self, data):
+        codes, divisions = pd.factorize(data["Division"])
+        if len(codes) and np.any(np.diff(codes) < 0):
+            # Group the rows by division (in order of first appearance)
+            order = np.argsort(codes, kind="stable")
+            codes = codes[order]
+            self.frame = data.iloc[order]
+        else:
+            # A shallow copy, so the cache entry doesn't keep `data` alive
+            self.frame = data.iloc[:]
+        self.divisions = list(divisions)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(divisions)))))
+        self.slices = {division: slice(int(offsets[i]), int(offsets[i + 1]))
+                       for i, division in enumerate(self.divisions)}
+        self.metrics = [column for column in data.columns
+                        if column != "Division" and pd.api.types.is_numeric_dtype(data[column])]
+        self._views = {}
+
+        # Every metric sorted within each division, and over all rows
+        values = self.frame[self.metrics].to_numpy(dtype=float)
+        by_division = np.empty_like(values)
+        for rows in self.slices.values():
+            by_division[rows] = np.sort(values[rows], axis=0)
+        overall_sorted = np.sort(values, axis=0)
+
+        # Statistic -> array per metric, row 0 for all divisions then one row per division
+        all_rows = np.array([0, len(values)])
+        self.statistics = {}
+        for i, metric in enumerate(self.metrics):
+            overall = group_statistics(overall_sorted[:, i], all_rows)
+            per_division = group_statistics(by_division[:, i], offsets)
+            self.statistics[metric] = {name: overall[name] + per_division[name] if name == "fliers"
+                                       else np.concatenate((overall[name], per_division[name]))
+                                       for name in overall}
+        self._rows = {division: i + 1 for i, division in enumerate(self.divisions)}
+        self._rows[ALL_DIVISIONS] = 0
+
+    def view(self, division=None):
+        """
+        Return the rows of one division, or every row for None / 'All'.
+        """
+        if division is None or division == ALL_DIVISIONS:
+            return self.frame
+        if division not in self._views:
+            self._views[division] = self.frame.iloc[self.slices.get(division, slice(0, 0))]
+        return self._views[division]
+
+    def summary(self, metric, division=None):
+        """
+        Return the precomputed statistics of a metric as a dict (count, mean,
+        std, min, q1, median, q3, max, whislo, whishi, fliers), or None if the
+        metric or division is unknown.
+        """
+        row = self._rows.get(division or ALL_DIVISIONS)
+        if row is None or metric not in self.statistics:
+            return None
+        return {name: values[row] for name, values in self.statistics[metric].items()}
+
+
+def group_statistics(ordered, offsets):
+    """
+    Summarize the groups ordered[offsets[i]:offsets[i + 1]] at once, ignoring
+    NaN. Each group must be sorted with NaN last, as np.sort leaves it.
+
+    Quartiles interpolate linearly like np.percentile; whiskers reach the
+    furthest values within 1.5 IQR of the box and the rest are fliers, as
+    matplotlib draws them. Returns a dict of arrays with one entry per group
+    ('fliers' is a list of arrays).
+    """
+    offsets = np.asarray(offsets)
+    sizes = np.diff(offsets)
+    groups = np.repeat(np.arange(len(sizes)), sizes)
+    valid = ~np.isnan(ordered)
+    starts = np.minimum(offsets[:-1], max(len(ordered) - 1, 0))
+    padded = np.append(ordered, np.nan)
+
+    def group_sum(array):
+        return np.add.reduceat(array, starts) * (sizes > 0) if len(array) else np.zeros(len(sizes), array.dtype)
+
+    counts = group_sum(valid.astype(np.int64))
+    last = offsets[:-1] + np.maximum(counts - 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(counts > 0, group_sum(np.where(valid, ordered, 0.0)) / counts, np.nan)
+        deviations = np.where(valid, ordered - mean[groups], 0.0)
+        std = np.where(counts > 1, np.sqrt(group_sum(deviations ** 2) / (counts - 1)), np.nan)
+
+    def quantile(q):
+        position = q * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        fraction = position - lower
+        below = padded[offsets[:-1] + lower]
+        above = padded[np.minimum(offsets[:-1] + lower + 1, last)]
+        return np.where(counts > 0, below + fraction * (above - below), np.nan)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    inside = valid & (ordered >= (q1 - 1.5 * iqr)[groups]) & (ordered <= (q3 + 1.5 * iqr)[groups])
+    if len(ordered):
+        whislo = np.minimum.reduceat(np.where(inside, ordered, np.inf), starts)
+        whishi = np.maximum.reduceat(np.where(inside, ordered, -np.inf), starts)
+    else:
+        whislo = whishi = np.full(len(sizes), np.inf)
+    whislo = np.where(np.isfinite(whislo) & (sizes > 0), whislo, q1)
+    whishi = np.where(np.isfinite(whishi) & (sizes > 0), whishi, q3)
+    outside = valid & ((ordered < whislo[groups]) | (ordered > whishi[groups]))
+    fliers = np.split(ordered[outside], np.searchsorted(groups[outside], np.arange(1, len(sizes))))
+
+    return {
+        "count": counts,
+        "mean": mean,
+        "std": std,
+        "min": np.where(counts > 0, padded[offsets[:-1]], np.nan),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "max": np.where(counts > 0, padded[last], np.nan),
+        "whislo": whislo,
+        "whishi": whishi,
+        "fliers": fliers,
+    }
+
+
+def partition_divisions(data):
+    """
+    Return the division partitions of a frame, built once per frame.
+    """
+    return frame_cache(data, "division_partitions", DivisionPartitions)
+
+
+@traced("load_ufc_data")
 def load_ufc_data(folder="ufc_stats"):
-    # Initialize an empty DataFrame
-    all_data = pd.DataFrame()
-
-    # Loop through all CSV files in the folder
-    for file in os.listdir(folder):
-        if file.endswith("_top15.csv"):
-            division = file.split("_")[0].capitalize()
-            filepath = os.path.join(folder, file)
-            data = pd.read_csv(filepath)
-            data["Division"] = division  # Add division as a column
-            all_data = pd.concat([all_data, data], ignore_index=True)
-
-    return all_data
\ No newline at end of file
+    # All divisions come from the shared fighter store, with a 'Division' column
+    store = load_store(folder)
+    data = store.frame()
+    # Partition and summarize once; the plot and regression helpers reuse it
+    partition_divisions(data)
+    return data
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+
+from fighter_store import load_store, CACHE_FOLDER
+from tracing import traced
+
+# Bump when the layout of a saved entry changes
+MODEL_CACHE_VERSION = 1
+
+
+def models_folder(store):
+    """
+    Return the folder holding saved models for a store.
+    """
+    return os.path.join(store.folder, CACHE_FOLDER, "models")
+
+
+def model_key(data_hash, config):
+    """
+    Build the content address of a model from its data hash and training config.
+    """
+    import sklearn
+
+    payload = {
+        "version": MODEL_CACHE_VERSION,
+        "data": data_hash,
+        "config": config,
+        "sklearn": sklearn.__version__,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@traced("load_or_fit")
+def load_or_fit(store, division, config, fit):
+    """
+    Return the saved models for a division, fitting and saving them on a miss.
+
+    fit() must return (rf_model, gb_model, scaler, report). The result is a
+    dict with the entry metadata plus 'models' and 'report'.
+    """
+    data_hash = store.division_hash(division)
+    key = model_key(data_hash, config)
+    folder = models_folder(store)
+    path = os.path.join(folder, f"{key}.pkl")
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        with open(os.path.join(folder, f"{key}.json"), encoding="utf-8") as f:
+            return {**json.load(f), **payload}
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        pass
+
+    start = time.perf_counter()
+    rf_model, gb_model, scaler, report = fit()
+    import sklearn
+
+    meta = {
+        "key": key,
+        "division": division,
+        "data_sha1": data_hash,
+        "config": config,
+        "sklearn": sklearn.__version__,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "fit_seconds": round(time.perf_counter() - start, 4),
+    }
+    payload = {"models": (rf_model, gb_model, scaler), "report": report}
+
+    # The metadata file is written last; an entry without it is not listed
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        with open(os.path.join(folder, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+    except OSError:
+        pass
+    return {**meta, **payload}
+
+
+def saved_models(store):
+    """
+    Return the metadata of every saved model, flagging whether it is current.
+
+    Current models are the ones the predictor uses, so with a fight history
+    they are the models trained with the rating features.
+    """
+    from ratings import load_ratings
+    from UFC_non_linear_predictor import model_config
+
+    folder = models_folder(store)
+    if not os.path.isdir(folder):
+        return []
+
+    config = model_config(load_ratings(store.folder))
+    current_keys = {
+        model_key(store.division_hash(division), config) for division in store.divisions
+    }
+    entries = []
+    for file in sorted(os.listdir(folder)):
+        if not file.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, file), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        pickle_path = os.path.join(folder, f"{meta['key']}.pkl")
+        meta["size"] = os.path.getsize(pickle_path) if os.path.exists(pickle_path) else 0
+        meta["current"] = meta["key"] in current_keys
+        entries.append(meta)
+    return entries
+
+
+def remove_model(store, key):
+    """
+    Delete one saved model and its metadata.
+    """
+    for extension in (".pkl", ".json"):
+        path = os.path.join(models_folder(store), key + extension)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def warm_models(store):
+    """
+    Make sure every division has saved models, training only the missing ones.
+    """
+    from ratings import load_ratings
+    from UFC_non_linear_predictor import preprocess_data, fit_models, model_config
+
+    ratings = load_ratings(store.folder)
+    for division in store.divisions:
+        file_path = os.path.join(store.folder, store.source_file(division))
+        X, y, _ = preprocess_data(file_path, ratings)
+        start = time.perf_counter()
+        entry = load_or_fit(store, division, model_config(ratings), lambda: fit_models(X, y))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{division:<20}{entry['key'][:12]:<14}{elapsed:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage saved UFC prediction models.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list saved models")
+    commands.add_parser("warm", help="train or load models for every division")
+    prune = commands.add_parser("prune", help="delete stale models")
+    prune.add_argument("--all", action="store_true", help="delete every saved model")
+    prune.add_argument("--older-than", type=float, metavar="DAYS",
+                       help="only delete models created more than DAYS days ago")
+    args = parser.parse_args()
+
+    store = load_store(args.folder)
+
+    if args.command == "warm":
+        warm_models(store)
+        return
+
+    entries = saved_models(store)
+    if args.command == "list":
+        if not entries:
+            print("No saved models.")
+            return
+        print(f"{'Key':<14}{'Division':<20}{'Created':<22}{'Size (KB)':>10}  Status")
+        print("-" * 76)
+        for meta in entries:
+            status = "current" if meta["current"] else "stale"
+            print(f"{meta['key'][:12]:<14}{meta['division']:<20}{meta['created']:<22}"
+                  f"{meta['size'] / 1024:>10.1f}  {status}")
+        return
+
+    removed = 0
+    for meta in entries:
+        if meta["current"] and not args.all:
+            continue
+        if args.older_than is not None:
+            age_days = (datetime.now() - datetime.fromisoformat(meta["created"])).total_seconds() / 86400
+            if age_days < args.older_than:
+                continue
+        remove_model(store, meta["key"])
+        removed += 1
+    print(f"Removed {removed} saved model(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import re
+import unicodedata
+from collections import Counter
+
+from fighter_store import frame_cache
+
+# Minimum Dice similarity between trigram sets for a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+
+def normalize_name(name):
+    """
+    Fold a fighter name into a lookup key.
+
+    Accents are stripped, case is folded and punctuation is dropped, so
+    'Jiří Procházka', 'jiri prochazka' and 'JIRI PROCHAZKA' share one key.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    key = stripped.casefold().replace("-", " ")
+    key = re.sub(r"[^\w\s]", "", key)
+    return " ".join(key.split())
+
+
+def trigrams(key):
+    """
+    Return the set of character trigrams of a padded lookup key.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Constant-time fighter lookup by full name, surname or approximate spelling.
+
+    Every entry maps a name to a (division, row) pair. Full names are matched
+    first, then surname aliases ('Prochazka', 'du Plessis'), then (only when
+    asked for) the closest name by trigram similarity. A tier only answers
+    when its match is unique.
+    """
+
+    def __init__(self, names, divisions=None, rows=None):
+        self.names = [str(name) for name in names]
+        count = len(self.names)
+        self.divisions = list(divisions) if divisions is not None else [None] * count
+        self.rows = [int(row) for row in rows] if rows is not None else list(range(count))
+
+        self.exact = {}
+        self.aliases = {}
+        self.trigrams = {}
+        self.trigram_counts = []
+        for entry, name in enumerate(self.names):
+            key = normalize_name(name)
+            self.exact.setdefault(key, []).append(entry)
+
+            tokens = key.split()
+            for start in range(1, len(tokens)):
+                self.aliases.setdefault(" ".join(tokens[start:]), []).append(entry)
+
+            grams = trigrams(key)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(entry)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name, division=None, fuzzy=False):
+        """
+        Return (division, row) for a fighter name, or None if there is no unique match.
+
+        A misspelled name only matches with fuzzy, since the closest name may
+        be a different fighter.
+        """
+        entry = self._match(name, division, fuzzy)
+        return None if entry is None else (self.divisions[entry], self.rows[entry])
+
+    def resolve(self, name, division=None):
+        """
+        Return the full name a fighter name matches (exactly or by surname), or None.
+
+        When there is no match the closest names are printed as suggestions.
+        """
+        entry = self._match(name, division, fuzzy=False)
+        if entry is None:
+            suggestions = self.suggest(name, division, limit=3)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            print(f"Fighter '{name}' not found (or the name is ambiguous).{hint}")
+            return None
+        return self.names[entry]
+
+    def suggest(self, name, division=None, limit=5):
+        """
+        Return up to `limit` fighter names ordered by trigram similarity.
+        """
+        scores = self._scores(normalize_name(name))
+        entries = [e for e in sorted(scores, key=scores.get, reverse=True)
+                   if division is None or self.divisions[e] == division]
+        return [self.names[e] for e in entries[:limit]]
+
+    def _match(self, name, division, fuzzy):
+        key = normalize_name(name)
+        for table in (self.exact, self.aliases):
+            entries = self._in_division(table.get(key, ()), division)
+            if len(entries) == 1:
+                return entries[0]
+            if entries:
+                return None
+
+        if fuzzy:
+            entries = self._in_division(self._closest(key), division)
+            if len(entries) == 1:
+                return entries[0]
+        return None
+
+    def _in_division(self, entries, division):
+        if division is None:
+            return list(entries)
+        return [e for e in entries if self.divisions[e] == division]
+
+    def _scores(self, key):
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.trigrams.get(gram, ()))
+        return {
+            entry: 2.0 * count / (len(grams) + self.trigram_counts[entry])
+            for entry, count in shared.items()
+        }
+
+    def _closest(self, key):
+        scores = self._scores(key)
+        best = max(scores.values(), default=0.0)
+        if best < FUZZY_THRESHOLD:
+            return []
+        return [entry for entry, score in scores.items() if score == best]
+
+
+def build_store_index(store):
+    """
+    Build the name index over every fighter in a FighterStore.
+    """
+    divisions = [store.divisions[code] for code in store.columns["Division"]]
+    return NameIndex(store.columns["Fighter Name"], divisions, range(len(store)))
+
+
+def index_for(df):
+    """
+    Return the name index of a DataFrame, building it on first use.
+
+    Rows in this index are positions in the frame, for use with df.iloc.
+    """
+    return frame_cache(df, "name_index", _build_frame_index)
+
+
+def locate(df, name):
+    """
+    Return the position of a fighter in a DataFrame, or None if not found.
+    """
+    match = index_for(df).lookup(name)
+    return None if match is None else match[1]
+
+
+def resolve_name(df, name):
+    """
+    Return the full name of a fighter in a DataFrame, or None (printing
+    suggestions) if the name does not match exactly or by surname.
+    """
+    return index_for(df).resolve(name)
+
+
+def find_fighter(df, name):
+    """
+    Return the row of a fighter in a DataFrame as a Series, or None if not found.
+    """
+    position = locate(df, name)
+    return None if position is None else df.iloc[position]
+
+
+def _build_frame_index(df):
+    divisions = df["Division"] if "Division" in df.columns else None
+    return NameIndex(df["Fighter Name"], divisions)
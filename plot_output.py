@@ -0,0 +1,25 @@
+import io
+
+
+def new_figure(figsize, headless=False):
+    """
+    Create a figure; headless figures bypass pyplot and any GUI backend.
+    """
+    if headless:
+        from matplotlib.figure import Figure
+        return Figure(figsize=figsize)
+    import matplotlib.pyplot as plt
+    return plt.figure(figsize=figsize)
+
+
+def show_or_render(fig, headless=False, image_format="png"):
+    """
+    Show a pyplot figure, or return a headless figure as image bytes.
+    """
+    if not headless:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return None
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format)
+    return buffer.getvalue()
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+
+from fighter_store import load_store
+from name_index import locate
+from UFC_fight_predictor import advantage_matrix, pair_advantages
+from UFC_winning_margin import score_division
+
+NOT_FOUND = "One or both fighters not found in the division."
+
+# Number of recent requests kept per endpoint for the latency percentiles
+LATENCY_WINDOW = 10000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """
+    Collect concurrent requests for one engine and score them together.
+
+    handler(items) receives a list of request dicts and returns one result per
+    item. A batch holds every request queued when the previous batch finished,
+    plus any that arrive within max_delay seconds.
+    """
+
+    def __init__(self, handler, max_batch=256, max_delay=0.0):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            # Let requests that are already being read join this batch
+            await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                results = self.handler([item for item, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self.batch_sizes.append(len(batch))
+
+
+class PredictionService:
+    """
+    Fighter data, advantage matrices, weighted scores and fitted models kept in
+    memory for every division.
+    """
+
+    def __init__(self, folder="ufc_stats", load_models=True, max_batch=256, max_delay=0.0):
+        store = load_store(folder)
+        self.frames = {division: store.frame(division) for division in store.divisions}
+        self.scored = {division: score_division(store.frame(division)) for division in store.divisions}
+        for division, frame in self.frames.items():
+            advantage_matrix(frame)
+
+        self.models = {}
+        if load_models:
+            self._load_models(store)
+
+        self.batchers = {
+            "advantage": MicroBatcher(self.score_advantage, max_batch, max_delay),
+            "weighted": MicroBatcher(self.score_weighted, max_batch, max_delay),
+        }
+        if self.models:
+            self.batchers["ml"] = MicroBatcher(self.score_ml, max_batch, max_delay)
+        self.latencies = {name: deque(maxlen=LATENCY_WINDOW) for name in self.batchers}
+
+    def _load_models(self, store):
+        from compiled_trees import compile_models
+        from UFC_non_linear_predictor import division_models
+
+        for division in store.divisions:
+            df, _, (rf_model, gb_model, scaler) = division_models(store, division)
+            # Compiled trees answer small batches much faster than sklearn
+            self.models[division] = (df, compile_models(rf_model, gb_model) + (scaler,))
+
+    def _resolve(self, frames, items):
+        """
+        Group request items by division and resolve fighter positions.
+
+        Returns (results, resolved): results holds an error for every item that
+        could not be resolved, and resolved lists (division, item numbers,
+        positions) with positions as a (k, 2) array.
+        """
+        results = [None] * len(items)
+        groups = {}
+        for number, item in enumerate(items):
+            frame = frames.get(item.get("division"))
+            if frame is None:
+                results[number] = {"status": 404, "error": "Division not found."}
+                continue
+            positions = (locate(frame, item.get("fighter1", "")), locate(frame, item.get("fighter2", "")))
+            if None in positions:
+                results[number] = {"status": 404, "error": NOT_FOUND}
+                continue
+            groups.setdefault(item["division"], []).append((number, positions))
+
+        resolved = []
+        for division, entries in groups.items():
+            numbers = [number for number, _ in entries]
+            positions = np.array([position for _, position in entries], dtype=np.int64)
+            resolved.append((division, numbers, positions))
+        return results, resolved
+
+    def score_advantage(self, items):
+        """
+        Advantage-count predictions for a batch of matchups.
+        """
+        results, resolved = self._resolve(self.frames, items)
+        for division, numbers, positions in resolved:
+            frame = self.frames[division]
+            first, second = positions[:, 0], positions[:, 1]
+            names = frame["Fighter Name"].to_numpy()
+            first_wins, second_wins, metrics = pair_advantages(frame, first, second)
+            first_counts = first_wins.sum(axis=1)
+            second_counts = second_wins.sum(axis=1)
+            for k, number in enumerate(numbers):
+                name1, name2 = names[first[k]], names[second[k]]
+                if first_counts[k] > second_counts[k]:
+                    winner = name1
+                elif second_counts[k] > first_counts[k]:
+                    winner = name2
+                else:
+                    winner = "Draw"
+                results[number] = {
+                    "fighter1": name1,
+                    "fighter2": name2,
+                    "advantages": [int(first_counts[k]), int(second_counts[k])],
+                    "categories": [
+                        [m for m, won in zip(metrics, first_wins[k]) if won],
+                        [m for m, won in zip(metrics, second_wins[k]) if won],
+                    ],
+                    "winner": winner,
+                }
+        return results
+
+    def score_weighted(self, items):
+        """
+        Weighted performance-score predictions for a batch of matchups.
+        """
+        results, resolved = self._resolve(self.scored, items)
+        for division, numbers, positions in resolved:
+            frame = self.scored[division]
+            scores = frame["Performance Score"].to_numpy()[positions]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                chances = scores / scores.sum(axis=1, keepdims=True) * 100
+            names = frame["Fighter Name"].to_numpy()[positions]
+            for k, number in enumerate(numbers):
+                results[number] = {
+                    "fighter1": names[k, 0],
+                    "fighter2": names[k, 1],
+                    "chances": [float(chances[k, 0]), float(chances[k, 1])],
+                }
+        return results
+
+    def score_ml(self, items):
+        """
+        Random Forest and Gradient Boosting predictions for a batch of matchups.
+        """
+        from UFC_non_linear_predictor import predict_matchups
+
+        frames = {division: df for division, (df, _) in self.models.items()}
+        results, resolved = self._resolve(frames, items)
+        for division, numbers, positions in resolved:
+            df, (rf_model, gb_model, scaler) = self.models[division]
+            names = df["Fighter Name"].to_numpy()[positions]
+            table = predict_matchups(df, rf_model, gb_model, scaler, [tuple(pair) for pair in names])
+            for k, number in enumerate(numbers):
+                row = table.iloc[k]
+                results[number] = {
+                    "fighter1": names[k, 0],
+                    "fighter2": names[k, 1],
+                    "random_forest": [float(row["RF Fighter 1 Win (%)"]), float(row["RF Fighter 2 Win (%)"])],
+                    "gradient_boosting": [float(row["GB Fighter 1 Win (%)"]), float(row["GB Fighter 2 Win (%)"])],
+                }
+        return results
+
+    def stats(self):
+        """
+        Latency percentiles (in milliseconds) and batch sizes per endpoint.
+        """
+        report = {}
+        for name, batcher in self.batchers.items():
+            latencies = np.array(self.latencies[name]) * 1000
+            sizes = np.array(batcher.batch_sizes)
+            entry = {"requests": int(len(latencies)), "batches": int(len(sizes))}
+            if len(latencies):
+                p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+                entry.update({"p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": latencies.max()})
+            if len(sizes):
+                entry.update({"mean_batch": sizes.mean(), "max_batch": int(sizes.max())})
+            report[name] = {key: float(value) if isinstance(value, np.floating) else value
+                            for key, value in entry.items()}
+        return report
+
+    async def handle(self, method, path, params):
+        """
+        Route one request and return (status, body).
+        """
+        if path == "/health":
+            return 200, {"status": "ok", "divisions": list(self.frames), "engines": list(self.batchers)}
+        if path == "/stats":
+            return 200, self.stats()
+
+        engine = path.strip("/")
+        if engine not in self.batchers:
+            return 404, {"error": f"Unknown endpoint '{path}'."}
+        if not params.get("division") or not params.get("fighter1") or not params.get("fighter2"):
+            return 400, {"error": "Expected 'division', 'fighter1' and 'fighter2'."}
+
+        start = time.perf_counter()
+        result = await self.batchers[engine].submit(params)
+        self.latencies[engine].append(time.perf_counter() - start)
+        status = result.pop("status", 200)
+        return status, result
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                body = b""
+                if int(headers.get("content-length", 0)):
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                url = urlsplit(target)
+                params = dict(parse_qsl(url.query))
+                try:
+                    params.update(json.loads(body) if body else {})
+                except ValueError:
+                    status, payload = 400, {"error": "Request body is not valid JSON."}
+                else:
+                    try:
+                        status, payload = await self.handle(method, url.path, params)
+                    except Exception as error:
+                        status, payload = 500, {"error": str(error)}
+
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        tasks = [asyncio.create_task(batcher.run()) for batcher in self.batchers.values()]
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Prediction service listening on http://{host}:{port} "
+              f"(endpoints: /{', /'.join(self.batchers)}, /stats, /health)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fight predictions over HTTP on localhost.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="largest micro-batch")
+    parser.add_argument("--max-delay-ms", type=float, default=0.0,
+                        help="extra time to wait for requests to join a batch")
+    parser.add_argument("--no-ml", action="store_true", help="skip loading the machine learning models")
+    args = parser.parse_args()
+
+    service = PredictionService(args.folder, load_models=not args.no_ml,
+                                max_batch=args.max_batch, max_delay=args.max_delay_ms / 1000)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Exiting service.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+
+from fighter_store import load_store, format_value, CHAMPION_RANK, FEATURES
+from name_index import NameIndex
+from tracing import traced
+
+RANKINGS_FILE = "ufcrankings.csv"
+# Snapshot store, kept next to the rankings csv file
+HISTORY_FOLDER = "rank_history"
+HISTORY_VERSION = 1
+
+# Row columns of the store, each an append-only binary file
+HISTORY_DTYPES = {
+    "snapshot": np.int32,
+    "division": np.int16,
+    "fighter": np.int32,
+    "rank": np.int16,
+    "change": np.int16,
+    "status": np.int8,
+}
+
+# Rank of a fighter listed without a numeric rank
+UNRANKED = -1
+
+# Decoded 'Rank Change' values: a move up or down, newly ranked ('NR') or interim champion
+STEADY, MOVED, NEW, INTERIM = range(4)
+STATUS_LABELS = ["", "moved", "NR", "interim"]
+
+POUND_FOR_POUND = "Pound_for_pound"
+
+_CHANGE_PATTERN = re.compile(r"(increased|decreased)\s*by\s*(\d+)", re.IGNORECASE)
+
+
+def division_key(label):
+    """
+    Turn a rankings division label into the division key of the stat files.
+
+    'Light Heavyweight' becomes 'Light_heavyweight' (as 'light_heavyweight_top15.csv'
+    does), "Men's Pound-for-PoundTop Rank" becomes 'Pound_for_pound' and
+    "Women's Flyweight" becomes 'Women_s_flyweight'.
+    """
+    label = re.sub(r"Top Rank$", "", label.strip())
+    label = re.sub(r"^Men's\s+", "", label)
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_").capitalize()
+
+
+def decode_rank(value):
+    """
+    Turn a rankings 'Rank' value into a number; the champion has rank 0.
+    """
+    value = value.strip()
+    if value.lower() in ("c", "champion"):
+        return CHAMPION_RANK
+    return int(value) if value.isdigit() else UNRANKED
+
+
+def decode_change(text):
+    """
+    Decode a 'Rank Change' value into (places moved up, status).
+
+    'Rank increased by1' is (1, MOVED), 'Rank decreased by2' is (-2, MOVED),
+    'NR' is (0, NEW) and 'interim' is (0, INTERIM).
+    """
+    text = text.strip()
+    match = _CHANGE_PATTERN.search(text)
+    if match:
+        places = int(match.group(2))
+        return (places if match.group(1).lower() == "increased" else -places), MOVED
+    if text.upper() == "NR":
+        return 0, NEW
+    if text.lower() == "interim":
+        return 0, INTERIM
+    return 0, STEADY
+
+
+class RankHistory:
+    """
+    Append-only columnar store of rankings snapshots.
+
+    Every scrape adds one snapshot: its rows are appended to one binary file
+    per column (snapshot, division, fighter, rank, change, status), with
+    divisions and fighter names as codes into tables in the manifest. The
+    manifest, written last, holds the row count of every snapshot, so rows
+    past it (from an interrupted append) are ignored and overwritten.
+    """
+
+    def __init__(self, folder=HISTORY_FOLDER):
+        self.folder = folder
+        self.divisions = []
+        self.names = []
+        self.snapshots = []
+        self._division_codes = {}
+        self._fighter_codes = {}
+        self._name_index = None
+        self._joins = {}
+
+        manifest = self._read_manifest()
+        if manifest is not None:
+            self.divisions = manifest["divisions"]
+            self.names = manifest["names"]
+            self.snapshots = manifest["snapshots"]
+        self._division_codes = {label: code for code, label in enumerate(self.divisions)}
+        self._fighter_codes = {name: code for code, name in enumerate(self.names)}
+        self.columns = self._read_columns()
+        self.keys = [division_key(label) for label in self.divisions]
+
+    def __len__(self):
+        return len(self.columns["snapshot"])
+
+    def snapshot_slice(self, snapshot=-1):
+        """
+        Return the row slice holding a snapshot (the latest by default).
+        """
+        snapshot = range(len(self.snapshots))[snapshot]
+        start = self.snapshots[snapshot - 1]["end"] if snapshot else 0
+        return slice(start, self.snapshots[snapshot]["end"])
+
+    @traced("record_snapshot")
+    def record(self, rankings=RANKINGS_FILE, when=None):
+        """
+        Append the rows of a rankings csv file as a new snapshot.
+
+        Returns the snapshot number, or None when the file is identical to the
+        latest snapshot.
+        """
+        with open(rankings, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        if self.snapshots and self.snapshots[-1]["sha1"] == digest:
+            return None
+
+        with open(rankings, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        snapshot = len(self.snapshots)
+        new = {name: np.empty(len(rows), dtype) for name, dtype in HISTORY_DTYPES.items()}
+        new["snapshot"][:] = snapshot
+        for i, row in enumerate(rows):
+            new["division"][i] = self._code(self._division_codes, self.divisions, row["Division"])
+            new["fighter"][i] = self._code(self._fighter_codes, self.names, row["Name"])
+            new["rank"][i] = decode_rank(row["Rank"])
+            new["change"][i], new["status"][i] = decode_change(row.get("Rank Change") or "")
+
+        # Drop rows of an interrupted append, then append; the manifest commits them
+        os.makedirs(self.folder, exist_ok=True)
+        committed = len(self)
+        for name, dtype in HISTORY_DTYPES.items():
+            with open(self._column_file(name), "ab") as f:
+                f.truncate(committed * np.dtype(dtype).itemsize)
+                f.write(new[name].tobytes())
+        self.snapshots.append({
+            "time": time.time() if when is None else when,
+            "sha1": digest,
+            "source": os.path.basename(rankings),
+            "end": committed + len(rows),
+        })
+        self._write_manifest()
+
+        self.columns = {name: np.concatenate((self.columns[name], new[name])) for name in HISTORY_DTYPES}
+        self.keys = [division_key(label) for label in self.divisions]
+        self._name_index = None
+        return snapshot
+
+    def fighter_code(self, name):
+        """
+        Return the code of a fighter name (exact or surname match), or None.
+        """
+        if self._name_index is None:
+            self._name_index = NameIndex(self.names)
+        match = self._name_index.lookup(name)
+        return None if match is None else match[1]
+
+    def trajectory(self, name, division=None):
+        """
+        Return a fighter's rank in every snapshot as a list of dicts, oldest
+        first; `division` is a division key such as 'Lightweight' or 'Pound_for_pound'.
+        """
+        code = self.fighter_code(name)
+        if code is None:
+            return []
+        rows = np.flatnonzero(self.columns["fighter"] == code)
+        if division is not None:
+            rows = rows[[self.keys[d] == division for d in self.columns["division"][rows]]]
+        return [self._describe(row) for row in rows]
+
+    def movers(self, days=7):
+        """
+        Return the fighters whose rank changed over the last `days` days.
+
+        The latest snapshot is compared with the newest snapshot taken at least
+        `days` earlier (or the oldest one). With a single snapshot, the changes
+        reported in its 'Rank Change' column are used.
+        """
+        if not self.snapshots:
+            return []
+        latest = self.snapshot_slice()
+        cutoff = self.snapshots[-1]["time"] - days * 86400
+        older = [i for i, meta in enumerate(self.snapshots[:-1]) if meta["time"] <= cutoff]
+        baseline = older[-1] if older else 0
+        if baseline == len(self.snapshots) - 1:
+            rows = latest.start + np.flatnonzero(self.columns["status"][latest] != STEADY)
+            return [self._describe(row) for row in rows if self.columns["status"][row] != INTERIM]
+
+        # Pair the rows of both snapshots by (division, fighter)
+        pairs = self._pairs()
+        before = self.snapshot_slice(baseline)
+        old_ranks = dict(zip(pairs[before].tolist(), self.columns["rank"][before].tolist()))
+        moved = []
+        for row in range(latest.start, latest.stop):
+            entry = self._describe(row)
+            old = old_ranks.get(int(pairs[row]))
+            if old is None:
+                entry["Change"], entry["Status"] = 0, STATUS_LABELS[NEW]
+            elif old != entry["Rank"] and UNRANKED not in (old, entry["Rank"]):
+                entry["Change"], entry["Status"] = old - entry["Rank"], STATUS_LABELS[MOVED]
+            else:
+                continue
+            moved.append(entry)
+        return moved
+
+    def join(self, store):
+        """
+        Return the stats row (global row of `store`) of every ranking row, or
+        -1 where the fighter has no stats in that division.
+
+        Fighters are matched on the exact name or the surname only, never the
+        closest name, so a ranked fighter without stats is not joined to
+        another fighter. Pound-for-pound rows are matched in any division.
+        Each distinct (division, fighter) pair is looked up once per store version.
+        """
+        pairs = self._pairs()
+        unique, inverse = np.unique(pairs, return_inverse=True)
+        known = self._joins.get(store.fingerprint, {})
+        for pair in unique.tolist():
+            if pair not in known:
+                division, fighter = divmod(pair, 1 << 32)
+                known[pair] = self._stats_row(store, self.keys[division], self.names[fighter])
+        self._joins = {store.fingerprint: known}
+        return np.array([known[pair] for pair in unique.tolist()], dtype=np.int64)[inverse]
+
+    def joined(self, store, snapshot=-1):
+        """
+        Return the rows of a snapshot with the stats of every matched fighter, as a list of dicts.
+        """
+        rows = self.snapshot_slice(snapshot)
+        stats_rows = self.join(store)[rows]
+        entries = []
+        for row, stats_row in zip(range(rows.start, rows.stop), stats_rows.tolist()):
+            entry = self._describe(row)
+            if stats_row >= 0:
+                entry["Stats Division"] = store.divisions[store.columns["Division"][stats_row]]
+                entry.update({feature: store.columns[feature][stats_row] for feature in FEATURES})
+            entries.append(entry)
+        return entries
+
+    def _stats_row(self, store, key, name):
+        if key == POUND_FOR_POUND or key.endswith("_" + POUND_FOR_POUND.lower()):
+            match = store.name_index.lookup(name, fuzzy=False)
+        elif key in store.divisions:
+            match = store.name_index.lookup(name, key, fuzzy=False)
+        else:
+            match = None
+        return -1 if match is None else match[1]
+
+    def _pairs(self):
+        # One int64 per (division, fighter), stable as the code tables grow
+        return (self.columns["division"].astype(np.int64) << 32) | self.columns["fighter"]
+
+    def _describe(self, row):
+        snapshot = int(self.columns["snapshot"][row])
+        return {
+            "Time": datetime.fromtimestamp(self.snapshots[snapshot]["time"]).isoformat(timespec="seconds"),
+            "Division": self.keys[self.columns["division"][row]],
+            "Name": self.names[self.columns["fighter"][row]],
+            "Rank": int(self.columns["rank"][row]),
+            "Change": int(self.columns["change"][row]),
+            "Status": STATUS_LABELS[self.columns["status"][row]],
+        }
+
+    @staticmethod
+    def _code(codes, table, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def _column_file(self, name):
+        return os.path.join(self.folder, f"{name}.bin")
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.folder, "manifest.json"), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != HISTORY_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self):
+        manifest = {"version": HISTORY_VERSION, "divisions": self.divisions, "names": self.names,
+                    "snapshots": self.snapshots}
+        path = os.path.join(self.folder, "manifest.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _read_columns(self):
+        rows = self.snapshots[-1]["end"] if self.snapshots else 0
+        if not rows:
+            return {name: np.empty(0, dtype) for name, dtype in HISTORY_DTYPES.items()}
+        return {name: np.fromfile(self._column_file(name), dtype=dtype, count=rows)
+                for name, dtype in HISTORY_DTYPES.items()}
+
+
+def history_folder(rankings=RANKINGS_FILE):
+    """
+    Return the snapshot store folder of a rankings csv file.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(rankings)), HISTORY_FOLDER)
+
+
+def format_rank(rank):
+    return "NR" if rank == UNRANKED else format_value("Rank", rank)
+
+
+def format_change(entry):
+    if entry["Status"] == STATUS_LABELS[MOVED]:
+        return f"{entry['Change']:+d}"
+    return entry["Status"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History of the UFC rankings, one snapshot per scrape.")
+    parser.add_argument("--rankings", default=RANKINGS_FILE, help="rankings csv file")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("record", help="add the rankings csv file as a snapshot")
+    trajectory = commands.add_parser("trajectory", help="rank of a fighter in every snapshot")
+    trajectory.add_argument("name")
+    trajectory.add_argument("--division", help="division key, such as Lightweight or Pound_for_pound")
+    movers = commands.add_parser("movers", help="fighters whose rank changed recently")
+    movers.add_argument("--days", type=float, default=7, help="length of the period (default: 7)")
+    commands.add_parser("join", help="latest rankings with the stats of every fighter")
+    args = parser.parse_args()
+
+    history = RankHistory(history_folder(args.rankings))
+
+    if args.command == "record":
+        snapshot = history.record(args.rankings)
+        if snapshot is None:
+            print(f"'{args.rankings}' is unchanged since the latest snapshot.")
+        else:
+            rows = history.snapshot_slice()
+            print(f"Recorded snapshot {snapshot} ({rows.stop - rows.start} rows, {len(history)} in total).")
+        return
+
+    if not history.snapshots:
+        print(f"No snapshots yet; run '{parser.prog} record' after scraping.")
+        return
+
+    if args.command == "trajectory":
+        entries = history.trajectory(args.name, args.division)
+        if not entries:
+            print(f"'{args.name}' is not in the rank history.")
+        for entry in entries:
+            print(f"{entry['Time']:<22}{entry['Division']:<26}{format_rank(entry['Rank']):>4}  {format_change(entry)}")
+    elif args.command == "movers":
+        entries = history.movers(args.days)
+        if not entries:
+            print("No rank changes.")
+        for entry in entries:
+            print(f"{entry['Division']:<26}{entry['Name']:<26}{format_rank(entry['Rank']):>4}  {format_change(entry)}")
+    else:
+        store = load_store(args.folder)
+        print(f"{'Division':<26}{'Rank':>4}  {'Name':<26}{'Stats Division':<20}"
+              + "".join(f"{feature:>11}" for feature in FEATURES))
+        for entry in history.joined(store):
+            stats = "".join(f"{format_value(feature, entry[feature]):>11}" for feature in FEATURES
+                            ) if "Stats Division" in entry else ""
+            print(f"{entry['Division']:<26}{format_rank(entry['Rank']):>4}  {entry['Name']:<26}"
+                  f"{entry.get('Stats Division', '-'):<20}{stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import CACHE_FOLDER
+from name_index import normalize_name
+from tracing import traced
+
+# Fight history: one fight per line (date,winner,loser,method), oldest first
+HISTORY_FILE = "fight_history.csv"
+HISTORY_COLUMNS = ["date", "winner", "loser", "method"]
+CHECKPOINT_FILE = "ratings.npz"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_EVERY = 50_000
+
+# Columns added to fighter frames by with_ratings
+RATING_COLUMNS = ["Elo", "Glicko"]
+
+ELO_START = 1500.0
+ELO_K = 32.0
+
+# Glicko-2 (Glickman, "Example of the Glicko-2 system"); every fight is its own rating period
+GLICKO_START = 1500.0
+GLICKO_RD_START = 350.0
+GLICKO_VOLATILITY_START = 0.06
+GLICKO_TAU = 0.5
+GLICKO_SCALE = 173.7178
+# Rating deviation grows with inactivity, one Glicko-2 period per this many days
+GLICKO_PERIOD_DAYS = 180
+GLICKO_TOLERANCE = 1e-6
+
+NO_CONTEST = {"nc", "no contest", "overturned"}
+
+
+def _result(method):
+    # Score of the listed winner: 1 for a win, 0.5 for a draw, None for a no contest
+    method = method.strip().lower()
+    if method in NO_CONTEST:
+        return None
+    return 0.5 if method.startswith("draw") else 1.0
+
+
+def _volatility(phi, sigma, delta, v):
+    """
+    New Glicko-2 volatility, by the Illinois algorithm of step 5.
+    """
+    a = math.log(sigma * sigma)
+    phi2 = phi * phi
+    delta2 = delta * delta
+    tau2 = GLICKO_TAU * GLICKO_TAU
+
+    def f(x):
+        ex = math.exp(x)
+        return ex * (delta2 - phi2 - v - ex) / (2 * (phi2 + v + ex) ** 2) - (x - a) / tau2
+
+    low = a
+    if delta2 > phi2 + v:
+        high = math.log(delta2 - phi2 - v)
+    else:
+        k = 1
+        while f(a - k * GLICKO_TAU) < 0:
+            k += 1
+        high = a - k * GLICKO_TAU
+    f_low, f_high = f(low), f(high)
+    for _ in range(100):
+        if abs(high - low) <= GLICKO_TOLERANCE:
+            break
+        new = low + (low - high) * f_low / (f_high - f_low)
+        f_new = f(new)
+        if f_new * f_high <= 0:
+            low, f_low = high, f_high
+        else:
+            f_low /= 2
+        high, f_high = new, f_new
+    return math.exp(low / 2)
+
+
+class RatingEngine:
+    """
+    Elo and Glicko-2 ratings for every fighter in a fight history.
+
+    Fighters get an integer ID in order of first appearance; ratings live in
+    arrays indexed by that ID, so each fight updates two entries in constant
+    time. Arrays grow by doubling.
+    """
+
+    def __init__(self, capacity=1024):
+        self.names = []
+        self.ids = {}
+        # Raw spelling -> ID, so repeated names skip normalization
+        self._seen = {}
+        self.elo = np.full(capacity, ELO_START)
+        self.mu = np.zeros(capacity)
+        self.phi = np.full(capacity, GLICKO_RD_START / GLICKO_SCALE)
+        self.sigma = np.full(capacity, GLICKO_VOLATILITY_START)
+        self.fights = np.zeros(capacity, dtype=np.int32)
+        self.last_day = np.full(capacity, -1, dtype=np.int32)
+        # Position in the history file that has been ingested, and its last line
+        self.offset = 0
+        self.tail = b""
+        self.recorded = 0
+
+    def __len__(self):
+        return len(self.names)
+
+    def fighter_id(self, name, create=True):
+        """
+        Return the ID of a fighter (matched on the normalized name).
+        """
+        fighter = self._seen.get(name)
+        if fighter is not None:
+            return fighter
+        key = normalize_name(name)
+        fighter = self.ids.get(key)
+        if fighter is None:
+            if not create:
+                return None
+            fighter = len(self.names)
+            if fighter == len(self.elo):
+                self._grow()
+            self.ids[key] = fighter
+            self.names.append(str(name).strip())
+        self._seen[name] = fighter
+        return fighter
+
+    def _grow(self):
+        size = len(self.elo)
+        for name, fill in [("elo", ELO_START), ("mu", 0.0), ("phi", GLICKO_RD_START / GLICKO_SCALE),
+                           ("sigma", GLICKO_VOLATILITY_START), ("fights", 0), ("last_day", -1)]:
+            old = getattr(self, name)
+            grown = np.full(size * 2, fill, dtype=old.dtype)
+            grown[:size] = old
+            setattr(self, name, grown)
+
+    def record(self, day, winner, loser, method=""):
+        """
+        Apply one fight; day is a date.toordinal() number (or None).
+        """
+        score = _result(method)
+        self.recorded += 1
+        if score is None:
+            return
+        i = self.fighter_id(winner)
+        j = self.fighter_id(loser)
+        if i == j:
+            return
+
+        # Elo
+        expected = 1.0 / (1.0 + 10.0 ** ((self.elo[j] - self.elo[i]) / 400.0))
+        change = ELO_K * (score - expected)
+        self.elo[i] += change
+        self.elo[j] -= change
+
+        # Glicko-2: inflate both deviations for the time since their last fight
+        phis = []
+        for fighter in (i, j):
+            phi = self.phi[fighter]
+            if day is not None and self.last_day[fighter] >= 0 and day > self.last_day[fighter]:
+                periods = (day - self.last_day[fighter]) / GLICKO_PERIOD_DAYS
+                phi = min(math.sqrt(phi * phi + self.sigma[fighter] ** 2 * periods), GLICKO_RD_START / GLICKO_SCALE)
+            phis.append(phi)
+        mu_i, mu_j = self.mu[i], self.mu[j]
+        self._glicko(i, mu_i, phis[0], mu_j, phis[1], score)
+        self._glicko(j, mu_j, phis[1], mu_i, phis[0], 1.0 - score)
+
+        for fighter in (i, j):
+            self.fights[fighter] += 1
+            if day is not None:
+                self.last_day[fighter] = max(self.last_day[fighter], day)
+
+    def _glicko(self, fighter, mu, phi, opponent_mu, opponent_phi, score):
+        g = 1.0 / math.sqrt(1.0 + 3.0 * opponent_phi ** 2 / math.pi ** 2)
+        expected = 1.0 / (1.0 + math.exp(-g * (mu - opponent_mu)))
+        v = 1.0 / (g * g * expected * (1.0 - expected))
+        delta = v * g * (score - expected)
+        sigma = _volatility(phi, self.sigma[fighter], delta, v)
+        phi_star = math.sqrt(phi * phi + sigma * sigma)
+        new_phi = 1.0 / math.sqrt(1.0 / (phi_star * phi_star) + 1.0 / v)
+        self.mu[fighter] = mu + new_phi * new_phi * g * (score - expected)
+        self.phi[fighter] = new_phi
+        self.sigma[fighter] = sigma
+
+    @traced("ingest_history")
+    def ingest(self, path, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
+        """
+        Stream the fights of a history file that were not ingested yet.
+
+        Reading resumes at the saved offset, so only appended lines are
+        processed. With checkpoint, the state is saved there every
+        checkpoint_every fights and at the end. Returns the number of lines read.
+        """
+        read = 0
+        with open(path, "rb") as f:
+            if self.offset == 0:
+                header = f.readline()
+                if not header.lower().startswith(b"date"):
+                    f.seek(0)
+            else:
+                f.seek(self.offset)
+            for line in iter(f.readline, b""):
+                if not line.endswith(b"\n"):
+                    break  # A line still being written; pick it up next time
+                self.offset = f.tell()
+                self.tail = line
+                read += 1
+                fields = next(csv.reader([line.decode("utf-8")]), [])
+                if len(fields) < 3 or not fields[1].strip() or not fields[2].strip():
+                    continue
+                try:
+                    day = date.fromisoformat(fields[0].strip()).toordinal()
+                except ValueError:
+                    day = None
+                self.record(day, fields[1], fields[2], fields[3] if len(fields) > 3 else "")
+                if checkpoint and read % checkpoint_every == 0:
+                    self.save(checkpoint)
+            if not read and self.offset == 0:
+                self.offset = f.tell()
+        if checkpoint and read:
+            self.save(checkpoint)
+        return read
+
+    def resumable(self, path):
+        """
+        True when the history file still starts with what was ingested.
+        """
+        try:
+            if os.path.getsize(path) < self.offset:
+                return False
+            with open(path, "rb") as f:
+                f.seek(self.offset - len(self.tail))
+                return f.read(len(self.tail)) == self.tail
+        except OSError:
+            return False
+
+    @property
+    def fingerprint(self):
+        """
+        Identifies the ingested history (used in the model cache key).
+        """
+        return hashlib.sha1(f"{self.offset}:{self.recorded}:".encode("utf-8") + self.tail).hexdigest()
+
+    def save(self, path):
+        """
+        Write a checkpoint of every array and the ingest position.
+        """
+        n = len(self)
+        meta = {"version": CHECKPOINT_VERSION, "offset": self.offset, "recorded": self.recorded,
+                "tail": self.tail.decode("utf-8", "replace")}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, names=np.array(self.names, dtype=str), meta=np.array(json.dumps(meta)),
+                     elo=self.elo[:n], mu=self.mu[:n], phi=self.phi[:n], sigma=self.sigma[:n],
+                     fights=self.fights[:n], last_day=self.last_day[:n])
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore an engine from a checkpoint, or return None if it is unusable.
+        """
+        try:
+            with np.load(path) as saved:
+                meta = json.loads(str(saved["meta"]))
+                if meta.get("version") != CHECKPOINT_VERSION:
+                    return None
+                names = [str(name) for name in saved["names"]]
+                engine = cls(max(1024, 2 * len(names)))
+                n = len(names)
+                for name in ("elo", "mu", "phi", "sigma", "fights", "last_day"):
+                    getattr(engine, name)[:n] = saved[name]
+        except (OSError, ValueError, KeyError):
+            return None
+        engine.names = names
+        engine.ids = {normalize_name(name): i for i, name in enumerate(names)}
+        engine.offset = meta["offset"]
+        engine.recorded = meta["recorded"]
+        engine.tail = meta["tail"].encode("utf-8")
+        return engine
+
+    def lookup(self, names):
+        """
+        Return (elo, glicko) arrays for a sequence of names; fighters without
+        a recorded fight get the starting ratings.
+        """
+        ids = np.array([self.ids.get(normalize_name(name), -1) for name in names], dtype=np.int64)
+        known = ids >= 0
+        elo = np.full(len(ids), ELO_START)
+        glicko = np.full(len(ids), GLICKO_START)
+        elo[known] = self.elo[ids[known]]
+        glicko[known] = GLICKO_START + GLICKO_SCALE * self.mu[ids[known]]
+        return elo, glicko
+
+    def rating(self, name):
+        """
+        Return one fighter's ratings as a dict, or None if unknown.
+        """
+        fighter = self.fighter_id(name, create=False)
+        if fighter is None:
+            return None
+        return {
+            "Fighter": self.names[fighter],
+            "Elo": float(self.elo[fighter]),
+            "Glicko": float(GLICKO_START + GLICKO_SCALE * self.mu[fighter]),
+            "Glicko RD": float(GLICKO_SCALE * self.phi[fighter]),
+            "Volatility": float(self.sigma[fighter]),
+            "Fights": int(self.fights[fighter]),
+            "Last Fight": date.fromordinal(int(self.last_day[fighter])).isoformat()
+            if self.last_day[fighter] > 0 else None,
+        }
+
+    def table(self):
+        """
+        Every fighter's ratings as a DataFrame, best Glicko rating first.
+        """
+        n = len(self)
+        return pd.DataFrame({
+            "Fighter": self.names,
+            "Elo": self.elo[:n],
+            "Glicko": GLICKO_START + GLICKO_SCALE * self.mu[:n],
+            "Glicko RD": GLICKO_SCALE * self.phi[:n],
+            "Fights": self.fights[:n],
+        }).sort_values("Glicko", ascending=False, ignore_index=True)
+
+
+_loaded = {}
+
+
+def load_ratings(folder="ufc_stats", history=None, rebuild=False):
+    """
+    Return the rating engine for a folder's fight history, or None without one.
+
+    The checkpoint in the cache folder is restored and only fights appended
+    since are ingested; a rewritten history is ingested from the start.
+    """
+    history = history or os.path.join(folder, HISTORY_FILE)
+    if not os.path.exists(history):
+        return None
+    checkpoint = os.path.join(folder, CACHE_FOLDER, CHECKPOINT_FILE)
+    key = os.path.abspath(history)
+
+    engine = None if rebuild else _loaded.get(key) or RatingEngine.load(checkpoint)
+    if engine is None or not engine.resumable(history):
+        engine = RatingEngine()
+    engine.ingest(history, checkpoint)
+    _loaded[key] = engine
+    return engine
+
+
+def with_ratings(df, engine):
+    """
+    Return a copy of a fighter frame with 'Elo' and 'Glicko' columns.
+    """
+    df = df.copy()
+    df["Elo"], df["Glicko"] = engine.lookup(df["Fighter Name"])
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Elo and Glicko-2 ratings from a fight history.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder holding the data and cache")
+    parser.add_argument("--history", help=f"fight history csv (default: FOLDER/{HISTORY_FILE})")
+    parser.add_argument("--fighter", help="show one fighter's ratings")
+    parser.add_argument("--top", type=int, default=20, help="number of fighters to list")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the checkpoint and ingest everything")
+    args = parser.parse_args()
+
+    engine = load_ratings(args.folder, args.history, args.rebuild)
+    if engine is None:
+        print(f"No fight history found; expected a csv with columns {','.join(HISTORY_COLUMNS)} "
+              f"at '{args.history or os.path.join(args.folder, HISTORY_FILE)}'.")
+        return
+
+    print(f"{engine.recorded} fights, {len(engine)} fighters rated.")
+    if args.fighter:
+        rating = engine.rating(args.fighter)
+        print(rating if rating else f"No fights recorded for '{args.fighter}'.")
+        return
+    print(engine.table().head(args.top).to_string(index=False, float_format="{:.1f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,171 @@
-import statsmodels.api as sm
+import hashlib
+
+import numpy as np
 import pandas as pd
 
-def run_regression(data, x_metric, y_metric, division=None):
-    filtered_data = data if division is None else data[data["Division"] == division]
+from fighter_store import FEATURES, frame_cache
+from loadData import ALL_DIVISIONS, partition_divisions
+
+REGRESSION_METRICS = ["Rank"] + FEATURES + ["Outcome"]
+
+_regression_tables = {}
+
+
+def data_hash(data, metrics=REGRESSION_METRICS):
+    """
+    Hash the metric columns and divisions of a frame.
+    """
+    columns = [m for m in metrics if m in data.columns] + ["Division"]
+    hashed = pd.util.hash_pandas_object(data[columns], index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes() + "|".join(columns).encode("utf-8")).hexdigest()
+
+
+def pairwise_regressions(values):
+    """
+    Fit y = intercept + slope * x for every ordered pair of columns at once.
+
+    values is an n x m array. Returns a dict of m x m arrays indexed [x, y]
+    ('Slope', 'Intercept', 'R-squared', 'P-value', 'Slope SE', 'Intercept SE').
+    """
+    from scipy import stats
+
+    n = len(values)
+    means = values.mean(axis=0)
+    centered = values - means
+    cross = centered.T @ centered
+    sxx = np.diag(cross)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = cross / sxx[:, None]
+        intercept = means[None, :] - slope * means[:, None]
+        r_squared = cross ** 2 / (sxx[:, None] * sxx[None, :])
+        residual_variance = sxx[None, :] * (1 - r_squared) / (n - 2)
+        slope_se = np.sqrt(residual_variance / sxx[:, None])
+        intercept_se = np.sqrt(residual_variance * (1 / n + means[:, None] ** 2 / sxx[:, None]))
+        t_values = slope / slope_se
+    p_values = 2 * stats.t.sf(np.abs(t_values), n - 2) if n > 2 else np.full_like(slope, np.nan)
+
+    return {
+        "Slope": slope,
+        "Intercept": intercept,
+        "R-squared": r_squared,
+        "P-value": p_values,
+        "Slope SE": slope_se,
+        "Intercept SE": intercept_se,
+    }
+
+
+def regression_table(data, metrics=REGRESSION_METRICS):
+    """
+    Regress every metric on every other metric, per division and for all divisions.
+
+    Results are memoized by data hash. Returns a DataFrame with one row per
+    (Division, X, Y).
+    """
+    return _regressions(data, metrics)[0]
+
+
+def _regressions(data, metrics):
+    metrics = [m for m in dict.fromkeys(metrics) if m in data.columns]
+    # Hash each frame only once; equal frames still share one table
+    key = frame_cache(data, ("regression_hash", tuple(metrics)), lambda df: data_hash(df, metrics))
+    if key in _regression_tables:
+        return _regression_tables[key]
+
+    partitions = partition_divisions(data)
+    groups = [(division, partitions.view(division)) for division in [ALL_DIVISIONS] + partitions.divisions]
+    x_index, y_index = np.meshgrid(np.arange(len(metrics)), np.arange(len(metrics)), indexing="ij")
+    x_index, y_index = x_index.ravel(), y_index.ravel()
+    off_diagonal = x_index != y_index
+    x_index, y_index = x_index[off_diagonal], y_index[off_diagonal]
+
+    frames = []
+    for division, group in groups:
+        fitted = pairwise_regressions(group[metrics].to_numpy(dtype=float))
+        frame = pd.DataFrame({
+            "Division": division,
+            "X": np.asarray(metrics)[x_index],
+            "Y": np.asarray(metrics)[y_index],
+            "N": len(group),
+        })
+        for name, values in fitted.items():
+            frame[name] = values[x_index, y_index]
+        frames.append(frame)
+
+    table = pd.concat(frames, ignore_index=True)
+    lookup = {
+        (row["Division"], row["X"], row["Y"]): row
+        for row in table.to_dict("records")
+    }
+    _regression_tables[key] = (table, lookup)
+    return table, lookup
+
+
+def _metrics_for(data, x_metric, y_metric):
+    # Numeric metrics outside the default set get their own (memoized) table;
+    # text columns are left out, so they find no regression
+    extra = [m for m in (x_metric, y_metric)
+             if m not in REGRESSION_METRICS and m in data.columns and pd.api.types.is_numeric_dtype(data[m])]
+    return REGRESSION_METRICS + list(dict.fromkeys(extra))
+
+
+def run_regression(data, x_metric, y_metric, division=None, full_summary=False):
+    """
+    Regress y_metric on x_metric, answered from the memoized batch table.
+
+    With full_summary the statsmodels OLS summary is printed as well, and the
+    fitted statsmodels model is returned instead of the table row.
+    """
+    if full_summary:
+        import statsmodels.api as sm
+
+        filtered_data = partition_divisions(data).view(division)
+        X = sm.add_constant(filtered_data[x_metric])  # Add constant term for intercept
+        model = sm.OLS(filtered_data[y_metric], X).fit()
+        print(model.summary())
+        return model
+
+    _, lookup = _regressions(data, _metrics_for(data, x_metric, y_metric))
+    result = lookup.get((division or ALL_DIVISIONS, x_metric, y_metric))
+    if result is None:
+        print("Regression not available for that metric and division combination.")
+        return None
+
+    print(f"\nRegression of {y_metric} on {x_metric} ({division or 'all divisions'}, n = {result['N']})")
+    print(f"{'Term':<12}{'Coefficient':>14}{'Std. Error':>14}")
+    print(f"{'Intercept':<12}{result['Intercept']:>14.4f}{result['Intercept SE']:>14.4f}")
+    print(f"{x_metric:<12}{result['Slope']:>14.4f}{result['Slope SE']:>14.4f}")
+    print(f"R-squared: {result['R-squared']:.4f}")
+    print(f"P-value (slope): {result['P-value']:.4g}")
+    return result
+
+
+def plot_regression(data, x_metric, y_metric, division=None, headless=False, image_format="png"):
+    """
+    Scatter y_metric against x_metric with the fitted line from the memoized table.
+
+    With headless the plot is not shown; its image bytes are returned instead.
+    """
+    from plot_output import new_figure, show_or_render
 
-    X = filtered_data[x_metric]
-    y = filtered_data[y_metric]
+    _, lookup = _regressions(data, _metrics_for(data, x_metric, y_metric))
+    result = lookup.get((division or ALL_DIVISIONS, x_metric, y_metric))
+    if result is None:
+        print("Regression not available for that metric and division combination.")
+        return None
 
-    X = sm.add_constant(X)  # Add constant term for intercept
-    model = sm.OLS(y, X).fit()
+    subset = partition_divisions(data).view(division)
+    x_values = subset[x_metric].to_numpy(dtype=float)
+    line_x = np.array([np.nanmin(x_values), np.nanmax(x_values)])
 
-    print(model.summary())
-    return model
\ No newline at end of file
+    fig = new_figure((10, 6), headless)
+    ax = fig.add_subplot()
+    ax.scatter(x_values, subset[y_metric], alpha=0.7)
+    ax.plot(line_x, result["Intercept"] + result["Slope"] * line_x, color="red",
+            label=f"y = {result['Intercept']:.3f} + {result['Slope']:.3f}x (R² = {result['R-squared']:.3f})")
+    ax.set_title(f"Regression of {y_metric} on {x_metric} ({division or 'all divisions'})")
+    ax.set_xlabel(x_metric)
+    ax.set_ylabel(y_metric)
+    ax.legend()
+    ax.grid()
+    return show_or_render(fig, headless, image_format)
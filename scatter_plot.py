@@ -1,16 +1,25 @@
-import matplotlib.pyplot as plt
+from loadData import partition_divisions
+from plot_output import new_figure, show_or_render
 
-def plot_scatter(data, x_metric, y_metric, division=None):
-    filtered_data = data if division is None else data[data["Division"] == division]
+def plot_scatter(data, x_metric, y_metric, division=None, headless=False, image_format="png"):
+    """
+    Scatter two metrics, one colour per division.
 
-    plt.figure(figsize=(10, 6))
-    for div in filtered_data["Division"].unique():
-        subset = filtered_data[filtered_data["Division"] == div]
-        plt.scatter(subset[x_metric], subset[y_metric], label=div)
+    With headless the plot is not shown; its image bytes are returned instead.
+    """
+    partitions = partition_divisions(data)
+    divisions = partitions.divisions if division is None else [division]
 
-    plt.title(f"Scatter Plot: {x_metric} vs {y_metric}")
-    plt.xlabel(x_metric)
-    plt.ylabel(y_metric)
-    plt.legend(title="Division")
-    plt.grid()
-    plt.show()
\ No newline at end of file
+    fig = new_figure((10, 6), headless)
+    ax = fig.add_subplot()
+    for div in divisions:
+        subset = partitions.view(div)
+        if len(subset):
+            ax.scatter(subset[x_metric], subset[y_metric], label=div)
+
+    ax.set_title(f"Scatter Plot: {x_metric} vs {y_metric}")
+    ax.set_xlabel(x_metric)
+    ax.set_ylabel(y_metric)
+    ax.legend(title="Division")
+    ax.grid()
+    return show_or_render(fig, headless, image_format)
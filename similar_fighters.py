@@ -0,0 +1,144 @@
+import argparse
+import time
+
+import numpy as np
+
+from fighter_store import load_store, FEATURES
+
+# Name of the view over every division
+GLOBAL_VIEW = "All"
+
+SIMILARITY_ARTIFACT = "similar_fighters"
+
+
+def build_view(X, sha1):
+    """
+    Standardize a feature matrix and build a KD-tree over it.
+    """
+    from scipy.spatial import cKDTree
+
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    return {"sha1": sha1, "mean": mean, "scale": scale, "tree": cKDTree((X - mean) / scale)}
+
+
+def build_views(store, previous=None):
+    """
+    Build one view per division plus the global view.
+
+    Division views whose file did not change are taken from `previous`.
+    """
+    previous = previous or {}
+    views = {}
+    for division in store.divisions:
+        sha1 = store.division_hash(division)
+        old = previous.get(division)
+        if old is not None and old["sha1"] == sha1:
+            views[division] = old
+        else:
+            views[division] = build_view(_features(store, store.division_slice(division)), sha1)
+
+    old = previous.get(GLOBAL_VIEW)
+    if old is not None and old["sha1"] == store.fingerprint:
+        views[GLOBAL_VIEW] = old
+    else:
+        views[GLOBAL_VIEW] = build_view(_features(store, slice(None)), store.fingerprint)
+    return views
+
+
+def _features(store, rows):
+    return np.column_stack([np.asarray(store.columns[f][rows], dtype=float) for f in FEATURES])
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour search over standardized fighter features, per division
+    and across all divisions.
+
+    Features are standardized with the statistics of the view being searched,
+    so distances are in standard deviations of that division (or of every
+    fighter for the global view).
+    """
+
+    def __init__(self, store, views):
+        self.store = store
+        self.views = views
+
+    def query(self, vector, k=5, view=GLOBAL_VIEW):
+        """
+        Return [(row, distance)] for the k fighters closest to a raw feature
+        vector (FEATURES order); rows are store rows.
+        """
+        entry = self.views[view]
+        k = min(k, entry["tree"].n)
+        point = (np.asarray(vector, dtype=float) - entry["mean"]) / entry["scale"]
+        distances, positions = entry["tree"].query(point, k)
+        offset = 0 if view == GLOBAL_VIEW else self.store.division_slice(view).start
+        return [(offset + int(p), float(d)) for p, d in zip(np.atleast_1d(positions), np.atleast_1d(distances))]
+
+    def similar(self, name, k=5, within_division=False, division=None):
+        """
+        Return the k fighters most similar to a fighter as a list of
+        (name, division, distance), or None if the fighter is not found.
+
+        The fighter is looked up in `division` when given; within_division
+        restricts the search to the fighter's own division.
+        """
+        match = self.store.name_index.lookup(name, division)
+        if match is None:
+            return None
+        fighter_division, row = match
+        view = fighter_division if within_division else GLOBAL_VIEW
+
+        vector = _features(self.store, slice(row, row + 1))[0]
+        names = self.store.columns["Fighter Name"]
+        codes = self.store.columns["Division"]
+        results = []
+        for neighbour, distance in self.query(vector, k + 1, view):
+            if neighbour != row:
+                results.append((str(names[neighbour]), self.store.divisions[codes[neighbour]], distance))
+        return results[:k]
+
+
+def load_index(store):
+    """
+    Return the similarity index of a store, loading it from the cache folder.
+
+    Only the views of divisions whose file changed (and the global view) are
+    rebuilt.
+    """
+    views = store.load_artifact(SIMILARITY_ARTIFACT, build_views, update=build_views)
+    return SimilarityIndex(store, views)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the fighters who statistically resemble a fighter.")
+    parser.add_argument("name", help="fighter name, e.g. 'Islam Makhachev'")
+    parser.add_argument("-k", type=int, default=5, help="number of similar fighters")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--division", help="division to look the fighter up in")
+    parser.add_argument("--within-division", action="store_true", help="only search the fighter's division")
+    args = parser.parse_args()
+
+    store = load_store(args.folder)
+    index = load_index(store)
+    # Load the name index before timing the query
+    name_index = store.name_index
+    division = args.division.capitalize() if args.division else None
+
+    start = time.perf_counter()
+    results = index.similar(args.name, args.k, args.within_division, division)
+    elapsed = (time.perf_counter() - start) * 1e6
+    if results is None:
+        print(f"Fighter '{args.name}' not found. Did you mean: {', '.join(name_index.suggest(args.name))}?")
+        return
+
+    print(f"\nFighters most similar to {args.name}:")
+    for name, fighter_division, distance in results:
+        print(f"  {name:<28}{fighter_division:<22}{distance:.3f}")
+    print(f"\nQuery time: {elapsed:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import csv
+import math
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import CSV_COLUMNS, DIVISION_SUFFIX
+
+DIVISIONS = [
+    "flyweight", "bantamweight", "featherweight", "lightweight",
+    "welterweight", "middleweight", "light_heavyweight", "heavyweight",
+]
+
+# Keeps each division small enough for the all-pairs advantage matrix
+MAX_DIVISION_ROWS = 1000
+
+FIRST_NAMES = [
+    "Alex", "Islam", "Jon", "Charles", "Dustin", "Max", "Sean", "Kamaru", "Israel", "Tom",
+    "Arman", "Justin", "Belal", "Leon", "Magomed", "Umar", "Merab", "Ilia", "Brandon", "Tai",
+]
+LAST_NAMES = [
+    "Silva", "Oliveira", "Jones", "Holloway", "Strickland", "Usman", "Adesanya", "Aspinall",
+    "Gaethje", "Muhammad", "Edwards", "Ankalaev", "Dvalishvili", "Topuria", "Moreno", "Pantoja",
+    "Nurmagomedov", "Poirier", "Chandler", "Fiziev",
+]
+RESULTS = ["W(DEC)", "L(DEC)", "W(KO)", "W(SUB)", "L(TKO)", "L(SUB)", "L(KO)", "W(TKO)", "W(SD)"]
+RESULT_SHARES = [0.22, 0.20, 0.13, 0.12, 0.11, 0.09, 0.08, 0.04, 0.01]
+METHODS = ["Decision", "KO/TKO", "Submission", "Draw", "NC"]
+METHOD_SHARES = [0.48, 0.31, 0.19, 0.01, 0.01]
+
+
+def division_names(count):
+    """
+    Return `count` division file stems, the real divisions first.
+    """
+    extra = [f"catchweight_{number:03d}" for number in range(1, count - len(DIVISIONS) + 1)]
+    return (DIVISIONS + extra)[:count]
+
+
+def _percents(rng, low, high, rows):
+    return [f"{value}%" for value in rng.integers(low, high + 1, rows)]
+
+
+def synthetic_division(rows, rng):
+    """
+    Build one division in the CSV schema: 'C' and numeric ranks, percent
+    strings and 'W(KO)'-style results.
+    """
+    first = rng.choice(FIRST_NAMES, rows)
+    last = rng.choice(LAST_NAMES, rows)
+    numbers = rng.permutation(rows * 10)[:rows]
+    return pd.DataFrame({
+        "Rank": ["C"] + [str(rank) for rank in range(1, rows)],
+        "Fighter Name": [f"{f} {l} {n}" for f, l, n in zip(first, last, numbers)],
+        "Age": rng.integers(22, 41, rows),
+        "Reach (in)": rng.integers(124, 169, rows) / 2,
+        "SLpM": np.round(rng.gamma(9.0, 0.45, rows), 2),
+        "Str. Acc.": _percents(rng, 35, 68, rows),
+        "SApM": np.round(rng.gamma(8.0, 0.38, rows), 2),
+        "Str. Def.": _percents(rng, 42, 70, rows),
+        "TD Avg.": np.round(rng.gamma(1.5, 1.1, rows), 2),
+        "TD Acc.": _percents(rng, 0, 75, rows),
+        "TD Def.": _percents(rng, 30, 100, rows),
+        "Sub. Avg.": np.round(rng.gamma(1.0, 0.6, rows), 1),
+        "Last Fight Result": rng.choice(RESULTS, rows, p=RESULT_SHARES),
+    }, columns=CSV_COLUMNS)
+
+
+def generate_roster(folder, rows, seed=42, max_division_rows=MAX_DIVISION_ROWS):
+    """
+    Write about `rows` fighters as *_top15.csv division files into folder.
+
+    Rows are split evenly over at least the 8 real divisions, adding
+    divisions so none holds more than max_division_rows fighters. Returns
+    the list of written paths.
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    count = max(len(DIVISIONS), math.ceil(rows / max_division_rows))
+    sizes = np.full(count, rows // count)
+    sizes[:rows % count] += 1
+
+    paths = []
+    for name, size in zip(division_names(count), sizes):
+        path = os.path.join(folder, f"{name}{DIVISION_SUFFIX}")
+        synthetic_division(max(int(size), 2), rng).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def generate_history(path, names, fights, seed=42, start=date(2000, 1, 1), chunk_size=100_000):
+    """
+    Write `fights` fights between the given fighters as a fight history csv
+    (date,winner,loser,method), oldest first.
+
+    Each fighter has a hidden skill and the more skilled fighter wins more
+    often, so ratings computed from the history are meaningful.
+    """
+    rng = np.random.default_rng(seed)
+    names = np.asarray(names)
+    skill = rng.normal(0.0, 1.0, len(names))
+    days = max(1, fights // 20)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "winner", "loser", "method"])
+        for first in range(0, fights, chunk_size):
+            count = min(chunk_size, fights - first)
+            a = rng.integers(0, len(names), count)
+            b = (a + rng.integers(1, len(names), count)) % len(names)
+            a_wins = rng.random(count) < 1.0 / (1.0 + np.exp(-(skill[a] - skill[b])))
+            winners = np.where(a_wins, a, b)
+            losers = np.where(a_wins, b, a)
+            offsets = (np.arange(first, first + count) * days) // fights
+            methods = rng.choice(METHODS, count, p=METHOD_SHARES)
+            writer.writerows(
+                ((start + timedelta(days=int(offset))).isoformat(), names[w], names[l], method)
+                for offset, w, l, method in zip(offsets, winners, losers, methods)
+            )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic roster in the division CSV schema.")
+    parser.add_argument("folder", help="folder to write the division files to")
+    parser.add_argument("--rows", type=int, default=10000, help="total number of fighters")
+    parser.add_argument("--fights", type=int, default=0, help="also write a fight history with this many fights")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    paths = generate_roster(args.folder, args.rows, args.seed)
+    print(f"Wrote {args.rows} fighters in {len(paths)} division files to '{args.folder}'.")
+    if args.fights:
+        from ratings import HISTORY_FILE
+
+        names = pd.concat([pd.read_csv(path, usecols=["Fighter Name"]) for path in paths])["Fighter Name"]
+        path = generate_history(os.path.join(args.folder, HISTORY_FILE), names, args.fights, args.seed)
+        print(f"Wrote {args.fights} fights to '{path}'.")
+
+
+if __name__ == "__main__":
+    main()
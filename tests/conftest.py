@@ -0,0 +1,50 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA_FOLDER = os.path.join(ROOT, "ufc_stats")
+RANKINGS_FILE = os.path.join(ROOT, "ufcrankings.csv")
+
+
+def copy_divisions(folder):
+    os.makedirs(folder, exist_ok=True)
+    for file in sorted(os.listdir(DATA_FOLDER)):
+        if file.endswith("_top15.csv"):
+            shutil.copy(os.path.join(DATA_FOLDER, file), os.path.join(folder, file))
+    return folder
+
+
+@pytest.fixture
+def roster(tmp_path):
+    """
+    A copy of the shipped division files in a fresh folder, without a cache.
+    """
+    return copy_divisions(str(tmp_path / "ufc_stats"))
+
+
+@pytest.fixture
+def rankings(tmp_path):
+    """
+    A copy of the shipped rankings csv file.
+    """
+    path = str(tmp_path / "ufcrankings.csv")
+    shutil.copy(RANKINGS_FILE, path)
+    return path
+
+
+@pytest.fixture
+def fight_history(roster):
+    """
+    A synthetic fight history between the roster's fighters, in the roster folder.
+    """
+    from fighter_store import load_store
+    from ratings import HISTORY_FILE
+    from synthetic_roster import generate_history
+
+    names = list(load_store(roster).columns["Fighter Name"])
+    return generate_history(os.path.join(roster, HISTORY_FILE), names, 2000)
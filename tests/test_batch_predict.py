@@ -0,0 +1,57 @@
+import itertools
+import json
+
+import pytest
+
+from batch_predict import division_key, predict_stream
+from prediction_service import PredictionService
+
+
+@pytest.fixture
+def service(roster):
+    return PredictionService(roster, load_models=False)
+
+
+def records(service, division):
+    names = service.frames[division]["Fighter Name"]
+    return [{"division": division, "fighter1": f1, "fighter2": f2} for f1, f2 in itertools.permutations(names, 2)]
+
+
+def test_results_match_the_service_engines(service):
+    items = records(service, "Lightweight") + records(service, "Heavyweight")
+    lines = [json.dumps(item) + "\n" for item in items]
+    results = list(predict_stream(service, lines, ["advantage", "weighted"], batch_size=37))
+    assert [result["line"] for result in results] == list(range(1, len(items) + 1))
+    assert [result["advantage"] for result in results] == service.score_advantage(items)
+    assert [result["weighted"] for result in results] == service.score_weighted(items)
+
+
+def test_bad_records_are_reported_in_place(service):
+    lines = [
+        '{"division": "light heavyweight", "fighter1": "Alex Pereira", "fighter2": "Magomed Ankalaev"}\n',
+        "\n",
+        "not json\n",
+        '{"division": "Lightweight", "fighter1": "Islam Makhachev"}\n',
+        '{"division": "Lightweight", "fighter1": "Islam Makhachev", "fighter2": "Nobody Here"}\n',
+    ]
+    results = list(predict_stream(service, lines, ["advantage"], batch_size=2))
+    assert [result["line"] for result in results] == [1, 3, 4, 5]
+    assert results[0]["advantage"]["fighter1"] == "Alex Pereira"
+    assert results[1]["error"] == "Line is not valid JSON."
+    assert results[2]["error"] == "Expected 'division', 'fighter1' and 'fighter2'."
+    assert results[3]["advantage"] == {"error": "One or both fighters not found in the division."}
+
+
+def test_input_is_read_as_a_stream(service):
+    def endless():
+        for _ in itertools.count():
+            yield '{"division": "Lightweight", "fighter1": "Islam Makhachev", "fighter2": "Charles Oliveira"}\n'
+
+    results = list(itertools.islice(predict_stream(service, endless(), ["weighted"], batch_size=10), 25))
+    assert len(results) == 25
+    assert results[-1]["line"] == 25
+
+
+def test_division_key():
+    assert division_key(" light heavyweight ") == "Light_heavyweight"
+    assert division_key("LIGHT-HEAVYWEIGHT") == "Light_heavyweight"
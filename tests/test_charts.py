@@ -0,0 +1,65 @@
+import json
+import os
+
+import numpy as np
+
+from fighter_store import load_store
+from UFC_data_visualizations import CHARTS, render_all_divisions, accuracy_vs_defense_scatter
+
+
+def baseline_scatter(df, division_name, output_folder):
+    # The original scatter plot, labelling the points with iterrows
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 8))
+    sns.scatterplot(data=df, x="Str. Acc.", y="Str. Def.", hue="Outcome", palette="coolwarm", s=100, legend='full')
+    plt.title(f"Strike Accuracy vs. Strike Defense - {division_name}")
+    plt.xlabel("Strike Accuracy")
+    plt.ylabel("Strike Defense")
+    plt.legend(title="Outcome", loc="upper left", labels=["Loss", "Win"])
+    for i, point in df.iterrows():
+        plt.text(point["Str. Acc."], point["Str. Def."], point["Fighter Name"], fontsize=9, ha='right', va='bottom')
+    plt.savefig(os.path.join(output_folder, f"{division_name}_accuracy_vs_defense_scatter.png"))
+    plt.close()
+
+
+def test_scatter_labels_match_baseline(roster, tmp_path):
+    import matplotlib.image as image
+    import matplotlib.pyplot as plt
+
+    plt.switch_backend("Agg")
+    df = load_store(roster).frame("Lightweight")
+    for name, render in (("baseline", baseline_scatter), ("vectorized", accuracy_vs_defense_scatter)):
+        os.makedirs(tmp_path / name)
+        render(df, "Lightweight", str(tmp_path / name))
+    file_name = "Lightweight_accuracy_vs_defense_scatter.png"
+    np.testing.assert_array_equal(image.imread(tmp_path / "baseline" / file_name),
+                                  image.imread(tmp_path / "vectorized" / file_name))
+
+
+def test_only_changed_divisions_are_rendered(roster, tmp_path):
+    output = str(tmp_path / "charts")
+    divisions = ["Flyweight", "Heavyweight"]
+    rendered = render_all_divisions(roster, output, workers=1, divisions=divisions)
+    assert sorted(rendered) == sorted((division, chart) for division in divisions for chart in CHARTS)
+    with open(os.path.join(output, "manifest.json"), encoding="utf-8") as f:
+        assert len(json.load(f)) == len(divisions) * len(CHARTS)
+
+    # Up to date: nothing is rendered again
+    assert render_all_divisions(roster, output, workers=1, divisions=divisions) == []
+
+    # A changed division file re-renders only that division's charts
+    path = os.path.join(roster, "flyweight_top15.csv")
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    lines[1] = lines[1].replace(",W(", ",L(") if ",W(" in lines[1] else lines[1].replace(",L(", ",W(")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    rendered = render_all_divisions(roster, output, workers=1, divisions=divisions)
+    assert sorted(rendered) == sorted(("Flyweight", chart) for chart in CHARTS)
+
+    # A missing chart file is rendered again, and force renders everything
+    os.remove(os.path.join(output, "Heavyweight_slpm_boxplot.png"))
+    assert render_all_divisions(roster, output, workers=1, divisions=divisions) == [("Heavyweight", "slpm_boxplot")]
+    assert len(render_all_divisions(roster, output, workers=2, force=True, divisions=divisions)) == 8
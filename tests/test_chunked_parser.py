@@ -0,0 +1,108 @@
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fighter_store import (load_store, parse_division_file, format_value, FEATURES, PERCENT_COLUMNS,
+                           CHAMPION_RANK, CSV_COLUMNS)
+from synthetic_roster import synthetic_division
+
+
+def read_baseline(path):
+    # The eager pandas read of the original loaders, in the parser's units
+    df = pd.read_csv(path)
+    df["Rank"] = df["Rank"].astype(str).replace("C", str(CHAMPION_RANK)).astype(int)
+    for column in PERCENT_COLUMNS:
+        df[column] = df[column].str.rstrip("%").astype(float) / 100
+    df["Outcome"] = df["Last Fight Result"].str.startswith("W").astype(int)
+    return df
+
+
+def assert_matches(columns, df):
+    np.testing.assert_array_equal(columns["Rank"], df["Rank"])
+    for column in FEATURES:
+        np.testing.assert_allclose(columns[column], df[column])
+    np.testing.assert_array_equal(columns["Outcome"], df["Outcome"])
+    assert list(columns["Fighter Name"]) == list(df["Fighter Name"])
+    assert list(columns["Last Fight Result"]) == list(df["Last Fight Result"])
+
+
+@pytest.fixture(scope="module")
+def large_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("roster") / "large_top15.csv"
+    synthetic_division(30_000, np.random.default_rng(0)).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, 16, 100_000])
+def test_chunk_size_does_not_change_the_columns(roster, chunk_rows):
+    for file_name in sorted(os.listdir(roster)):
+        if file_name.endswith("_top15.csv"):
+            path = os.path.join(roster, file_name)
+            assert_matches(parse_division_file(path, chunk_rows), read_baseline(path))
+
+
+def test_large_file_matches_eager_read(large_file):
+    columns = parse_division_file(large_file, chunk_rows=777)
+    assert len(columns["Rank"]) == 30_000
+    assert_matches(columns, read_baseline(large_file))
+    assert columns["Rank"].dtype.itemsize <= 2
+    assert columns["Outcome"].dtype.itemsize == 1
+
+
+def test_quoted_line_breaks_grow_the_arrays(tmp_path):
+    path = tmp_path / "odd_top15.csv"
+    rows = [
+        'C,"Jon\nJones",37,84.5,4.29,57%,2.22,64%,1.85,44%,95%,0.4,W(KO)',
+        '1,"Tom\nAspinall",31,78,7.72,66%,3.27,55%,3.5,100%,100%,0.9,W(KO)',
+        '2,Ciryl Gane,34,81,5.11,59%,2.51,57%,0.6,21%,45%,0.6,L(DEC)',
+    ]
+    path.write_text(",".join(CSV_COLUMNS) + "\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    columns = parse_division_file(str(path), chunk_rows=1)
+    assert list(columns["Fighter Name"]) == ["Jon\nJones", "Tom\nAspinall", "Ciryl Gane"]
+    np.testing.assert_array_equal(columns["Rank"], [CHAMPION_RANK, 1, 2])
+    np.testing.assert_array_equal(columns["Outcome"], [1, 1, 0])
+
+
+def test_missing_stats_are_nan(tmp_path):
+    folder = tmp_path / "roster"
+    folder.mkdir()
+    rows = [
+        'C,Jon Jones,37,84.5,4.29,57%,2.22,64%,1.85,44%,95%,0.4,W(KO)',
+        '1,Tom Aspinall,,--,7.72,--,3.27,,--,100%,100%,,W(KO)',
+        '2,Ciryl Gane,--,81,5.11,59%,2.51,57%,0.6,21%,--,0.6,L(DEC)',
+    ]
+    path = folder / "heavyweight_top15.csv"
+    path.write_text(",".join(CSV_COLUMNS) + "\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    baseline = pd.read_csv(path, na_values=["--"])
+
+    columns = parse_division_file(str(path), chunk_rows=2)
+    for column in FEATURES:
+        expected = baseline[column]
+        if column in PERCENT_COLUMNS:
+            expected = expected.str.rstrip("%").astype(float) / 100
+        np.testing.assert_allclose(columns[column], expected)
+    assert np.isnan(columns["Age"][1:]).all()
+
+    # The store loads the file, and missing stats print as in the file
+    store = load_store(str(folder))
+    fighter = store.frame("Heavyweight").iloc[1]
+    assert [format_value(column, fighter[column]) for column in ("Age", "Reach (in)", "Str. Acc.")] == ["--"] * 3
+    assert format_value("Age", store.frame("Heavyweight")["Age"].iloc[0]) == "37"
+
+
+def test_peak_memory_follows_the_chunk_size(large_file):
+    def overhead(chunk_rows):
+        # Peak traced memory beyond the parsed columns and the copy made
+        # when the text columns are joined
+        tracemalloc.start()
+        try:
+            columns = parse_division_file(large_file, chunk_rows)
+            text = columns["Fighter Name"].nbytes + columns["Last Fight Result"].nbytes
+            return tracemalloc.get_traced_memory()[1] - sum(values.nbytes for values in columns.values()) - text
+        finally:
+            tracemalloc.stop()
+
+    assert overhead(1000) < 0.25 * overhead(30_000)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from compiled_trees import benchmark, compile_model
+from fighter_store import load_store, FEATURES
+from UFC_non_linear_predictor import fit_models
+
+
+@pytest.fixture
+def fitted(roster):
+    df = load_store(roster).frame("Lightweight")
+    rf_model, gb_model, scaler, _ = fit_models(df[FEATURES], df["Outcome"])
+    X = scaler.transform(df[FEATURES].astype(float))
+    batch = np.random.default_rng(0).normal(size=(5000, X.shape[1])) * 2
+    return rf_model, gb_model, np.vstack([X, batch])
+
+
+def test_compiled_models_match_sklearn(fitted):
+    rf_model, gb_model, X = fitted
+    for model in (rf_model, gb_model):
+        compiled = compile_model(model)
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-12)
+        np.testing.assert_allclose(compiled.predict_proba(X[:1]), model.predict_proba(X[:1]), atol=1e-12)
+        np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=20, max_depth=3, random_state=1),
+    GradientBoostingClassifier(n_estimators=30, max_depth=2, learning_rate=0.3, random_state=1),
+])
+def test_multiclass_and_shallow_models_match(model):
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] > 0).astype(int) + (X[:, 1] > 0.5)
+    model.fit(X, y)
+    compiled = compile_model(model)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), atol=1e-12)
+
+
+def test_other_models_are_rejected():
+    model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+    with pytest.raises(TypeError):
+        compile_model(model)
+
+
+def test_benchmark_reports_matching_models(roster):
+    report = benchmark(roster, batch_rows=200, repeats=2)
+    assert len(report) == 4
+    assert (report["Max Abs Diff"] < 1e-9).all()
@@ -0,0 +1,73 @@
+import itertools
+
+import numpy as np
+import pytest
+from scipy.stats import rankdata
+
+import cross_division
+from cross_division import load_cross_division
+from fighter_store import load_store, FEATURES
+from UFC_fight_predictor import compare_fighters, compare_across_divisions
+from UFC_winning_margin import predict_matchup, predict_matchup_across_divisions, score_division
+
+
+@pytest.fixture
+def cross(roster):
+    return load_cross_division(load_store(roster))
+
+
+def test_tables_match_numpy(cross):
+    for division in cross.store.divisions:
+        X = cross.store.frame(division)[FEATURES].to_numpy(dtype=float)
+        table = cross.tables[division]
+        np.testing.assert_allclose(table["mean"], X.mean(axis=0))
+        np.testing.assert_allclose(table["z"], (X - X.mean(axis=0)) / np.where(X.std(axis=0) == 0, 1, X.std(axis=0)), atol=1e-12)
+        np.testing.assert_allclose(table["quantiles"], np.quantile(X, np.linspace(0, 1, len(X)), axis=0))
+        np.testing.assert_allclose(table["percentiles"], (rankdata(X, axis=0) - 1) / (len(X) - 1))
+
+        # A fighter's standing maps back to their own values in their division
+        for row in range(len(X)):
+            np.testing.assert_allclose(cross.translate(table["percentiles"][row], division), X[row])
+
+
+def test_same_division_matches_the_single_division_tools(cross, capsys):
+    df = cross.store.frame("Flyweight")
+    scored = score_division(df.copy())
+    for fighter1, fighter2 in itertools.combinations(df["Fighter Name"].head(8), 2):
+        expected = compare_fighters(df, fighter1, fighter2)
+        actual = compare_across_divisions(cross, fighter1, fighter2)
+        assert actual[0] == expected[0]
+        assert {k: sorted(v) for k, v in actual[3].items()} == {k: sorted(v) for k, v in expected[3].items()}
+        np.testing.assert_allclose(predict_matchup_across_divisions(cross, fighter1, fighter2),
+                                   predict_matchup(scored, fighter1, fighter2))
+
+
+def test_fighters_are_scored_on_both_scales(cross, capsys):
+    fighter1 = str(cross.store.frame("Flyweight")["Fighter Name"].iloc[0])
+    fighter2 = str(cross.store.frame("Heavyweight")["Fighter Name"].iloc[0])
+    first, second, references = cross.matchup(fighter1, fighter2)
+    assert list(references) == ["Flyweight", "Heavyweight"]
+    # In their own division a fighter keeps their raw values
+    np.testing.assert_allclose(references["Flyweight"][0], first["raw"])
+    np.testing.assert_allclose(references["Heavyweight"][1], second["raw"])
+
+    chances = predict_matchup_across_divisions(cross, fighter1, fighter2)
+    assert sum(chances) == pytest.approx(100)
+    assert cross.matchup(fighter1, "Nobody At All") is None
+
+
+def test_tables_are_cached_and_updated_per_division(roster, monkeypatch):
+    load_cross_division(load_store(roster))
+    built = []
+    table = cross_division.division_table
+    monkeypatch.setattr(cross_division, "division_table", lambda X, sha1: built.append(sha1) or table(X, sha1))
+
+    load_cross_division(load_store(roster))
+    assert built == []
+
+    with open(f"{roster}/flyweight_top15.csv", "a", encoding="utf-8") as f:
+        f.write("\n15,New Fighter,30,70,3.0,45%,3.0,55%,1.0,40%,60%,0.5,W(DEC)\n")
+    store = load_store(roster)
+    cross = load_cross_division(store)
+    assert built == [store.division_hash("Flyweight")]
+    assert cross.profile("New Fighter")["Division"] == "Flyweight"
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import cbook
+
+from box_plot import plot_box
+from loadData import ALL_DIVISIONS, group_statistics, load_ufc_data, partition_divisions
+from scatter_plot import plot_scatter
+
+
+@pytest.fixture
+def data(roster):
+    return load_ufc_data(roster)
+
+
+def test_views_match_boolean_masks(data):
+    partitions = partition_divisions(data)
+    assert partition_divisions(data) is partitions
+    assert sorted(partitions.divisions) == sorted(data["Division"].unique())
+    for division in partitions.divisions:
+        pd.testing.assert_frame_equal(partitions.view(division), data[data["Division"] == division])
+    assert len(partitions.view(ALL_DIVISIONS)) == len(data)
+    assert len(partitions.view("Nowhere")) == 0
+
+
+def test_shuffled_frames_are_grouped(data):
+    shuffled = data.sample(frac=1, random_state=3)
+    partitions = partition_divisions(shuffled)
+    for division in partitions.divisions:
+        view = partitions.view(division)
+        assert (view["Division"] == division).all()
+        assert sorted(view["Fighter Name"]) == sorted(data.loc[data["Division"] == division, "Fighter Name"])
+
+
+def test_summaries_match_describe_and_boxplot_stats(data):
+    partitions = partition_divisions(data)
+    for metric in ["SLpM", "Str. Acc.", "Age", "Rank", "Outcome"]:
+        for division in [None] + partitions.divisions:
+            values = partitions.view(division)[metric].astype(float)
+            summary = partitions.summary(metric, division)
+            described = values.describe()
+            np.testing.assert_allclose(
+                [summary[name] for name in ("count", "mean", "std", "min", "q1", "median", "q3", "max")],
+                [described[name] for name in ("count", "mean", "std", "min", "25%", "50%", "75%", "max")])
+            (expected,) = cbook.boxplot_stats(values.to_numpy())
+            for name in ("whislo", "whishi"):
+                assert summary[name] == pytest.approx(expected[name])
+            np.testing.assert_allclose(np.sort(summary["fliers"]), np.sort(expected["fliers"]))
+    assert partitions.summary("SLpM", "Nowhere") is None
+    assert partitions.summary("Fighter Name") is None
+
+
+def test_group_statistics_ignore_nan():
+    groups = [np.array([1.0, 2.0, np.nan, 40.0, 3.0]), np.array([]), np.array([np.nan, 5.0])]
+    ordered = np.concatenate([np.sort(group) for group in groups])
+    offsets = np.cumsum([0] + [len(group) for group in groups])
+    stats = group_statistics(ordered, offsets)
+    np.testing.assert_array_equal(stats["count"], [4, 0, 1])
+    np.testing.assert_allclose(stats["mean"], [11.5, np.nan, 5.0])
+    np.testing.assert_allclose(stats["median"], [2.5, np.nan, 5.0])
+    np.testing.assert_allclose(stats["fliers"][0], [40.0])
+
+
+def test_plots_render_headless(data):
+    for image in (plot_scatter(data, "SLpM", "Str. Acc.", headless=True),
+                  plot_scatter(data, "SLpM", "Str. Acc.", "Lightweight", headless=True),
+                  plot_box(data, "SLpM", headless=True),
+                  plot_box(data, "SLpM", "Lightweight", headless=True, image_format="svg")):
+        assert image.startswith(b"\x89PNG") or image.lstrip().startswith(b"<?xml")
+    assert plot_box(data, "Fighter Name", headless=True) is None
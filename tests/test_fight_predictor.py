@@ -0,0 +1,93 @@
+import itertools
+import os
+
+import pandas as pd
+import pytest
+
+from fighter_store import load_store, division_name, DIVISION_SUFFIX
+from UFC_fight_predictor import compare_fighters, matchup_table
+
+BASELINE_COLUMNS = [
+    'Rank', 'Age', 'Reach (in)', 'SLpM', 'Str. Acc.', 'SApM',
+    'Str. Def.', 'TD Avg.', 'TD Acc.', 'TD Def.', 'Sub. Avg.'
+]
+
+
+def baseline_compare(division_data, fighter1, fighter2):
+    # The original metric-by-metric comparison, on the raw csv values
+    f1 = division_data[division_data['Fighter Name'].str.lower() == fighter1.lower()].iloc[0]
+    f2 = division_data[division_data['Fighter Name'].str.lower() == fighter2.lower()].iloc[0]
+    categories = {fighter1: [], fighter2: []}
+
+    def better(first, second, lower_wins=False):
+        if lower_wins:
+            first, second = -first, -second
+        if first > second:
+            categories[fighter1].append(column)
+        elif second > first:
+            categories[fighter2].append(column)
+
+    for column in BASELINE_COLUMNS:
+        if column == 'Rank':
+            if f1[column] == 'C':
+                categories[fighter1].append(column)
+            elif f2[column] == 'C':
+                categories[fighter2].append(column)
+            else:
+                better(int(f1[column]), int(f2[column]), lower_wins=True)
+        elif column == 'Age':
+            better(f1[column], f2[column], lower_wins=True)
+        else:
+            better(float(str(f1[column]).replace('%', '')), float(str(f2[column]).replace('%', '')))
+
+    r1, r2 = f1['Last Fight Result'].strip().lower(), f2['Last Fight Result'].strip().lower()
+    if r1.startswith('w') and r2.startswith('l'):
+        categories[fighter1].append('Last Fight Result')
+    elif r1.startswith('l') and r2.startswith('w'):
+        categories[fighter2].append('Last Fight Result')
+    return categories
+
+
+def check_division(raw, frame):
+    for fighter1, fighter2 in itertools.permutations(raw['Fighter Name'], 2):
+        expected = baseline_compare(raw, fighter1, fighter2)
+        advantages, winner, _, categories = compare_fighters(frame, fighter1, fighter2)
+        assert categories == expected, (fighter1, fighter2)
+        assert advantages == {name: len(found) for name, found in expected.items()}
+        counts = [len(expected[fighter1]), len(expected[fighter2])]
+        assert winner == (fighter1 if counts[0] > counts[1] else fighter2 if counts[1] > counts[0] else "Draw")
+
+
+def test_compare_fighters_matches_baseline(roster):
+    store = load_store(roster)
+    for file in sorted(os.listdir(roster)):
+        if file.endswith(DIVISION_SUFFIX):
+            check_division(pd.read_csv(os.path.join(roster, file)), store.frame(division_name(file)))
+
+
+def test_first_fighter_takes_rank_when_both_are_champions(roster):
+    path = os.path.join(roster, "lightweight_top15.csv")
+    raw = pd.read_csv(path)
+    raw.loc[1, 'Rank'] = 'C'
+    raw.to_csv(path, index=False)
+    frame = load_store(roster).frame("Lightweight")
+    champions = list(raw.loc[raw['Rank'] == 'C', 'Fighter Name'])
+    assert len(champions) == 2
+
+    check_division(raw, frame)
+    _, _, _, categories = compare_fighters(frame, *champions)
+    assert 'Rank' in categories[champions[0]] and 'Rank' not in categories[champions[1]]
+
+
+def test_matchup_table_agrees_with_compare_fighters(roster):
+    frame = load_store(roster).frame("Welterweight")
+    table = matchup_table(frame)
+    assert len(table) == len(frame) * (len(frame) - 1) // 2
+    for row in table.itertuples(index=False):
+        advantages, winner, _, _ = compare_fighters(frame, row[0], row[1])
+        assert (advantages[row[0]], advantages[row[1]], winner) == (row[2], row[3], row[4])
+
+
+def test_unknown_fighter_is_reported():
+    frame = pd.DataFrame({'Fighter Name': ['A B'], 'Rank': [1]})
+    assert compare_fighters(frame, 'A B', 'C D')[0] is None
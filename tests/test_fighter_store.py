@@ -0,0 +1,112 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import fighter_store
+from fighter_store import load_store, division_name, FEATURES, PERCENT_COLUMNS, CHAMPION_RANK, DIVISION_SUFFIX
+
+
+def read_baseline(path):
+    # The division file as the original tools read it, converted to the store's units
+    df = pd.read_csv(path)
+    df["Rank"] = df["Rank"].replace("C", str(CHAMPION_RANK)).astype(int)
+    for column in PERCENT_COLUMNS:
+        df[column] = df[column].str.rstrip("%").astype(float) / 100
+    df["Outcome"] = df["Last Fight Result"].str.startswith("W").astype(int)
+    return df
+
+
+def rewrite(path, edit):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    edit(lines)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def count_parses(monkeypatch):
+    parsed = []
+    original = fighter_store.parse_division_file
+
+    def parse(path, *args, **kwargs):
+        parsed.append(os.path.basename(path))
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(fighter_store, "parse_division_file", parse)
+    return parsed
+
+
+def test_frames_match_csv_files(roster):
+    store = load_store(roster)
+    files = sorted(f for f in os.listdir(roster) if f.endswith(DIVISION_SUFFIX))
+    assert store.divisions == [division_name(f) for f in files]
+    for file in files:
+        expected = read_baseline(os.path.join(roster, file))
+        frame = store.frame(division_name(file))
+        assert list(frame["Fighter Name"]) == list(expected["Fighter Name"])
+        assert list(frame["Last Fight Result"]) == list(expected["Last Fight Result"])
+        for column in ["Rank", "Outcome"] + FEATURES:
+            np.testing.assert_allclose(frame[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float))
+
+
+def test_warm_start_memory_maps_the_cache(roster, monkeypatch):
+    load_store(roster)
+    fighter_store._loaded_stores.clear()
+    parsed = count_parses(monkeypatch)
+
+    store = load_store(roster)
+    assert parsed == []
+    assert isinstance(store.columns["SLpM"], np.memmap)
+
+
+def test_only_changed_files_are_parsed_again(roster, monkeypatch):
+    before = load_store(roster)
+    old_hashes = {division: before.division_hash(division) for division in before.divisions}
+    parsed = count_parses(monkeypatch)
+
+    def edit(lines):
+        lines[1] = lines[1].replace("32,70.5", "33,70.5")
+    rewrite(os.path.join(roster, "lightweight_top15.csv"), edit)
+
+    store = load_store(roster)
+    assert parsed == ["lightweight_top15.csv"]
+    assert store.frame("Lightweight")["Age"].iloc[0] == 33
+    for division in store.divisions:
+        changed = store.division_hash(division) != old_hashes[division]
+        assert changed == (division == "Lightweight")
+        if division != "Lightweight":
+            pd.testing.assert_frame_equal(store.frame(division), before.frame(division))
+
+
+def test_touched_file_is_not_parsed_again(roster, monkeypatch):
+    store = load_store(roster)
+    parsed = count_parses(monkeypatch)
+    path = os.path.join(roster, "heavyweight_top15.csv")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+
+    assert load_store(roster).fingerprint == store.fingerprint
+    assert parsed == []
+
+
+def test_artifacts_are_rebuilt_when_a_division_changes(roster):
+    builds = []
+
+    def build(store):
+        builds.append(store.fingerprint)
+        return len(store)
+
+    assert load_store(roster).load_artifact("row_count", build) == len(load_store(roster))
+    assert load_store(roster).load_artifact("row_count", build) == len(load_store(roster))
+    assert len(builds) == 1
+
+    rewrite(os.path.join(roster, "flyweight_top15.csv"), lambda lines: lines.pop())
+    assert load_store(roster).load_artifact("row_count", build) == len(load_store(roster))
+    assert len(builds) == 2
+
+
+@pytest.mark.parametrize("value", [CHAMPION_RANK, 7])
+def test_format_value_writes_csv_form(value):
+    assert fighter_store.format_value("Rank", value) == ("C" if value == CHAMPION_RANK else "7")
+    assert fighter_store.format_value("Str. Acc.", 0.57) == "57%"
@@ -0,0 +1,51 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from ufc import COMMANDS, HEAVY_MODULES, STARTUP_ARGS, heavy_imports, run_command, startup_times
+
+
+@pytest.mark.parametrize("command", list(COMMANDS))
+def test_every_command_has_a_main(command):
+    module_name, description = COMMANDS[command]
+    assert callable(importlib.import_module(module_name).main)
+    assert description
+
+
+@pytest.mark.parametrize("command", list(STARTUP_ARGS))
+def test_interactive_tools_defer_heavy_imports(command):
+    module_name, _ = COMMANDS[command]
+    code = f"import json, sys, {module_name}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+
+def test_heavy_imports_reads_the_import_log():
+    log = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   numpy.core",
+        "import time:      3000 |      90000 | sklearn",
+        "import time:        15 |         15 |     matplotlib.colors",
+        "unrelated line",
+    ])
+    assert heavy_imports(log) == ["matplotlib", "sklearn"]
+
+
+def test_run_command_passes_the_arguments(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "argv", ["ufc.py"])
+    folder = str(tmp_path / "roster")
+    run_command("roster", [folder, "--rows", "40"])
+    assert len([f for f in os.listdir(folder) if f.endswith("_top15.csv")]) == 8
+    assert "Wrote 40 fighters" in capsys.readouterr().out
+
+
+def test_startup_reaches_the_first_prompt():
+    (row,) = startup_times(["winning-margin"], repeats=1)
+    assert row["command"] == "winning-margin"
+    assert 0 < row["best_ms"] <= row["median_ms"]
+    assert row["heavy_imports"] == []
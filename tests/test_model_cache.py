@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from fighter_store import load_store
+from model_cache import load_or_fit, saved_models, warm_models, model_key
+from ratings import load_ratings
+from UFC_non_linear_predictor import preprocess_data, fit_models, model_config, load_or_train_models
+
+
+def fit_counter(X, y):
+    fits = []
+
+    def fit():
+        fits.append(1)
+        return fit_models(X, y)
+    return fits, fit
+
+
+def test_models_are_fitted_once_per_data_and_config(roster):
+    store = load_store(roster)
+    X, y, _ = preprocess_data(os.path.join(roster, "flyweight_top15.csv"))
+    fits, fit = fit_counter(X, y)
+
+    first = load_or_fit(store, "Flyweight", model_config(), fit)
+    again = load_or_fit(store, "Flyweight", model_config(), fit)
+    assert len(fits) == 1
+    assert first["key"] == again["key"] == model_key(store.division_hash("Flyweight"), model_config())
+    assert again["models"][2].mean_.tolist() == first["models"][2].mean_.tolist()
+
+    with open(os.path.join(roster, "flyweight_top15.csv"), "a", encoding="utf-8") as f:
+        f.write("15,New Fighter,30,70,3.0,45%,3.0,55%,1.0,40%,60%,0.5,W(DEC)\n")
+    store = load_store(roster)
+    assert load_or_fit(store, "Flyweight", model_config(), fit)["key"] != first["key"]
+    assert len(fits) == 2
+
+
+@pytest.mark.parametrize("with_history", [False, True])
+def test_models_in_use_are_current(roster, request, with_history, capsys):
+    if with_history:
+        request.getfixturevalue("fight_history")
+    store = load_store(roster)
+    warm_models(store)
+
+    file_path = os.path.join(roster, "heavyweight_top15.csv")
+    ratings = load_ratings(roster)
+    assert (ratings is not None) == with_history
+    X, y, _ = preprocess_data(file_path, ratings)
+    load_or_train_models(file_path, X, y, ratings)
+
+    entries = saved_models(store)
+    assert len(entries) == len(store.divisions)
+    assert all(entry["current"] for entry in entries)
+
+    if with_history:
+        # The models trained without the ratings are not the ones in use
+        X, y, _ = preprocess_data(file_path)
+        load_or_fit(store, "Heavyweight", model_config(), lambda: fit_models(X, y))
+        assert [entry["current"] for entry in saved_models(store)].count(False) == 1
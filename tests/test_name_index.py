@@ -0,0 +1,63 @@
+import pandas as pd
+
+from name_index import NameIndex, normalize_name, locate, resolve_name
+
+NAMES = ["Jiří Procházka", "Dricus Du Plessis", "Jon Jones", "Jalin Turner", "Michael Chiesa", "Michael Page"]
+
+
+def test_normalize_name_folds_accents_case_and_punctuation():
+    assert normalize_name("Jiří Procházka") == "jiri prochazka"
+    assert normalize_name("JIRI  PROCHAZKA") == "jiri prochazka"
+    assert normalize_name("Kai Kara-France") == "kai kara france"
+    assert normalize_name("Sean O'Malley") == "sean omalley"
+
+
+def test_exact_and_surname_matches():
+    index = NameIndex(NAMES)
+    assert index.lookup("jiri prochazka") == (None, 0)
+    assert index.lookup("Prochazka") == (None, 0)
+    assert index.lookup("du plessis") == (None, 1)
+    assert index.lookup("Plessis") == (None, 1)
+
+
+def test_ambiguous_names_do_not_match():
+    index = NameIndex(NAMES + ["Jon Jones"])
+    assert index.lookup("Jon Jones") is None
+    assert NameIndex(NAMES).lookup("Michael") is None
+
+
+def test_misspelled_names_only_match_when_fuzzy_is_asked_for():
+    index = NameIndex(NAMES)
+    assert index.lookup("Jon Jonez") is None
+    assert index.lookup("Jon Jonez", fuzzy=True) == (None, 2)
+    # A fighter who isn't indexed must not be swapped for a similar name
+    assert index.lookup("Michael Morales") is None
+    assert "Jon Jones" in index.suggest("Jon Jonez")
+
+
+def test_division_restricts_matches():
+    index = NameIndex(["Jon Jones", "Jon Jones"], ["Heavyweight", "Light_heavyweight"], [10, 20])
+    assert index.lookup("Jon Jones") is None
+    assert index.lookup("Jon Jones", "Light_heavyweight") == ("Light_heavyweight", 20)
+
+
+def test_resolve_returns_the_full_name_or_suggests(capsys):
+    df = pd.DataFrame({"Fighter Name": NAMES})
+    assert resolve_name(df, "prochazka") == "Jiří Procházka"
+    assert locate(df, "Jalin Turner") == 3
+
+    assert resolve_name(df, "Jon Jonez") is None
+    assert "Did you mean: Jon Jones" in capsys.readouterr().out
+
+
+def test_frame_index_matches_linear_scan(roster):
+    from fighter_store import load_store
+
+    store = load_store(roster)
+    for division in store.divisions:
+        df = store.frame(division)
+        for position, name in enumerate(df["Fighter Name"]):
+            expected = [i for i, other in enumerate(df["Fighter Name"]) if other.lower() == name.lower()]
+            assert locate(df, name.upper()) == (position if len(expected) == 1 else None)
+        division, row = store.name_index.lookup(df["Fighter Name"].iloc[0], division)
+        assert store.columns["Fighter Name"][row] == df["Fighter Name"].iloc[0]
@@ -0,0 +1,51 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fighter_store import FEATURES, PERCENT_COLUMNS
+from UFC_non_linear_predictor import preprocess_data, fit_models, predict_matchups
+
+
+@pytest.fixture
+def lightweight(roster):
+    file_path = os.path.join(roster, "lightweight_top15.csv")
+    X, y, df = preprocess_data(file_path)
+    rf_model, gb_model, scaler, _ = fit_models(X, y)
+    return file_path, df, (rf_model, gb_model, scaler)
+
+
+def test_preprocess_matches_baseline(lightweight):
+    file_path, df, _ = lightweight
+    raw = pd.read_csv(file_path)
+    for column in PERCENT_COLUMNS:
+        raw[column] = raw[column].str.rstrip('%').astype(float) / 100.0
+    X, y, _ = preprocess_data(file_path)
+    np.testing.assert_allclose(X.to_numpy(dtype=float), raw[FEATURES].to_numpy(dtype=float))
+    assert list(y) == [1 if result.startswith('W') else 0 for result in raw["Last Fight Result"]]
+
+
+def test_batch_predictions_match_one_at_a_time(lightweight):
+    _, df, (rf_model, gb_model, scaler) = lightweight
+    matchups = list(itertools.permutations(df["Fighter Name"], 2))
+    results = predict_matchups(df, rf_model, gb_model, scaler, matchups)
+    assert results["Found"].all()
+
+    for row, (fighter1, fighter2) in zip(results.itertuples(index=False), matchups):
+        # The original per-matchup computation
+        pair = pd.concat([df[df["Fighter Name"] == fighter1], df[df["Fighter Name"] == fighter2]])
+        scaled = scaler.transform(pair[FEATURES])
+        for model, first, second in ((rf_model, row[3], row[4]), (gb_model, row[5], row[6])):
+            probabilities = model.predict_proba(scaled)[:, 1]
+            expected = probabilities / probabilities.sum() * 100
+            np.testing.assert_allclose([first, second], expected, equal_nan=True)
+
+
+def test_unknown_fighters_are_flagged(lightweight):
+    _, df, (rf_model, gb_model, scaler) = lightweight
+    results = predict_matchups(df, rf_model, gb_model, scaler,
+                               [("Islam Makhachev", "Nobody Here"), ("Islam Makhachev", "Charles Oliveira")])
+    assert list(results["Found"]) == [False, True]
+    assert results.iloc[0][["RF Fighter 1 Win (%)", "GB Fighter 1 Win (%)"]].isna().all()
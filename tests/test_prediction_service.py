@@ -0,0 +1,94 @@
+import asyncio
+import itertools
+
+import numpy as np
+import pytest
+
+from fighter_store import load_store
+from model_cache import load_or_fit
+from prediction_service import PredictionService
+from UFC_fight_predictor import compare_fighters
+from UFC_non_linear_predictor import model_config, predict_matchups
+
+
+@pytest.fixture
+def service(roster):
+    return PredictionService(roster)
+
+
+def matchups(service, division):
+    names = service.frames[division]["Fighter Name"]
+    return [{"division": division, "fighter1": f1, "fighter2": f2}
+            for f1, f2 in itertools.permutations(names, 2)]
+
+
+def test_advantage_matches_compare_fighters(service):
+    for division, frame in service.frames.items():
+        items = matchups(service, division)
+        for item, result in zip(items, service.score_advantage(items)):
+            advantages, winner, _, categories = compare_fighters(frame, item["fighter1"], item["fighter2"])
+            assert result["advantages"] == [advantages[item["fighter1"]], advantages[item["fighter2"]]]
+            assert result["categories"] == [categories[item["fighter1"]], categories[item["fighter2"]]]
+            assert result["winner"] == winner
+
+
+def test_weighted_matches_score_ratio(service):
+    for division, frame in service.scored.items():
+        items = matchups(service, division)
+        scores = frame.set_index("Fighter Name")["Performance Score"]
+        for item, result in zip(items, service.score_weighted(items)):
+            score1, score2 = scores[item["fighter1"]], scores[item["fighter2"]]
+            expected = [score1 / (score1 + score2) * 100, score2 / (score1 + score2) * 100]
+            np.testing.assert_allclose(result["chances"], expected)
+
+
+def test_ml_matches_sklearn_models(service, roster):
+    store = load_store(roster)
+    division = "Lightweight"
+    df, _ = service.models[division]
+    rf_model, gb_model, scaler = load_or_fit(store, division, model_config(), None)["models"]
+    items = matchups(service, division)
+    expected = predict_matchups(df, rf_model, gb_model, scaler,
+                                [(item["fighter1"], item["fighter2"]) for item in items])
+    results = service.score_ml(items)
+    np.testing.assert_allclose([result["random_forest"] for result in results],
+                               expected[["RF Fighter 1 Win (%)", "RF Fighter 2 Win (%)"]].to_numpy())
+    np.testing.assert_allclose([result["gradient_boosting"] for result in results],
+                               expected[["GB Fighter 1 Win (%)", "GB Fighter 2 Win (%)"]].to_numpy())
+
+
+def test_unresolved_items_keep_their_place(service):
+    items = [
+        {"division": "Lightweight", "fighter1": "Islam Makhachev", "fighter2": "Charles Oliveira"},
+        {"division": "Lightweight", "fighter1": "Islam Makhachev", "fighter2": "Nobody Here"},
+        {"division": "nowhere", "fighter1": "Islam Makhachev", "fighter2": "Charles Oliveira"},
+    ]
+    results = service.score_advantage(items)
+    assert results[0]["fighter1"] == "Islam Makhachev"
+    assert results[1]["status"] == 404
+    assert results[2] == {"status": 404, "error": "Division not found."}
+
+
+def test_concurrent_requests_are_batched(service):
+    async def run():
+        tasks = [asyncio.create_task(batcher.run()) for batcher in service.batchers.values()]
+        try:
+            items = matchups(service, "Lightweight")[:20]
+            responses = await asyncio.gather(*(service.handle("POST", "/advantage", dict(item)) for item in items))
+            errors = [
+                await service.handle("POST", "/nothing", items[0]),
+                await service.handle("POST", "/advantage", {"division": "Lightweight"}),
+                await service.handle("POST", "/advantage", dict(items[0], fighter2="Nobody Here")),
+            ]
+        finally:
+            for task in tasks:
+                task.cancel()
+        return items, responses, errors
+
+    items, responses, errors = asyncio.run(run())
+    assert [status for status, _ in responses] == [200] * len(items)
+    assert [body for _, body in responses] == service.score_advantage(items)
+    # Requests queued together are scored together
+    assert len(service.batchers["advantage"].batch_sizes) < len(items)
+    assert [status for status, _ in errors] == [404, 400, 404]
+    assert service.stats()["advantage"]["requests"] == len(items) + 1
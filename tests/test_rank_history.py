@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fighter_store import load_store, CHAMPION_RANK
+from rank_history import (RankHistory, division_key, decode_rank, decode_change, HISTORY_DTYPES,
+                          MOVED, NEW, INTERIM, STEADY, UNRANKED)
+
+
+@pytest.fixture
+def history(tmp_path):
+    return RankHistory(str(tmp_path / "rank_history"))
+
+
+def test_labels_and_changes_are_decoded():
+    assert division_key("Men's Pound-for-PoundTop Rank") == "Pound_for_pound"
+    assert division_key("Light Heavyweight") == "Light_heavyweight"
+    assert division_key("Women's Flyweight") == "Women_s_flyweight"
+    assert [decode_rank(value) for value in ("C", "Champion", "7", "")] == [CHAMPION_RANK, CHAMPION_RANK, 7, UNRANKED]
+    assert decode_change("Rank increased by1") == (1, MOVED)
+    assert decode_change("Rank decreased by 12") == (-12, MOVED)
+    assert decode_change("NR") == (0, NEW)
+    assert decode_change("interim") == (0, INTERIM)
+    assert decode_change("") == (0, STEADY)
+
+
+def test_snapshot_matches_the_csv(history, rankings):
+    assert history.record(rankings) == 0
+    assert history.record(rankings) is None
+    df = pd.read_csv(rankings, dtype=str).fillna("")
+
+    entries = [history._describe(row) for row in range(len(history))]
+    assert [entry["Name"] for entry in entries] == list(df["Name"])
+    assert [entry["Division"] for entry in entries] == [division_key(label) for label in df["Division"]]
+    assert [entry["Rank"] for entry in entries] == [decode_rank(value) for value in df["Rank"]]
+    assert [entry["Change"] for entry in entries] == [decode_change(value)[0] for value in df["Rank Change"]]
+
+    # Reopening reads the same columns back
+    reopened = RankHistory(history.folder)
+    for name in HISTORY_DTYPES:
+        np.testing.assert_array_equal(reopened.columns[name], history.columns[name])
+
+
+def test_join_matches_exact_names_and_surnames_only(history, rankings, roster):
+    history.record(rankings)
+    store = load_store(roster)
+    stats_rows = history.join(store)
+    df = pd.read_csv(rankings, dtype=str)
+
+    names = store.columns["Fighter Name"]
+    for (label, name), stats_row in zip(df[["Division", "Name"]].itertuples(index=False), stats_rows.tolist()):
+        if stats_row < 0:
+            continue
+        # A joined row is the same fighter, in the ranked division unless pound-for-pound
+        assert str(names[stats_row]).split()[-1].lower() == name.split()[-1].lower()
+        if division_key(label) != "Pound_for_pound":
+            assert store.divisions[store.columns["Division"][stats_row]] == division_key(label)
+
+    # Every exact name in the ranked division is joined
+    for division in store.divisions:
+        frame = store.frame(division)
+        ranked = (df["Division"].map(division_key) == division) & df["Name"].isin(frame["Fighter Name"])
+        assert (stats_rows[ranked.to_numpy()] >= 0).all()
+
+    # Ranked fighters without stats are not joined to a namesake
+    joined = {entry["Name"]: entry for entry in history.joined(store)}
+    assert joined["Michael Chandler"]["Stats Division"] == "Lightweight"
+    for name in ("Michael Morales", "Michael Page"):
+        assert "Stats Division" not in joined[name]
+        assert stats_rows[df.index[df["Name"] == name]].tolist() == [-1]
+
+
+def test_trajectory_and_movers_follow_the_snapshots(history, rankings, tmp_path):
+    history.record(rankings, when=1_000_000)
+    single = history.movers()
+    df = pd.read_csv(rankings, dtype=str).fillna("")
+    assert len(single) == (df["Rank Change"].str.contains("Rank") | (df["Rank Change"] == "NR")).sum()
+
+    # A week later Jon Jones swaps places with Islam Makhachev
+    changed = df.copy()
+    p4p = changed["Division"] == changed["Division"].iloc[0]
+    first, second = changed.index[p4p][:2]
+    changed.loc[first, "Name"], changed.loc[second, "Name"] = changed.loc[second, "Name"], changed.loc[first, "Name"]
+    path = str(tmp_path / "later.csv")
+    changed.to_csv(path, index=False)
+    assert history.record(path, when=1_000_000 + 7 * 86400) == 1
+
+    moved = {(entry["Division"], entry["Name"]): entry["Change"] for entry in history.movers(days=7)}
+    assert moved == {("Pound_for_pound", "Jon Jones"): 1, ("Pound_for_pound", "Islam Makhachev"): -1}
+    assert [entry["Rank"] for entry in history.trajectory("Jones", "Pound_for_pound")] == [2, 1]
+
+
+def test_interrupted_append_is_ignored(history, rankings, tmp_path):
+    history.record(rankings)
+    rows = len(history)
+    # Rows written without the manifest, as by a crash during an append
+    for name, dtype in HISTORY_DTYPES.items():
+        with open(os.path.join(history.folder, f"{name}.bin"), "ab") as f:
+            f.write(np.zeros(5, dtype).tobytes())
+    reopened = RankHistory(history.folder)
+    assert len(reopened) == rows
+
+    path = str(tmp_path / "later.csv")
+    pd.read_csv(rankings, dtype=str).head(10).to_csv(path, index=False)
+    reopened.record(path)
+    reopened = RankHistory(history.folder)
+    assert len(reopened) == rows + 10
+    assert reopened.columns["snapshot"][rows:].tolist() == [1] * 10
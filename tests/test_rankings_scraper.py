@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bs4 import BeautifulSoup
+
+from getRankings import parse_division, parse_rankings, read_sections, scrape, write_rankings
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "rankings.html")
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves `page` at every path with an ETag, answering 304 when it matches.
+    """
+
+    def __init__(self, page):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.page = page
+        self.statuses = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/rankings"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = self.server.page.encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.statuses.append(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.server.statuses.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page():
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def server(page):
+    server = FixtureServer(page)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_matches_baseline(page):
+    # The original parse: the whole page with html.parser
+    soup = BeautifulSoup(page, "html.parser")
+    expected = dict(parse_division(division) for division in soup.select(".view-grouping"))
+    assert parse_rankings(page) == expected
+    assert list(expected) == ["Men's Pound-for-Pound Top Rank", "Flyweight", "Lightweight"]
+    assert expected["Flyweight"][0] == {"Rank": "Champion", "Name": "Alexandre Pantoja", "Rank Change": ""}
+
+
+def test_fetch_then_conditional_fetch(server, tmp_path):
+    output = str(tmp_path / "ufcrankings.csv")
+    changed = asyncio.run(scrape(server.url, output))
+    assert changed == ["Men's Pound-for-Pound Top Rank", "Flyweight", "Lightweight"]
+    assert {division: rows for division, (rows, _) in read_sections(output).items()} == parse_rankings(server.page)
+
+    # The saved ETag makes the server answer 304 and the file is left alone
+    before = os.stat(output).st_mtime_ns
+    assert asyncio.run(scrape(server.url, output)) is None
+    assert server.statuses == [200, 304]
+    assert os.stat(output).st_mtime_ns == before
+
+    # Without the conditional headers the page is fetched, but nothing changed
+    assert asyncio.run(scrape(server.url, output, conditional=False)) == []
+    assert server.statuses == [200, 304, 200]
+
+
+def test_changed_page_rewrites_changed_sections(server, tmp_path):
+    output = str(tmp_path / "ufcrankings.csv")
+    asyncio.run(scrape(server.url, output))
+    with open(output, newline="", encoding="utf-8") as f:
+        before = f.read()
+
+    server.page = server.page.replace("Brandon Royval", "Tatsuro Taira")
+    assert asyncio.run(scrape(server.url, output)) == ["Flyweight"]
+    assert server.statuses == [200, 200]
+    with open(output, newline="", encoding="utf-8") as f:
+        after = f.read()
+    assert after == before.replace("Brandon Royval", "Tatsuro Taira")
+
+
+def test_unchanged_sections_are_copied(tmp_path):
+    output = str(tmp_path / "ufcrankings.csv")
+    rows = {
+        "Flyweight": [{"Rank": "Champion", "Name": "Alexandre Pantoja", "Rank Change": ""}],
+        "Lightweight": [{"Rank": "1", "Name": "Charles Oliveira", "Rank Change": ""}],
+    }
+    # Hand-quoted lines that csv.writer would not produce
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        f.write('Division,Rank,Name,Rank Change\n'
+                '"Flyweight","Champion","Alexandre Pantoja",""\n'
+                'Lightweight,1,Charles Oliveira,\n')
+    assert write_rankings(output, rows) == []
+
+    rows["Lightweight"].append({"Rank": "2", "Name": "Arman Tsarukyan", "Rank Change": ""})
+    assert write_rankings(output, rows) == ["Lightweight"]
+    with open(output, newline="", encoding="utf-8") as f:
+        assert f.read() == ('Division,Rank,Name,Rank Change\n'
+                            '"Flyweight","Champion","Alexandre Pantoja",""\n'
+                            'Lightweight,1,Charles Oliveira,\n'
+                            'Lightweight,2,Arman Tsarukyan,\n')
+
+    del rows["Flyweight"]
+    assert write_rankings(output, rows) == ["Flyweight"]
+    assert list(read_sections(output)) == ["Lightweight"]
@@ -0,0 +1,100 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from compiled_trees import benchmark
+from cross_division import load_cross_division
+from fighter_store import load_store
+from model_cache import saved_models, warm_models
+from prediction_service import PredictionService
+from ratings import load_ratings, ELO_K, ELO_START, GLICKO_START
+from title_simulator import win_probability_matrix
+from UFC_non_linear_predictor import division_models, predict_matchup_across_divisions
+from watch import Watcher, RATINGS_NODE
+
+
+def reference_elo(history):
+    # Textbook Elo, one fight at a time over the whole history; a draw
+    # scores a half and a no contest is skipped
+    elo = {}
+    for fight in history.itertuples():
+        if fight.method == "NC":
+            continue
+        score = 0.5 if fight.method == "Draw" else 1.0
+        winner, loser = elo.get(fight.winner, ELO_START), elo.get(fight.loser, ELO_START)
+        change = ELO_K * (score - 1 / (1 + 10 ** ((loser - winner) / 400)))
+        elo[fight.winner], elo[fight.loser] = winner + change, loser - change
+    return elo
+
+
+def test_elo_matches_the_textbook_update(roster, fight_history):
+    ratings = load_ratings(roster)
+    history = pd.read_csv(fight_history)
+    assert ratings.recorded == len(history)
+    expected = reference_elo(history)
+    names = sorted(expected)
+    elo, glicko = ratings.lookup(names)
+    np.testing.assert_allclose(elo, [expected[name] for name in names])
+
+    # Glicko ratings order the fighters much like Elo does
+    assert np.corrcoef(elo, glicko)[0, 1] > 0.9
+    assert ratings.rating("Nobody At All") is None
+    np.testing.assert_array_equal(ratings.lookup(["Nobody At All"])[1], [GLICKO_START])
+
+
+def test_appended_fights_resume_from_the_checkpoint(roster, fight_history):
+    with open(fight_history, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(fight_history, "w", encoding="utf-8") as f:
+        f.writelines(lines[:1001])
+    first = load_ratings(roster, rebuild=True)
+    assert first.recorded == 1000
+
+    # A line still being written is left for the next load
+    with open(fight_history, "a", encoding="utf-8") as f:
+        f.writelines(lines[1001:])
+        f.write(f"{date.today().isoformat()},{lines[1].split(',')[1]}")
+    resumed = load_ratings(roster)
+    assert resumed.recorded == len(lines) - 1
+
+    rebuilt = load_ratings(roster, rebuild=True)
+    n = len(rebuilt)
+    for name in ("elo", "mu", "phi", "sigma", "fights"):
+        np.testing.assert_allclose(getattr(resumed, name)[:n], getattr(rebuilt, name)[:n])
+    assert resumed.fingerprint == rebuilt.fingerprint
+
+    # A rewritten history is ingested from the start
+    with open(fight_history, "w", encoding="utf-8") as f:
+        f.writelines(lines[:501])
+    assert load_ratings(roster).recorded == 500
+
+
+def test_every_model_user_trains_with_the_ratings(roster, fight_history, tmp_path, capsys):
+    store = load_store(roster)
+    warm_models(store)
+    df, features, (_, _, scaler) = division_models(store, "Lightweight")
+    assert features[-2:] == ["Elo", "Glicko"] == list(scaler.feature_names_in_[-2:])
+    assert df["Elo"].nunique() > 1
+
+    # None of them trains models of its own
+    PredictionService(roster)
+    assert win_probability_matrix(store, "Lightweight", "rf").shape == (len(df), len(df))
+    benchmark(roster, "Lightweight", batch_rows=20, repeats=1)
+    cross = load_cross_division(store)
+    fighter1 = str(store.frame("Lightweight")["Fighter Name"].iloc[0])
+    fighter2 = str(store.frame("Heavyweight")["Fighter Name"].iloc[0])
+    chances = predict_matchup_across_divisions(cross, fighter1, fighter2)
+    assert abs(sum(chances["RF"]) - 100) < 1e-9
+    watcher = Watcher(roster, str(tmp_path / "missing.csv"), str(tmp_path / "charts"), charts=False)
+    watcher.update()
+    entries = saved_models(store)
+    assert len(entries) == len(store.divisions)
+    assert all(entry["current"] for entry in entries)
+
+    # New fights refit every division's models, and nothing else
+    with open(fight_history, "a", encoding="utf-8") as f:
+        f.write(f"{date.today().isoformat()},{fighter1},{fighter2},KO\n")
+    recomputed = [node for node, _ in watcher.update()]
+    assert recomputed == [RATINGS_NODE] + [f"{division}/models" for division in store.divisions]
+    assert len(saved_models(store)) == 2 * len(store.divisions)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from loadData import load_ufc_data
+from regression_analysis import REGRESSION_METRICS, regression_table, run_regression, plot_regression
+
+NOT_AVAILABLE = "Regression not available for that metric and division combination."
+
+
+@pytest.fixture
+def data(roster):
+    return load_ufc_data(roster)
+
+
+def test_table_matches_linregress(data):
+    table = regression_table(data).set_index(["Division", "X", "Y"])
+    for division in ["All", "Lightweight", "Heavyweight"]:
+        subset = data if division == "All" else data[data["Division"] == division]
+        for x_metric, y_metric in [("Reach (in)", "SLpM"), ("Age", "Outcome"), ("Rank", "TD Def.")]:
+            expected = stats.linregress(subset[x_metric].astype(float), subset[y_metric].astype(float))
+            row = table.loc[(division, x_metric, y_metric)]
+            np.testing.assert_allclose(
+                [row["Slope"], row["Intercept"], row["R-squared"], row["P-value"], row["Slope SE"], row["Intercept SE"]],
+                [expected.slope, expected.intercept, expected.rvalue ** 2, expected.pvalue,
+                 expected.stderr, expected.intercept_stderr])
+    assert len(table) == (len(data["Division"].unique()) + 1) * len(REGRESSION_METRICS) * (len(REGRESSION_METRICS) - 1)
+
+
+def test_run_and_plot_agree_on_numeric_extra_columns(data):
+    data = data.copy()
+    data["Strike Margin"] = data["SLpM"] - data["SApM"]
+    result = run_regression(data, "Strike Margin", "Outcome", "Lightweight")
+    expected = stats.linregress(*data[data["Division"] == "Lightweight"][["Strike Margin", "Outcome"]].to_numpy(dtype=float).T)
+    assert result["Slope"] == pytest.approx(expected.slope)
+    image = plot_regression(data, "Strike Margin", "Outcome", "Lightweight", headless=True)
+    assert image.startswith(b"\x89PNG")
+
+
+@pytest.mark.parametrize("regress", [
+    run_regression,
+    lambda data, x_metric, y_metric: plot_regression(data, x_metric, y_metric, headless=True),
+])
+def test_text_and_unknown_metrics_are_not_available(data, regress, capsys):
+    assert regress(data, "Fighter Name", "SLpM") is None
+    assert regress(data, "SLpM", "Last Fight Result") is None
+    assert regress(data, "SLpM", "Nothing") is None
+    assert capsys.readouterr().out.count(NOT_AVAILABLE) == 3
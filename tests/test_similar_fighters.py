@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fighter_store import load_store, FEATURES
+from similar_fighters import GLOBAL_VIEW, build_views, load_index
+
+
+def brute_force(store, name, k, division=None):
+    # Standardize with the view's statistics and sort every distance
+    divisions = [division] if division else store.divisions
+    frame = pd.concat([store.frame(d).assign(Division=d) for d in divisions], ignore_index=True)
+    X = frame[FEATURES].to_numpy(dtype=float)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - X.mean(axis=0)) / scale
+    row = int(np.flatnonzero(frame["Fighter Name"].to_numpy() == name)[0])
+    distances = np.sqrt(((Z - Z[row]) ** 2).sum(axis=1))
+    order = [i for i in np.argsort(distances, kind="stable") if i != row][:k]
+    return [(frame["Fighter Name"].iloc[i], frame["Division"].iloc[i], distances[i]) for i in order]
+
+
+@pytest.mark.parametrize("within_division", [False, True])
+def test_neighbours_match_brute_force(roster, within_division):
+    store = load_store(roster)
+    index = load_index(store)
+    for name, division in [("Islam Makhachev", "Lightweight"), ("Alexandre Pantoja", "Flyweight")]:
+        results = index.similar(name, 5, within_division)
+        expected = brute_force(store, name, 5, division if within_division else None)
+        assert [(n, d) for n, d, _ in results] == [(n, d) for n, d, _ in expected]
+        np.testing.assert_allclose([d for _, _, d in results], [d for _, _, d in expected])
+
+
+def test_unknown_fighter(roster):
+    assert load_index(load_store(roster)).similar("Nobody Here") is None
+
+
+def test_only_changed_views_are_rebuilt(roster):
+    store = load_store(roster)
+    views = build_views(store)
+
+    path = os.path.join(roster, "flyweight_top15.csv")
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace(",W(", ",L(", 1))
+    rebuilt = build_views(load_store(roster), views)
+
+    assert rebuilt["Flyweight"] is not views["Flyweight"]
+    assert rebuilt[GLOBAL_VIEW] is not views[GLOBAL_VIEW]
+    assert all(rebuilt[division] is views[division] for division in store.divisions if division != "Flyweight")
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmark_suite import compare_results, run_benchmarks
+from conftest import DATA_FOLDER
+from fighter_store import load_store, CSV_COLUMNS, PERCENT_COLUMNS
+from synthetic_roster import generate_history, generate_roster
+
+
+def test_roster_follows_the_csv_schema(tmp_path):
+    folder = str(tmp_path / "ufc_stats")
+    paths = generate_roster(folder, 2500, max_division_rows=200)
+    assert len(paths) == 13
+    frames = [pd.read_csv(path, dtype=str) for path in paths]
+    assert sum(len(frame) for frame in frames) == 2500
+
+    shipped = pd.read_csv(os.path.join(DATA_FOLDER, "lightweight_top15.csv"), dtype=str)
+    for frame in frames:
+        assert list(frame.columns) == CSV_COLUMNS == list(shipped.columns)
+        assert frame["Rank"].iloc[0] == "C"
+        assert frame["Rank"].iloc[1:].str.fullmatch(r"\d+").all()
+        for column in PERCENT_COLUMNS:
+            assert frame[column].str.fullmatch(r"\d+%").all()
+        assert frame["Last Fight Result"].str.fullmatch(r"[WL]\((KO|TKO|SUB|DEC|SD)\)").all()
+        assert frame["Fighter Name"].is_unique
+
+    # The store parses the synthetic files like the shipped ones
+    store = load_store(folder)
+    assert sum(len(store.frame(division)) for division in store.divisions) == 2500
+
+
+def test_roster_is_reproducible(tmp_path):
+    first = generate_roster(str(tmp_path / "a"), 300, seed=3)
+    second = generate_roster(str(tmp_path / "b"), 300, seed=3)
+    for a, b in zip(first, second):
+        with open(a, "rb") as f, open(b, "rb") as g:
+            assert f.read() == g.read()
+
+
+def test_history_favours_the_skilled_fighters(tmp_path):
+    names = [f"Fighter {number}" for number in range(50)]
+    path = generate_history(str(tmp_path / "fight_history.csv"), names, 20000, seed=5)
+    history = pd.read_csv(path)
+    assert len(history) == 20000
+    assert (history["winner"] != history["loser"]).all()
+    assert history["date"].is_monotonic_increasing
+    assert set(history["winner"]) | set(history["loser"]) <= set(names)
+
+    # Win rates spread out well beyond coin flips
+    wins = history["winner"].value_counts().reindex(names, fill_value=0)
+    fights = wins + history["loser"].value_counts().reindex(names, fill_value=0)
+    assert np.std(wins / fights) > 0.1
+
+
+def test_benchmark_reports_every_stage(tmp_path):
+    stages = ["load_ufc_data", "compare_fighters", "calculate_winning_chance", "preprocess_data"]
+    results = run_benchmarks([100, 400], repeats=1, stages=stages, workdir=str(tmp_path), log=lambda message: None)
+    assert [(result["rows"], result["stage"]) for result in results] == [
+        (rows, stage) for rows in (100, 400) for stage in
+        ["load_ufc_data (cold)", "load_ufc_data (warm)", "preprocess_data", "compare_fighters",
+         "calculate_winning_chance"]
+    ]
+    assert all(result["seconds"] > 0 and result["peak_mb"] > 0 for result in results)
+    assert results[0]["items"] == 100
+    # Generated rosters are removed afterwards
+    assert os.listdir(tmp_path) == []
+
+    joined = compare_results({"results": results}, {"results": results})
+    assert len(joined) == len(results)
+    np.testing.assert_allclose(joined["time ratio"], 1.0)
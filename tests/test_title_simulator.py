@@ -0,0 +1,80 @@
+import contextlib
+import io
+import itertools
+
+import numpy as np
+import pytest
+
+from fighter_store import load_store
+from UFC_winning_margin import predict_matchup, score_division
+from title_simulator import simulate_titles, title_odds, win_probability_matrix, wilson_interval
+
+
+def exact_bracket_odds(P):
+    # Average the title chances over every seeding of a four-fighter bracket
+    odds = np.zeros(len(P))
+    seedings = list(itertools.permutations(range(len(P))))
+    for a, b, c, d in seedings:
+        for first, second in ((a, b), (b, a)):
+            for third, fourth in ((c, d), (d, c)):
+                reach = P[first, second] * P[third, fourth]
+                odds[first] += reach * P[first, third]
+                odds[third] += reach * P[third, first]
+    return odds / len(seedings)
+
+
+def test_weighted_matrix_matches_predict_matchup(roster):
+    store = load_store(roster)
+    df = store.frame("Lightweight")
+    P = win_probability_matrix(store, "Lightweight")
+    np.testing.assert_allclose(P + P.T, 1)
+
+    scored = score_division(df.copy())
+    names = df["Fighter Name"].to_numpy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i, j in [(0, 1), (3, 7), (10, 2)]:
+            chance, _ = predict_matchup(scored, names[i], names[j])
+            assert P[i, j] * 100 == pytest.approx(chance)
+
+
+@pytest.mark.parametrize("source", ["rf", "gb"])
+def test_model_matrix_is_a_probability_matrix(roster, source):
+    P = win_probability_matrix(load_store(roster), "Welterweight", source)
+    assert ((P >= 0) & (P <= 1)).all()
+    np.testing.assert_allclose(P + P.T, 1)
+
+
+def test_bracket_odds_match_exact_odds():
+    P = np.array([
+        [0.5, 0.7, 0.6, 0.9],
+        [0.3, 0.5, 0.4, 0.8],
+        [0.4, 0.6, 0.5, 0.55],
+        [0.1, 0.2, 0.45, 0.5],
+    ])
+    simulations = 200_000
+    counts = simulate_titles(P, "bracket", simulations, chunk_size=50_000)
+    assert counts.sum() == simulations
+    expected = exact_bracket_odds(P)
+    standard_error = np.sqrt(expected * (1 - expected) / simulations)
+    assert (np.abs(counts / simulations - expected) < 5 * standard_error).all()
+
+    low, high = wilson_interval(counts, simulations)
+    assert ((low < counts / simulations) & (counts / simulations < high)).all()
+
+
+def test_dominant_champion_keeps_the_belt():
+    P = np.full((6, 6), 0.5)
+    P[0, 1:], P[1:, 0] = 1.0, 0.0
+    counts = simulate_titles(P, "ladder", 1000, chunk_size=300, champion=0, n_fights=3, contenders=3)
+    assert counts[0] == 1000
+
+
+def test_counts_do_not_depend_on_workers(roster):
+    store = load_store(roster)
+    kwargs = dict(mode="ladder", simulations=40_000, chunk_size=10_000, seed=7)
+    single = title_odds(store, "Flyweight", workers=1, **kwargs)
+    pooled = title_odds(store, "Flyweight", workers=2, **kwargs)
+    assert single.equals(pooled)
+    assert single["Titles"].sum() == 40_000
+    # Only the champion and the top five contenders can hold the belt
+    assert (single.loc[single["Rank"] > 5, "Titles"] == 0).all()
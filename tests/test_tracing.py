@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from conftest import ROOT
+
+WORKER_MODULE = """
+from tracing import span, traced
+
+
+@traced("square")
+def square(value):
+    with span("inner", value=value):
+        return value * value
+"""
+
+SCRIPT = """
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import tracing
+from work import square
+
+if __name__ == "__main__":
+    context = multiprocessing.get_context(sys.argv[1])
+    with tracing.span("pool"):
+        with ProcessPoolExecutor(max_workers=2, mp_context=context) as pool:
+            print(sum(pool.map(square, range(6))))
+    print(square(3))
+"""
+
+
+def run_traced(tmp_path, start_method, env_value):
+    (tmp_path / "work.py").write_text(textwrap.dedent(WORKER_MODULE))
+    (tmp_path / "script.py").write_text(textwrap.dedent(SCRIPT))
+    env = {key: value for key, value in os.environ.items() if not key.startswith("UFC_TRACE")}
+    env.update({"UFC_TRACE": env_value, "UFC_TRACE_MEMORY": "0",
+                "PYTHONPATH": os.pathsep.join([ROOT, str(tmp_path)])})
+    result = subprocess.run([sys.executable, "script.py", start_method], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["55", "9"]
+    return result
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_worker_spans_are_merged(tmp_path, start_method):
+    result = run_traced(tmp_path, start_method, "trace.json")
+    with open(tmp_path / "trace.json", encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+    owner = next(event for event in events if event["name"] == "pool")
+    squares = [event for event in events if event["name"] == "square"]
+    inner = [event for event in events if event["name"] == "inner"]
+    assert len(squares) == len(inner) == 7
+    assert sorted(event["args"]["value"] for event in inner) == [0, 1, 2, 3, 3, 4, 5]
+    worker_spans = [event for event in squares if event["pid"] != owner["pid"]]
+    assert len(worker_spans) == 6
+    # Worker spans share the owner's time origin
+    for event in worker_spans:
+        assert owner["ts"] <= event["ts"] <= owner["ts"] + owner["dur"]
+    assert "from 2 process(es)" in result.stderr or "from 3 process(es)" in result.stderr
+
+
+def test_stale_parts_are_discarded(tmp_path):
+    stale = tmp_path / "trace.json.999999.part"
+    stale.write_text(json.dumps([{"name": "stale", "ph": "X", "ts": 0, "dur": 1, "pid": 999999, "tid": 1}]))
+    run_traced(tmp_path, "fork", "trace.json")
+    with open(tmp_path / "trace.json", encoding="utf-8") as f:
+        names = {event["name"] for event in json.load(f)["traceEvents"]}
+    assert "stale" not in names
+    assert not stale.exists()
+
+
+def test_tracing_is_off_without_the_environment(tmp_path):
+    run_traced(tmp_path, "fork", "0")
+    assert not (tmp_path / "trace.json").exists()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
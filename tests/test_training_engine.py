@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store, FEATURES
+from training_engine import division_datasets, cv_tasks, evaluate_all, POOLED_DIVISION
+
+
+def test_datasets_match_store_frames(roster):
+    store = load_store(roster)
+    datasets = division_datasets(store)
+    assert list(datasets) == store.divisions + [POOLED_DIVISION]
+    for division in store.divisions:
+        X, y = datasets[division]
+        frame = store.frame(division)
+        np.testing.assert_allclose(X, frame[FEATURES].to_numpy(dtype=float))
+        assert y.tolist() == frame["Outcome"].tolist()
+    assert len(datasets[POOLED_DIVISION][1]) == len(store)
+
+
+def test_folds_partition_every_division(roster):
+    datasets = division_datasets(load_store(roster), include_pooled=False)
+    for task in cv_tasks(datasets, n_splits=3, n_repeats=2, random_state=0, tree_jobs=1):
+        tested = np.concatenate([test for _, test in task["folds"]])
+        assert sorted(tested.tolist()) == list(range(len(task["y"])))
+        for train, test in task["folds"]:
+            assert not set(train) & set(test)
+
+
+def test_results_do_not_depend_on_worker_count(roster):
+    serial, serial_folds = evaluate_all(roster, n_splits=2, n_repeats=1, workers=1)
+    parallel, parallel_folds = evaluate_all(roster, n_splits=2, n_repeats=1, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    pd.testing.assert_frame_equal(serial_folds, parallel_folds)
+    assert set(serial["Division"]) <= set(load_store(roster).divisions) | {POOLED_DIVISION}
+    assert (serial_folds[["Accuracy", "ROC AUC"]].stack().between(0, 1)).all()
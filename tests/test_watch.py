@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from UFC_data_visualizations import CHARTS
+from watch import DependencyGraph, Watcher, JOIN_NODE, RANKINGS_NODE
+
+KEPT = ["flyweight_top15.csv", "heavyweight_top15.csv", "lightweight_top15.csv"]
+
+
+@pytest.fixture
+def watched(roster, rankings, tmp_path, capsys):
+    # Three divisions keep the chart rendering short
+    for file in os.listdir(roster):
+        if file not in KEPT:
+            os.remove(os.path.join(roster, file))
+    output = str(tmp_path / "charts")
+    watcher = Watcher(roster, rankings, output, models=False)
+    watcher.update()
+    return watcher
+
+
+def chart_files(division):
+    return {f"{division}{suffix}" for _, suffix in CHARTS.values()}
+
+
+def nodes(recomputed):
+    return [node for node, _ in recomputed]
+
+
+def test_downstream_follows_the_dependencies():
+    graph = DependencyGraph()
+    for name, dependencies in [("a", []), ("b", ["a"]), ("c", []), ("d", ["b", "c"]), ("e", ["c"])]:
+        graph.add(name, dependencies, lambda: None)
+    assert graph.downstream(["a"]) == ["a", "b", "d"]
+    assert graph.downstream(["c"]) == ["c", "d", "e"]
+    graph.remove("b")
+    assert graph.downstream(["a"]) == ["a"]
+
+
+def test_first_update_computes_everything(watched):
+    divisions = ["Flyweight", "Heavyweight", "Lightweight"]
+    assert set(watched.results) == {f"{division}/{step}" for division in divisions
+                                    for step in ("columns", "scores", "charts")} | {RANKINGS_NODE, JOIN_NODE}
+    with open(os.path.join(watched.output_folder, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert set(manifest) == set().union(*(chart_files(division) for division in divisions))
+    assert watched.update() == []
+
+
+def test_a_changed_file_recomputes_only_its_division(watched):
+    path = os.path.join(watched.folder, "flyweight_top15.csv")
+    others = {name: os.path.getmtime(os.path.join(watched.output_folder, name)) for name in chart_files("Heavyweight")}
+
+    # Touched without a change: nothing to do
+    os.utime(path, ns=(0, 0))
+    assert watched.update() == []
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n15,New Fighter,30,70,3.0,45%,3.0,55%,1.0,40%,60%,0.5,W(DEC)\n")
+    assert nodes(watched.update()) == ["Flyweight/columns", "Flyweight/scores", "Flyweight/charts", JOIN_NODE]
+    assert "New Fighter" in set(watched.results["Flyweight/scores"]["Fighter Name"])
+    assert {name: os.path.getmtime(os.path.join(watched.output_folder, name)) for name in others} == others
+
+
+def test_a_deleted_file_removes_its_charts(watched):
+    os.remove(os.path.join(watched.folder, "heavyweight_top15.csv"))
+    assert nodes(watched.update()) == [JOIN_NODE]
+    assert not [node for node in watched.graph.nodes if node.startswith("Heavyweight/")]
+
+    files = set(os.listdir(watched.output_folder))
+    assert not files & chart_files("Heavyweight")
+    assert chart_files("Flyweight") | chart_files("Lightweight") <= files
+    with open(os.path.join(watched.output_folder, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert set(manifest) == chart_files("Flyweight") | chart_files("Lightweight")
+
+    # Ranked heavyweights have no stats left to join
+    history = watched.history
+    heavyweight = [history.keys[code] == "Heavyweight" for code in history.columns["division"]]
+    assert any(heavyweight)
+    assert (watched.results[JOIN_NODE][heavyweight] == -1).all()
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import itertools
+
+import numpy as np
+import pytest
+
+from cross_division import load_cross_division
+from fighter_store import load_store, FEATURES
+from UFC_winning_margin import predict_matchup, predict_matchup_across_divisions, score_division, weight_vector
+from weight_fit import OBJECTIVES, fit_scoring_model, learned_weights, winner_loser_pairs
+
+
+def predictions(df, learned):
+    chances = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for fighter1, fighter2 in itertools.permutations(df["Fighter Name"], 2):
+            chances.append(predict_matchup(df, fighter1, fighter2, learned))
+    return np.array(chances)
+
+
+def test_hand_picked_weights_keep_the_score_ratio(roster):
+    df = score_division(load_store(roster).frame("Lightweight"))
+    scores = df.set_index("Fighter Name")["Performance Score"]
+    expected = [[scores[f1] / (scores[f1] + scores[f2]) * 100, scores[f2] / (scores[f1] + scores[f2]) * 100]
+                for f1, f2 in itertools.permutations(df["Fighter Name"], 2)]
+    np.testing.assert_allclose(predictions(df, learned=False), expected)
+
+
+@pytest.mark.parametrize("objective", OBJECTIVES)
+def test_learned_weights_give_valid_probabilities(roster, objective):
+    store = load_store(roster)
+    negative = 0
+    for division in store.divisions:
+        df = score_division(store.frame(division), learned_weights(store, division, objective))
+        negative += (df["Performance Score"] < 0).sum()
+        chances = predictions(df, learned=True)
+        assert ((chances >= 0) & (chances <= 100)).all()
+        np.testing.assert_allclose(chances.sum(axis=1), 100)
+    if objective == "pairwise":
+        # The score ratio would go outside [0, 100] for these
+        assert negative > 0
+
+
+def test_pairwise_chance_is_the_fitted_probability(roster):
+    store = load_store(roster)
+    df = store.frame("Welterweight")
+    X, y = df[FEATURES].to_numpy(dtype=float), df["Outcome"].to_numpy()
+    w, intercept = fit_scoring_model(X, y, "pairwise")
+    assert intercept is None
+
+    df = score_division(df, learned_weights(store, "Welterweight", "pairwise"))
+    winners, losers = winner_loser_pairs(df["Outcome"].to_numpy())
+    names = df["Fighter Name"].to_numpy()
+    first, second = names[winners[0]], names[losers[0]]
+    with contextlib.redirect_stdout(io.StringIO()):
+        chance, _ = predict_matchup(df, first, second, learned=True)
+    x1 = df.loc[df["Fighter Name"] == first, FEATURES].to_numpy(dtype=float)[0]
+    x2 = df.loc[df["Fighter Name"] == second, FEATURES].to_numpy(dtype=float)[0]
+    assert chance == pytest.approx(100 / (1 + np.exp(-(x1 - x2) @ w)))
+
+
+def test_learned_weights_are_cached(roster):
+    store = load_store(roster)
+    first = learned_weights(store, "Flyweight", "logistic")
+    assert learned_weights(store, "Flyweight", "logistic") == first
+    assert learned_weights(store, "Flyweight", "logistic", l2=1.0) != first
+
+
+@pytest.mark.parametrize("objective", OBJECTIVES)
+def test_cross_division_predictions_use_the_learned_weights(roster, objective, capsys):
+    store = load_store(roster)
+    cross = load_cross_division(store)
+    flyweight = list(store.frame("Flyweight")["Fighter Name"].head(2))
+    heavyweight = store.frame("Heavyweight")["Fighter Name"].iloc[0]
+
+    # Within a division they match predict_matchup with that division's weights
+    df = score_division(store.frame("Flyweight"), learned_weights(store, "Flyweight", objective))
+    np.testing.assert_allclose(predict_matchup_across_divisions(cross, *flyweight, learned=objective),
+                               predict_matchup(df, *flyweight, learned=True))
+
+    # Across divisions each side's chances are averaged over both divisions' weights
+    _, _, references = cross.matchup(flyweight[0], heavyweight)
+    expected = []
+    for division, (values1, values2) in references.items():
+        w = weight_vector(learned_weights(store, division, objective))
+        expected.append(100 / (1 + np.exp(values2 @ w - values1 @ w)))
+    chances = predict_matchup_across_divisions(cross, flyweight[0], heavyweight, learned=objective)
+    assert chances[0] == pytest.approx(np.mean(expected))
+    assert chances != pytest.approx(predict_matchup_across_divisions(cross, flyweight[0], heavyweight))
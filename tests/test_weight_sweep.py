@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.stats import rankdata, spearmanr
+
+from fighter_store import load_store
+from UFC_winning_margin import score_division, weight_vector
+from weight_sweep import feature_matrix, perturbed_weights, rank_matrix, sweep_weights
+
+
+def test_baseline_row_matches_performance_score(roster):
+    df = load_store(roster).frame("Lightweight")
+    W = perturbed_weights(8)
+    W[0] = weight_vector()
+    scores = W @ feature_matrix(df).T
+    scored = score_division(df.copy()).sort_index()
+    np.testing.assert_allclose(scores[0], scored["Performance Score"])
+
+
+def test_sweep_matches_one_weighting_at_a_time(roster):
+    df = load_store(roster).frame("Welterweight")
+    X = feature_matrix(df)
+    W = perturbed_weights(50, seed=7)
+    result = sweep_weights(df, W, chunk_size=16)
+
+    baseline = rankdata(-(X @ weight_vector()), method="ordinal")
+    for k, w in enumerate(W):
+        scores = X @ w
+        ranks = rankdata(-scores, method="ordinal")
+        np.testing.assert_array_equal(result["ranks"][k], ranks)
+        np.testing.assert_allclose(result["spearman"][k], spearmanr(ranks, baseline).statistic)
+
+    scores = W @ X.T
+    np.testing.assert_allclose(result["win_probability"],
+                               (scores[:, :, None] > scores[:, None, :]).mean(axis=0))
+    np.testing.assert_allclose(result["mean_win_chance"],
+                               (scores[:, :, None] / (scores[:, :, None] + scores[:, None, :]) * 100).mean(axis=0))
+
+    stability = result["stability"].set_index("Fighter Name")
+    ranks = result["ranks"]
+    names = df["Fighter Name"].to_numpy()
+    np.testing.assert_allclose(stability.loc[names, "Mean Rank"], ranks.mean(axis=0))
+    np.testing.assert_allclose(stability.loc[names, "Rank Std"], ranks.std(axis=0))
+    np.testing.assert_array_equal(stability.loc[names, "Worst Rank"], ranks.max(axis=0))
+
+
+def test_chunk_size_does_not_change_results(roster):
+    df = load_store(roster).frame("Flyweight")
+    W = perturbed_weights(100)
+    whole = sweep_weights(df, W, chunk_size=1000)
+    chunked = sweep_weights(df, W, chunk_size=7, keep_ranks=False)
+    assert chunked["ranks"] is None
+    for key in ("spearman", "win_probability", "mean_win_chance"):
+        np.testing.assert_allclose(chunked[key], whole[key])
+
+
+def test_rank_matrix_breaks_ties_by_position():
+    np.testing.assert_array_equal(rank_matrix(np.array([[1.0, 3.0, 3.0, 2.0]])), [[4, 1, 2, 3]])
@@ -0,0 +1,210 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store, formatted, FEATURES
+from UFC_winning_margin import WEIGHTS, weight_vector
+
+SOURCES = ["weighted", "rf", "gb"]
+MODES = ["bracket", "ladder"]
+
+# Normal quantile for the 95% confidence intervals
+Z_95 = 1.959963984540054
+
+
+def ratio_matrix(strengths):
+    """
+    Pairwise win probabilities from non-negative strengths, P[i, j] = s_i / (s_i + s_j).
+
+    This is the score-ratio rule of predict_matchup (and the normalization of
+    the model probabilities in predict_matchups). Pairs with no information
+    get an even chance.
+    """
+    strengths = np.clip(np.asarray(strengths, dtype=float), 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        P = strengths[:, None] / (strengths[:, None] + strengths[None, :])
+    P[~np.isfinite(P)] = 0.5
+    np.fill_diagonal(P, 0.5)
+    return P
+
+
+def win_probability_matrix(store, division, source="weighted", weights=WEIGHTS):
+    """
+    Return the N x N matrix of win probabilities for a division (in store row
+    order); P[i, j] is fighter i's chance of beating fighter j.
+
+    'weighted' uses the Performance Score, 'rf' and 'gb' the cached Random
+    Forest and Gradient Boosting models.
+    """
+    df = store.frame(division)
+    X = df[FEATURES].to_numpy(dtype=float)
+    if source == "weighted":
+        return ratio_matrix(X @ weight_vector(weights))
+    if source in ("rf", "gb"):
+        from UFC_non_linear_predictor import division_models
+
+        # Same row order as the store frame, with the rating columns if any
+        df, features, (rf_model, gb_model, scaler) = division_models(store, division)
+        model = rf_model if source == "rf" else gb_model
+        return ratio_matrix(model.predict_proba(scaler.transform(df[features].astype(float)))[:, 1])
+    raise ValueError(f"Unknown source '{source}'.")
+
+
+def _fight(rng, P, first, second):
+    """
+    Decide a batch of fights; a fighter facing a bye (-1) advances.
+    """
+    wins = rng.random(len(first)) < P[first, second]
+    winners = np.where(wins, first, second)
+    winners = np.where(second < 0, first, winners)
+    return np.where(first < 0, second, winners)
+
+
+def simulate_brackets(rng, P, simulations):
+    """
+    Run random single-elimination brackets over every fighter, padded with
+    byes to a power of two. Returns the winner of each bracket.
+    """
+    fighters = len(P)
+    size = 1 << max(fighters - 1, 0).bit_length()
+    slots = np.append(np.arange(fighters), np.full(size - fighters, -1))
+    alive = slots[np.argsort(rng.random((simulations, size)), axis=1)]
+    while alive.shape[1] > 1:
+        first, second = alive[:, 0::2].ravel(), alive[:, 1::2].ravel()
+        alive = _fight(rng, P, first, second).reshape(simulations, -1)
+    return alive[:, 0]
+
+
+def simulate_ladders(rng, P, simulations, champion, rank_order, n_fights=5, contenders=5):
+    """
+    Run title-eliminator ladders: before each of n_fights title fights, two of
+    the top `contenders` ranked fighters (other than the current champion)
+    meet in an eliminator and the winner fights for the belt. Returns the
+    champion after the last fight.
+    """
+    pool = np.asarray(rank_order)[:contenders + 1]
+    champions = np.full(simulations, champion)
+    for _ in range(n_fights):
+        keys = rng.random((simulations, len(pool)))
+        keys[pool[None, :] == champions[:, None]] = 2.0
+        picks = pool[np.argpartition(keys, 1, axis=1)[:, :2]]
+        challengers = _fight(rng, P, picks[:, 0], picks[:, 1])
+        champions = _fight(rng, P, champions, challengers)
+    return champions
+
+
+def run_chunk(task):
+    """
+    Simulate one chunk with its own random stream and count titles per fighter.
+    """
+    rng = np.random.default_rng(task["seed"])
+    if task["mode"] == "bracket":
+        winners = simulate_brackets(rng, task["P"], task["simulations"])
+    else:
+        winners = simulate_ladders(rng, task["P"], task["simulations"], task["champion"],
+                                   task["rank_order"], task["n_fights"], task["contenders"])
+    return np.bincount(winners, minlength=len(task["P"]))
+
+
+def simulate_titles(P, mode="bracket", simulations=1_000_000, chunk_size=100_000, seed=42, workers=1,
+                    champion=0, rank_order=None, n_fights=5, contenders=5):
+    """
+    Count how often each fighter ends up with the title over many simulations.
+
+    Simulations run in chunks of chunk_size, each with its own random stream
+    spawned from seed, so the counts are identical for any number of workers.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'.")
+    if rank_order is None:
+        rank_order = np.arange(len(P))
+
+    sizes = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [{
+        "P": P,
+        "mode": mode,
+        "simulations": size,
+        "seed": chunk_seed,
+        "champion": champion,
+        "rank_order": rank_order,
+        "n_fights": n_fights,
+        "contenders": contenders,
+    } for size, chunk_seed in zip(sizes, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        counts = [run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(run_chunk, tasks))
+    return np.sum(counts, axis=0)
+
+
+def wilson_interval(counts, total, z=Z_95):
+    """
+    Wilson score interval for a proportion; returns (low, high) arrays.
+    """
+    p = counts / total
+    denominator = 1 + z ** 2 / total
+    center = (p + z ** 2 / (2 * total)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / total + z ** 2 / (4 * total ** 2)) / denominator
+    return center - margin, center + margin
+
+
+def title_odds(store, division, source="weighted", mode="bracket", simulations=1_000_000,
+               chunk_size=100_000, seed=42, workers=1, n_fights=5, contenders=5):
+    """
+    Simulate a division and return each fighter's title odds with 95%
+    confidence intervals, sorted by odds.
+    """
+    df = store.frame(division)
+    P = win_probability_matrix(store, division, source)
+    rank_order = np.argsort(df["Rank"].to_numpy(), kind="stable")
+    counts = simulate_titles(P, mode, simulations, chunk_size, seed, workers,
+                             champion=rank_order[0], rank_order=rank_order,
+                             n_fights=n_fights, contenders=contenders)
+    low, high = wilson_interval(counts, simulations)
+    odds = pd.DataFrame({
+        "Rank": df["Rank"].to_numpy(),
+        "Fighter Name": df["Fighter Name"].to_numpy(),
+        "Titles": counts,
+        "Title Odds (%)": counts / simulations * 100,
+        "CI Low (%)": low * 100,
+        "CI High (%)": high * 100,
+    })
+    return odds.sort_values("Titles", ascending=False, kind="stable", ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate brackets or title ladders and report title odds.")
+    parser.add_argument("division", help="division name, e.g. Lightweight")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--source", choices=SOURCES, default="weighted", help="win probabilities to use")
+    parser.add_argument("--mode", choices=MODES, default="bracket")
+    parser.add_argument("--simulations", type=int, default=1_000_000)
+    parser.add_argument("--fights", type=int, default=5, help="title fights per ladder")
+    parser.add_argument("--contenders", type=int, default=5, help="ranked contenders eligible for eliminators")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="simulations per random stream")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0: all cores)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    store = load_store(args.folder)
+    division = args.division.capitalize()
+    if division not in store.divisions:
+        print("Division not found. Exiting.")
+        return
+
+    odds = title_odds(store, division, args.source, args.mode, args.simulations, args.chunk_size,
+                      args.seed, args.workers, args.fights, args.contenders)
+    odds = odds[odds["Titles"] > 0].drop(columns="Titles")
+    print(f"\n{division}: {args.simulations} simulated {args.mode}s ({args.source} probabilities)")
+    print(formatted(odds).to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
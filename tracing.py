@@ -0,0 +1,281 @@
+import argparse
+import atexit
+import contextlib
+import functools
+import glob
+import inspect
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+
+# Set UFC_TRACE to a file name (or 1 for trace.json) to trace any tool
+TRACE_ENV = "UFC_TRACE"
+TRACE_MEMORY_ENV = "UFC_TRACE_MEMORY"
+DEFAULT_TRACE_FILE = "trace.json"
+
+# Marks the process that owns the trace; other processes (pool workers, child
+# processes) write their spans to part files that the owner merges at exit
+_OWNER_ENV = "UFC_TRACE_OWNER"
+# Time origin of the owner, so spans of other processes line up with its own
+_ORIGIN_ENV = "UFC_TRACE_ORIGIN"
+PART_SUFFIX = ".part"
+
+_NULL_SPAN = contextlib.nullcontext()
+
+_enabled = False
+_memory = False
+_output = None
+_origin_ns = 0
+_events = []
+
+
+class _Span:
+    """
+    Times one stage and records it as a Chrome-trace complete event.
+    """
+
+    __slots__ = ("name", "args", "start", "allocated")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.allocated = tracemalloc.get_traced_memory()[0] if _memory else 0
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        args = dict(self.args)
+        if _memory:
+            args["alloc_delta_kb"] = round((tracemalloc.get_traced_memory()[0] - self.allocated) / 1024, 1)
+        _events.append({
+            "name": self.name,
+            "ph": "X",
+            "ts": (self.start - _origin_ns) / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+        return False
+
+
+def span(name, **args):
+    """
+    Context manager timing a stage; does nothing unless tracing is enabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """
+    Decorator recording every call of a function (or coroutine) as a span.
+    """
+    def decorate(function):
+        label = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await function(*args, **kwargs)
+                with _Span(label, {}):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(label, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enabled():
+    return _enabled
+
+
+def enable(output=DEFAULT_TRACE_FILE, memory=True):
+    """
+    Start recording spans; the trace is written to `output` at exit.
+
+    With memory, tracemalloc runs as well so every span records the change in
+    allocated memory (this slows allocation-heavy code down). Worker and child
+    processes started afterwards record their spans too, and they are merged
+    into the same trace.
+    """
+    _start(os.path.abspath(output), memory, time.perf_counter_ns())
+    os.environ[_OWNER_ENV] = str(os.getpid())
+    os.environ[TRACE_ENV] = _output
+    os.environ[TRACE_MEMORY_ENV] = "1" if memory else "0"
+    os.environ[_ORIGIN_ENV] = str(_origin_ns)
+    # Parts left behind by an interrupted run don't belong to this trace
+    for part in _part_files(_output):
+        with contextlib.suppress(OSError):
+            os.remove(part)
+
+
+def _start(output, memory, origin_ns):
+    global _enabled, _memory, _output, _origin_ns
+    if not _enabled:
+        atexit.register(write_trace)
+        _origin_ns = origin_ns
+    _enabled = True
+    _output = output
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _register_worker_exit():
+    # Pool workers leave through os._exit, which skips atexit handlers;
+    # multiprocessing runs its finalizers before that. A new process clears
+    # the finalizers before running its target, so they are registered again
+    # from an after-fork hook too.
+    util = sys.modules.get("multiprocessing.util")
+    if util is not None:
+        util.Finalize(None, write_trace, exitpriority=0)
+        util.register_after_fork(write_trace, lambda _: util.Finalize(None, write_trace, exitpriority=0))
+
+
+def _after_fork_in_child():
+    # Spans recorded before the fork belong to the parent
+    _events.clear()
+    if _enabled:
+        _register_worker_exit()
+
+
+def disable():
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def events():
+    return list(_events)
+
+
+def summary(trace_events=None):
+    """
+    Aggregate spans by name: calls, total / mean / max milliseconds and the
+    summed allocation delta. Sorted by total time.
+    """
+    rows = {}
+    for event in _events if trace_events is None else trace_events:
+        row = rows.setdefault(event["name"], {"name": event["name"], "calls": 0, "total_ms": 0.0,
+                                              "max_ms": 0.0, "alloc_delta_kb": None})
+        duration = event["dur"] / 1000
+        row["calls"] += 1
+        row["total_ms"] += duration
+        row["max_ms"] = max(row["max_ms"], duration)
+        if "alloc_delta_kb" in event.get("args", {}):
+            row["alloc_delta_kb"] = (row["alloc_delta_kb"] or 0.0) + event["args"]["alloc_delta_kb"]
+    for row in rows.values():
+        row["mean_ms"] = row["total_ms"] / row["calls"]
+    return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+
+def format_summary(rows):
+    """
+    Render summary rows as a text table.
+    """
+    lines = [f"{'Stage':<40}{'Calls':>8}{'Total (ms)':>14}{'Mean (ms)':>12}{'Max (ms)':>12}{'Alloc (KB)':>14}"]
+    lines.append("-" * len(lines[0]))
+    for row in rows:
+        alloc = "" if row["alloc_delta_kb"] is None else f"{row['alloc_delta_kb']:.1f}"
+        lines.append(f"{row['name'][:39]:<40}{row['calls']:>8}{row['total_ms']:>14.2f}"
+                     f"{row['mean_ms']:>12.3f}{row['max_ms']:>12.2f}{alloc:>14}")
+    return "\n".join(lines)
+
+
+def _part_files(path):
+    return sorted(glob.glob(glob.escape(path) + ".*" + PART_SUFFIX))
+
+
+def write_trace(path=None):
+    """
+    Write the recorded spans as a Chrome-trace JSON file (open it in
+    chrome://tracing or Perfetto) and print the summary table to stderr.
+
+    The owning process merges in the part files of its workers; any other
+    process writes its spans to a part file next to the trace.
+    """
+    path = path or _output
+    if not path:
+        return
+    if os.environ.get(_OWNER_ENV) != str(os.getpid()):
+        if _events:
+            with open(f"{path}.{os.getpid()}{PART_SUFFIX}", "w", encoding="utf-8") as f:
+                json.dump(_events, f)
+            _events.clear()
+        return
+
+    trace_events = list(_events)
+    for part in _part_files(path):
+        try:
+            with open(part, encoding="utf-8") as f:
+                trace_events.extend(json.load(f))
+            os.remove(part)
+        except (OSError, ValueError):
+            continue
+    if not trace_events:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+    processes = len({event["pid"] for event in trace_events})
+    print(f"\n{format_summary(summary(trace_events))}\nTrace with {len(trace_events)} spans "
+          f"from {processes} process(es) saved to '{path}'.", file=sys.stderr)
+
+
+def _enable_from_environment():
+    value = os.environ.get(TRACE_ENV, "")
+    if not value or value == "0":
+        return
+    output = DEFAULT_TRACE_FILE if value == "1" else value
+    memory = os.environ.get(TRACE_MEMORY_ENV, "1") != "0"
+    owner = os.environ.get(_OWNER_ENV)
+    if owner and owner != str(os.getpid()):
+        # A process started by a traced one (e.g. a spawned pool worker)
+        origin = os.environ.get(_ORIGIN_ENV)
+        _start(os.path.abspath(output), memory, int(origin) if origin else time.perf_counter_ns())
+        _register_worker_exit()
+        return
+    enable(output, memory)
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+_enable_from_environment()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a script with span tracing enabled.")
+    parser.add_argument("--output", default=DEFAULT_TRACE_FILE, help="Chrome-trace JSON file to write")
+    parser.add_argument("--no-memory", action="store_true", help="skip allocation tracking")
+    parser.add_argument("script", help="script to run, e.g. UFC_winning_margin.py")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the script")
+    args = parser.parse_args()
+
+    # The traced modules import `tracing`, not this __main__ copy
+    import tracing
+
+    tracing.enable(args.output, memory=not args.no_memory)
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    with tracing.span(os.path.basename(args.script)):
+        runpy.run_path(args.script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
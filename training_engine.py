@@ -0,0 +1,182 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store, FEATURES
+from UFC_non_linear_predictor import RF_PARAMS, GB_PARAMS
+
+# Label of the model trained on every division at once
+POOLED_DIVISION = "All"
+
+METRICS = ["Accuracy", "Balanced Accuracy", "F1", "ROC AUC"]
+
+
+def division_datasets(store, include_pooled=True):
+    """
+    Return {division: (X, y)} for every division, plus the pooled dataset.
+    """
+    datasets = {}
+    for division in store.divisions:
+        rows = store.division_slice(division)
+        X = np.column_stack([np.asarray(store.columns[f][rows], dtype=float) for f in FEATURES])
+        datasets[division] = (X, np.asarray(store.columns["Outcome"][rows]))
+    if include_pooled:
+        X = np.column_stack([np.asarray(store.columns[f], dtype=float) for f in FEATURES])
+        datasets[POOLED_DIVISION] = (X, np.asarray(store.columns["Outcome"]))
+    return datasets
+
+
+def cv_tasks(datasets, n_splits, n_repeats, random_state, tree_jobs):
+    """
+    Build one task per (division, repeat) with its fold indices precomputed.
+
+    The splits only depend on random_state, so every worker count sees the
+    same folds.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    tasks = []
+    for division, (X, y) in datasets.items():
+        # Each class needs at least one sample per fold
+        splits = min(n_splits, int(np.bincount(y, minlength=2).min()))
+        if splits < 2:
+            continue
+        for repeat in range(n_repeats):
+            folds = StratifiedKFold(n_splits=splits, shuffle=True, random_state=random_state + repeat)
+            tasks.append({
+                "division": division,
+                "repeat": repeat,
+                "X": X,
+                "y": y,
+                "folds": list(folds.split(X, y)),
+                "tree_jobs": tree_jobs,
+            })
+    return tasks
+
+
+def run_task(task):
+    """
+    Fit and score both models on every fold of one repeat.
+    """
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.metrics import accuracy_score, balanced_accuracy_score, f1_score, roc_auc_score
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = task["X"], task["y"]
+    scores = []
+    for fold, (train, test) in enumerate(task["folds"]):
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X[train])
+        X_test = scaler.transform(X[test])
+        models = {
+            "Random Forest": RandomForestClassifier(n_jobs=task["tree_jobs"], **RF_PARAMS),
+            "Gradient Boosting": GradientBoostingClassifier(**GB_PARAMS),
+        }
+        for name, model in models.items():
+            model.fit(X_train, y[train])
+            predicted = model.predict(X_test)
+            probability = model.predict_proba(X_test)[:, 1]
+            scores.append({
+                "Division": task["division"],
+                "Model": name,
+                "Repeat": task["repeat"],
+                "Fold": fold,
+                "Accuracy": accuracy_score(y[test], predicted),
+                "Balanced Accuracy": balanced_accuracy_score(y[test], predicted),
+                "F1": f1_score(y[test], predicted, zero_division=0),
+                "ROC AUC": roc_auc_score(y[test], probability),
+            })
+    return scores
+
+
+def evaluate_all(folder="ufc_stats", n_splits=3, n_repeats=10, workers=None, random_state=42,
+                 include_pooled=True):
+    """
+    Run repeated stratified k-fold CV for every division and the pooled model.
+
+    Returns (summary, fold_scores): summary has the mean and standard deviation
+    of each metric per division and model, fold_scores one row per fold.
+    Results are identical for any number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Give the random forest the cores the process pool leaves idle
+    tree_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+    store = load_store(folder)
+    datasets = division_datasets(store, include_pooled)
+    tasks = cv_tasks(datasets, n_splits, n_repeats, random_state, tree_jobs)
+
+    if workers == 1:
+        results = [run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_task, tasks))
+
+    fold_scores = pd.DataFrame([score for result in results for score in result])
+    grouped = fold_scores.groupby(["Division", "Model"], sort=False)[METRICS]
+    summary = grouped.mean().join(grouped.std(ddof=0), rsuffix=" Std")
+    summary.insert(0, "Folds", grouped.size())
+    summary.insert(0, "Rows", [len(datasets[division][1]) for division, _ in summary.index])
+    summary = summary[["Rows", "Folds"] + [c for m in METRICS for c in (m, f"{m} Std")]]
+    return summary.reset_index(), fold_scores
+
+
+def scaling_report(folder="ufc_stats", worker_counts=None, **kwargs):
+    """
+    Time evaluate_all for several worker counts and check the scores match.
+    """
+    cores = os.cpu_count() or 1
+    if worker_counts is None:
+        worker_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    rows = []
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        summary, _ = evaluate_all(folder, workers=workers, **kwargs)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = (elapsed, summary)
+        rows.append({
+            "Workers": workers,
+            "Cores": cores,
+            "Seconds": elapsed,
+            "Speedup": baseline[0] / elapsed,
+            "Efficiency": baseline[0] / elapsed / workers,
+            "Identical": summary[METRICS].equals(baseline[1][METRICS]),
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and evaluate models for every division.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--splits", type=int, default=3, help="folds per repeat")
+    parser.add_argument("--repeats", type=int, default=10, help="number of repeats")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the folds")
+    parser.add_argument("--no-pooled", action="store_true", help="skip the all-divisions model")
+    parser.add_argument("--scaling", action="store_true", help="report wall-clock scaling by worker count")
+    args = parser.parse_args()
+
+    options = {
+        "n_splits": args.splits,
+        "n_repeats": args.repeats,
+        "random_state": args.seed,
+        "include_pooled": not args.no_pooled,
+    }
+    pd.set_option("display.width", 200)
+    if args.scaling:
+        print(scaling_report(args.folder, **options).to_string(index=False))
+        return
+
+    summary, _ = evaluate_all(args.folder, workers=args.workers, **options)
+    print(summary.to_string(index=False, float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Subcommand -> (module whose main() runs it, description)
+COMMANDS = {
+    "stats-view": ("UFC_stats_view", "scatter plots, regressions and box plots across divisions"),
+    "fight-predictor": ("UFC_fight_predictor", "advantage-count matchup comparison"),
+    "winning-margin": ("UFC_winning_margin", "weighted-score rankings and matchup prediction"),
+    "ml-predictor": ("UFC_non_linear_predictor", "Random Forest / Gradient Boosting matchup prediction"),
+    "charts": ("UFC_data_visualizations", "division charts into the charts folder"),
+    "rankings": ("getRankings", "scrape the official rankings into ufcrankings.csv"),
+    "serve": ("prediction_service", "local HTTP/JSON prediction service"),
+    "batch": ("batch_predict", "predict a card of matchups from JSON lines"),
+    "titles": ("title_simulator", "Monte Carlo title odds for a division"),
+    "similar": ("similar_fighters", "statistically similar fighters"),
+    "ratings": ("ratings", "Elo and Glicko-2 ratings from a fight history"),
+    "cross": ("cross_division", "compare two fighters from any divisions"),
+    "rank-history": ("rank_history", "rank trajectories, recent movers and rankings joined to stats"),
+    "watch": ("watch", "recompute scores, models and charts when a division file changes"),
+    "compile-trees": ("compiled_trees", "compiled tree model latency benchmark"),
+    "train": ("training_engine", "cross-validated training for every division"),
+    "weight-sweep": ("weight_sweep", "ranking stability under random weightings"),
+    "weight-fit": ("weight_fit", "learn the weighted-score weights from outcomes"),
+    "models": ("model_cache", "list, warm or prune the model cache"),
+    "roster": ("synthetic_roster", "write a synthetic roster"),
+    "benchmark": ("benchmark_suite", "stage benchmarks on synthetic rosters"),
+    "trace": ("tracing", "run a script with span tracing"),
+}
+
+# Arguments that take each subcommand to its first prompt (or --help output)
+STARTUP_ARGS = {
+    "stats-view": [],
+    "fight-predictor": [],
+    "winning-margin": [],
+    "ml-predictor": [],
+    "charts": [],
+}
+
+HEAVY_MODULES = ["matplotlib", "seaborn", "statsmodels", "sklearn", "scipy", "aiohttp", "bs4"]
+
+LAUNCHER = os.path.abspath(__file__)
+
+
+def run_command(name, args):
+    """
+    Import the module behind a subcommand and run its main() with args.
+    """
+    module_name, _ = COMMANDS[name]
+    sys.argv = [f"{os.path.basename(sys.argv[0])} {name}"] + list(args)
+    importlib.import_module(module_name).main()
+
+
+def _first_output(command, import_time=False):
+    """
+    Start the launcher for a command and wait for its first output, which an
+    interactive tool only flushes when it asks for input.
+
+    Returns (seconds, stderr text).
+    """
+    env = dict(os.environ)
+    # Buffered stdout, so nothing arrives before the prompt's flush
+    env.pop("PYTHONUNBUFFERED", None)
+    python = [sys.executable] + (["-X", "importtime"] if import_time else [])
+    # A file rather than a pipe, so a long import log can't block the tool
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(python + [LAUNCHER, command] + STARTUP_ARGS.get(command, ["--help"]),
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                                   cwd=os.path.dirname(LAUNCHER), env=env)
+        os.read(process.stdout.fileno(), 1)
+        elapsed = time.perf_counter() - start
+        process.kill()
+        process.communicate()
+        stderr.seek(0)
+        return elapsed, stderr.read().decode("utf-8", "replace")
+
+
+def heavy_imports(import_log):
+    """
+    Return the heavy packages named in `python -X importtime` output.
+    """
+    imported = set()
+    for line in import_log.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            imported.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return [module for module in HEAVY_MODULES if module in imported]
+
+
+def startup_times(commands=None, repeats=5):
+    """
+    Measure time-to-first-prompt of each subcommand in fresh processes.
+
+    Interactive tools are timed to their first input prompt, the others to
+    their --help output. Returns one dict per command with the best and
+    median milliseconds and the heavy packages imported by then.
+    """
+    rows = []
+    for command in commands or COMMANDS:
+        times = [_first_output(command)[0] for _ in range(repeats)]
+        rows.append({
+            "command": command,
+            "best_ms": min(times) * 1000,
+            "median_ms": statistics.median(times) * 1000,
+            "heavy_imports": heavy_imports(_first_output(command, import_time=True)[1]),
+        })
+    return rows
+
+
+def startup_main(args):
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} startup",
+                                     description="Measure time-to-first-prompt for each subcommand.")
+    parser.add_argument("commands", nargs="*", metavar="COMMAND", help="subcommands to time (default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="launches per subcommand")
+    args = parser.parse_args(args)
+    unknown = [command for command in args.commands if command not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    print(f"{'Command':<18}{'Best (ms)':>11}{'Median (ms)':>13}  Heavy imports before the prompt")
+    for row in startup_times(args.commands, args.repeats):
+        print(f"{row['command']:<18}{row['best_ms']:>11.0f}{row['median_ms']:>13.0f}  "
+              f"{', '.join(row['heavy_imports']) or '-'}")
+
+
+def main():
+    listing = "\n".join(f"  {name:<17}{description}" for name, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description="Run any UFC Fight Predictor tool.",
+        epilog=f"commands:\n{listing}\n  {'startup':<17}time-to-first-prompt benchmark of the commands\n\n"
+               "Run '%(prog)s COMMAND --help' for the options of a command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=list(COMMANDS) + ["startup"], metavar="COMMAND")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments for the command")
+    args = parser.parse_args()
+
+    if args.command == "startup":
+        startup_main(args.args)
+    else:
+        run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import hashlib
+import os
+import time
+from datetime import datetime
+
+from fighter_store import load_store, division_name, DIVISION_SUFFIX
+from tracing import traced
+
+# Seconds between two scans of the watched files
+POLL_INTERVAL = 1.0
+
+# Steps recomputed for a division, in computation order
+DIVISION_STEPS = ["columns", "scores", "models", "charts"]
+
+RATINGS_NODE = "ratings/history"
+RANKINGS_NODE = "rankings/snapshot"
+JOIN_NODE = "rankings/join"
+
+
+class DependencyGraph:
+    """
+    Nodes with the nodes they depend on and the function computing them.
+
+    Nodes must be added after their dependencies, so the insertion order is
+    a valid computation order.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def add(self, name, dependencies, compute):
+        self.nodes[name] = (list(dependencies), compute)
+
+    def remove(self, name):
+        self.nodes.pop(name, None)
+
+    def downstream(self, names):
+        """
+        Return the given nodes and every node depending on them, in computation order.
+        """
+        affected = set(names)
+        for name, (dependencies, _) in self.nodes.items():
+            if any(dependency in affected for dependency in dependencies):
+                affected.add(name)
+        return [name for name in self.nodes if name in affected]
+
+    def compute(self, name):
+        return self.nodes[name][1]()
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class Watcher:
+    """
+    Keeps the derived results of every division up to date with its file.
+
+    The graph runs division file -> parsed columns -> performance scores ->
+    fitted models -> charts for each division, fight history -> ratings ->
+    every division's models, and rankings file -> rank history snapshot ->
+    rankings-to-stats join. A changed file only
+    recomputes the nodes downstream of it; results of other divisions are
+    left as they are.
+    """
+
+    def __init__(self, folder="ufc_stats", rankings="ufcrankings.csv", output_folder="charts",
+                 models=True, charts=True):
+        self.folder = folder
+        self.rankings = rankings
+        self.output_folder = output_folder
+        self.steps = [step for step in DIVISION_STEPS
+                      if (step != "models" or models) and (step != "charts" or charts)]
+        self.graph = DependencyGraph()
+        self.results = {}
+        self.signatures = {}
+        self.hashes = {}
+        self.dirty = set()
+        self.history = None
+        if "models" in self.steps:
+            self.graph.add(RATINGS_NODE, [], self._ratings)
+
+    @property
+    def history_file(self):
+        from ratings import HISTORY_FILE
+
+        return os.path.join(self.folder, HISTORY_FILE)
+
+    def scan(self):
+        """
+        Return the watched files whose content changed since the last scan.
+
+        Files are hashed only when their size or modification time moved.
+        """
+        paths = [os.path.join(self.folder, f) for f in sorted(os.listdir(self.folder)) if f.endswith(DIVISION_SUFFIX)]
+        if os.path.exists(self.history_file):
+            paths.append(self.history_file)
+        if os.path.exists(self.rankings):
+            paths.append(self.rankings)
+        changed = []
+        for path in paths:
+            signature = file_signature(path)
+            if signature is None or signature == self.signatures.get(path):
+                continue
+            self.signatures[path] = signature
+            digest = file_hash(path)
+            if digest != self.hashes.get(path):
+                self.hashes[path] = digest
+                changed.append(path)
+        for path in [path for path in self.signatures if path not in paths]:
+            del self.signatures[path]
+            self.hashes.pop(path, None)
+            changed.append(path)
+        return changed
+
+    def sources(self, changed):
+        """
+        Turn changed files into the source nodes to recompute, adding and
+        removing division nodes for new and deleted files. A deleted file's
+        rendered charts and their manifest entries are deleted too.
+        """
+        nodes = []
+        divisions_changed = False
+        for path in changed:
+            if os.path.abspath(path) == os.path.abspath(self.rankings):
+                if os.path.exists(path):
+                    self._add_rankings()
+                    nodes.append(RANKINGS_NODE)
+                continue
+            if os.path.abspath(path) == os.path.abspath(self.history_file):
+                if RATINGS_NODE in self.graph.nodes:
+                    nodes.append(RATINGS_NODE)
+                continue
+            division = division_name(path)
+            if path in self.signatures:
+                if f"{division}/columns" not in self.graph.nodes:
+                    self._add_division(division)
+                    divisions_changed = True
+                nodes.append(f"{division}/columns")
+            else:
+                for step in self.steps:
+                    self.graph.remove(f"{division}/{step}")
+                    self.results.pop(f"{division}/{step}", None)
+                if "charts" in self.steps:
+                    self._remove_charts(division)
+                log(f"{division}/*", "removed")
+                divisions_changed = True
+        if divisions_changed and RANKINGS_NODE in self.graph.nodes:
+            # The join depends on every division; re-add it after them
+            self._add_join()
+            nodes.append(JOIN_NODE)
+        return nodes
+
+    @traced("watch_update")
+    def update(self):
+        """
+        Recompute what the changes since the last update affect.
+
+        Returns the list of (node, seconds) that were recomputed. A node that
+        fails is logged and retried, with everything after it, on the next update.
+        """
+        nodes = self.sources(self.scan()) + sorted(self.dirty)
+        recomputed = []
+        failed = set()
+        for node in self.graph.downstream(nodes):
+            if any(dependency in failed for dependency in self.graph.nodes[node][0]):
+                failed.add(node)
+                continue
+            start = time.perf_counter()
+            try:
+                self.results[node] = self.graph.compute(node)
+            except Exception as error:
+                log(node, f"failed: {error}")
+                failed.add(node)
+                continue
+            elapsed = time.perf_counter() - start
+            recomputed.append((node, elapsed))
+            log(node, f"recomputed in {elapsed * 1000:.1f} ms")
+        self.dirty = {node for node in failed if node in self.graph.nodes}
+        return recomputed
+
+    def watch(self, interval=POLL_INTERVAL):
+        """
+        Update whenever a watched file changes, until interrupted.
+        """
+        print(f"Watching '{self.folder}' and '{self.rankings}' (Ctrl+C to stop).")
+        try:
+            while True:
+                start = time.perf_counter()
+                recomputed = self.update()
+                if recomputed:
+                    divisions = sorted({node.split("/")[0] for node, _ in recomputed})
+                    print(f"{len(recomputed)} node(s) recomputed for {', '.join(divisions)} "
+                          f"in {(time.perf_counter() - start) * 1000:.1f} ms.")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+
+    def _add_division(self, division):
+        compute = {
+            "columns": lambda: self._columns(division),
+            "scores": lambda: self._scores(division),
+            "models": lambda: self._models(division),
+            "charts": lambda: self._charts(division),
+        }
+        # Scores, models and charts are each derived from the parsed columns;
+        # the models also use the ratings
+        for step in self.steps:
+            dependencies = [] if step == "columns" else [f"{division}/columns"]
+            if step == "models":
+                dependencies.append(RATINGS_NODE)
+            self.graph.add(f"{division}/{step}", dependencies, compute[step])
+
+    def _add_rankings(self):
+        if RANKINGS_NODE not in self.graph.nodes:
+            self.graph.add(RANKINGS_NODE, [], self._snapshot)
+            self._add_join()
+
+    def _add_join(self):
+        self.graph.remove(JOIN_NODE)
+        columns = [node for node in self.graph.nodes if node.endswith("/columns")]
+        self.graph.add(JOIN_NODE, [RANKINGS_NODE] + columns, self._join)
+
+    def _columns(self, division):
+        # Only files whose content changed are parsed again
+        store = load_store(self.folder)
+        return store.division_hash(division)
+
+    def _scores(self, division):
+        from UFC_winning_margin import score_division
+
+        return score_division(load_store(self.folder).frame(division))
+
+    def _ratings(self):
+        from ratings import load_ratings
+
+        ratings = load_ratings(self.folder)
+        return None if ratings is None else ratings.fingerprint
+
+    def _models(self, division):
+        from UFC_non_linear_predictor import division_models
+
+        return division_models(load_store(self.folder), division)[2]
+
+    def _charts(self, division):
+        from UFC_data_visualizations import render_all_divisions
+
+        return render_all_divisions(self.folder, self.output_folder, workers=1, divisions=[division])
+
+    def _remove_charts(self, division):
+        from UFC_data_visualizations import remove_division_charts
+
+        remove_division_charts(division, self.output_folder)
+
+    def _snapshot(self):
+        from rank_history import RankHistory, history_folder
+
+        if self.history is None:
+            self.history = RankHistory(history_folder(self.rankings))
+        self.history.record(self.rankings)
+        return len(self.history.snapshots)
+
+    def _join(self):
+        return self.history.join(load_store(self.folder))
+
+
+def log(node, message):
+    print(f"[{datetime.now():%H:%M:%S}] {node:<28}{message}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch the division files and rankings, recomputing only what a change affects.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--rankings", default="ufcrankings.csv", help="rankings csv file")
+    parser.add_argument("--output", default="charts", help="chart output folder")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between scans")
+    parser.add_argument("--no-models", action="store_true", help="don't fit models")
+    parser.add_argument("--no-charts", action="store_true", help="don't render charts")
+    parser.add_argument("--once", action="store_true", help="bring everything up to date and exit")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"The folder '{args.folder}' does not exist.")
+        return
+
+    watcher = Watcher(args.folder, args.rankings, args.output,
+                      models=not args.no_models, charts=not args.no_charts)
+    if args.once:
+        recomputed = watcher.update()
+        print(f"{len(recomputed)} node(s) recomputed in {sum(seconds for _, seconds in recomputed) * 1000:.1f} ms.")
+        return
+    watcher.watch(args.interval)
+
+
+if __name__ == "__main__":
+    main()
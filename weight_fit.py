@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store, FEATURES, CACHE_FOLDER
+from UFC_winning_margin import WEIGHTS, weight_vector
+
+OBJECTIVES = ["pairwise", "logistic"]
+
+# Strength of the pull towards the hand-picked weights (in standardized units).
+# With ~16 fighters per division a strong pull generalizes best.
+DEFAULT_L2 = 10.0
+
+LEARNED_WEIGHTS_FILE = "learned_weights.json"
+
+
+def _sigmoid(values):
+    return 0.5 * (1.0 + np.tanh(0.5 * values))
+
+
+def newton_logistic(A, targets, prior, penalty, tolerance=1e-10, max_iterations=50):
+    """
+    Minimize the L2-regularized logistic loss with Newton's method.
+
+    loss(u) = sum(log(1 + exp(-s * A @ u))) + sum(penalty / 2 * (u - prior)^2),
+    with s = +1 / -1 for targets 1 / 0. Gradient and Hessian are analytic, so
+    a problem with a dozen parameters converges in a handful of iterations.
+    """
+    u = prior.astype(float).copy()
+    penalty = np.broadcast_to(np.asarray(penalty, dtype=float), u.shape)
+    for _ in range(max_iterations):
+        p = _sigmoid(A @ u)
+        gradient = A.T @ (p - targets) + penalty * (u - prior)
+        hessian = (A.T * (p * (1 - p))) @ A + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        u -= step
+        if np.abs(step).max() < tolerance:
+            break
+    return u
+
+
+def winner_loser_pairs(y):
+    """
+    Return index arrays (winners, losers) for every win/loss pair of fighters.
+    """
+    winners = np.flatnonzero(y == 1)
+    losers = np.flatnonzero(y == 0)
+    return np.repeat(winners, len(losers)), np.tile(losers, len(winners))
+
+
+def fit_weights(X, y, objective="pairwise", l2=DEFAULT_L2, prior_weights=WEIGHTS):
+    """
+    Learn a weight vector (FEATURES order) from fighter features and outcomes.
+
+    'pairwise' fits P(i beats j) = sigmoid(w . (x_i - x_j)) over every
+    winner/loser pair; 'logistic' fits P(win) = sigmoid(w . x + b). Features
+    are standardized for the fit and the weights are regularized towards the
+    hand-picked ones (l2 sets how strongly), so the learned weights can replace
+    them in the Performance Score directly.
+    """
+    return fit_scoring_model(X, y, objective, l2, prior_weights)[0]
+
+
+def fit_scoring_model(X, y, objective="pairwise", l2=DEFAULT_L2, prior_weights=WEIGHTS):
+    """
+    Same as fit_weights, but returns (weights, intercept) where the intercept
+    turns w . x into a win logit ('logistic' only; None for 'pairwise').
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+    prior = weight_vector(prior_weights) * scale
+
+    if objective == "pairwise":
+        winners, losers = winner_loser_pairs(y)
+        A = (X[winners] - X[losers]) / scale
+        u = newton_logistic(A, np.ones(len(A)), prior, np.full(len(prior), l2))
+        return u / scale, None
+    if objective == "logistic":
+        mean = X.mean(axis=0)
+        A = np.column_stack([(X - mean) / scale, np.ones(len(X))])
+        # The intercept is effectively unregularized
+        penalty = np.append(np.full(len(prior), l2), 1e-8)
+        u = newton_logistic(A, y.astype(float), np.append(prior, 0.0), penalty)
+        weights = u[:-1] / scale
+        return weights, u[-1] - weights @ mean
+    raise ValueError(f"Unknown objective '{objective}'.")
+
+
+def as_weights(vector):
+    """
+    Turn a weight vector in FEATURES order into a weights dict.
+    """
+    return {column: float(value) for column, value in zip(FEATURES, vector)}
+
+
+def learned_weights(store, division, objective="pairwise", l2=DEFAULT_L2):
+    """
+    Return learned weights for a division as a dict, fitting them on a cache miss.
+
+    Weights are cached per division in the store's cache folder and refit when
+    the division's data or the fit settings change.
+    """
+    path = os.path.join(store.folder, CACHE_FOLDER, LEARNED_WEIGHTS_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    config = {"objective": objective, "l2": l2, "prior": WEIGHTS}
+    cache_key = f"{division}:{objective}"
+    entry = cache.get(cache_key)
+    if entry and entry["data_sha1"] == store.division_hash(division) and entry["config"] == config:
+        return entry["weights"]
+
+    rows = store.division_slice(division)
+    X = np.column_stack([np.asarray(store.columns[f][rows], dtype=float) for f in FEATURES])
+    y = np.asarray(store.columns["Outcome"][rows])
+    weights = as_weights(fit_weights(X, y, objective, l2))
+
+    cache[cache_key] = {"data_sha1": store.division_hash(division), "config": config, "weights": weights}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+    return weights
+
+
+def benchmark(folder="ufc_stats", n_splits=3, n_repeats=5, random_state=42):
+    """
+    Compare fit time and held-out quality of the learned weights against the
+    hand-picked weights and the sklearn models of UFC_non_linear_predictor.
+
+    Uses the same repeated stratified folds as training_engine. ROC AUC is
+    computed from each model's scores; accuracy only where a model predicts
+    outcomes directly.
+    """
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.metrics import roc_auc_score, accuracy_score
+    from sklearn.preprocessing import StandardScaler
+    from training_engine import division_datasets, cv_tasks
+    from UFC_non_linear_predictor import RF_PARAMS, GB_PARAMS
+
+    store = load_store(folder)
+    tasks = cv_tasks(division_datasets(store), n_splits, n_repeats, random_state, tree_jobs=1)
+
+    rows = []
+    for task in tasks:
+        X, y = task["X"], task["y"]
+        for train, test in task["folds"]:
+            fits = {}
+
+            fits["Hand-picked weights"] = (X[test] @ weight_vector(), None, 0.0)
+
+            for objective in OBJECTIVES:
+                start = time.perf_counter()
+                w, intercept = fit_scoring_model(X[train], y[train], objective)
+                elapsed = time.perf_counter() - start
+                scores = X[test] @ w
+                predicted = None if intercept is None else (scores + intercept > 0).astype(int)
+                fits[f"Learned weights ({objective})"] = (scores, predicted, elapsed)
+
+            for name, model in (("Random Forest", RandomForestClassifier(**RF_PARAMS)),
+                                ("Gradient Boosting", GradientBoostingClassifier(**GB_PARAMS))):
+                start = time.perf_counter()
+                scaler = StandardScaler().fit(X[train])
+                model.fit(scaler.transform(X[train]), y[train])
+                elapsed = time.perf_counter() - start
+                X_test = scaler.transform(X[test])
+                fits[name] = (model.predict_proba(X_test)[:, 1], model.predict(X_test), elapsed)
+
+            for name, (scores, predicted, elapsed) in fits.items():
+                rows.append({
+                    "Division": task["division"],
+                    "Model": name,
+                    "Fit (ms)": elapsed * 1000,
+                    "ROC AUC": roc_auc_score(y[test], scores),
+                    "Accuracy": np.nan if predicted is None else accuracy_score(y[test], predicted),
+                })
+
+    results = pd.DataFrame(rows)
+    return results.groupby("Model", sort=False)[["Fit (ms)", "ROC AUC", "Accuracy"]].mean().reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn weighted-score weights from fight outcomes.")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="pairwise")
+    parser.add_argument("--l2", type=float, default=DEFAULT_L2, help="pull towards the hand-picked weights")
+    parser.add_argument("--benchmark", action="store_true", help="compare against the sklearn models")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 200)
+    if args.benchmark:
+        print(benchmark(args.folder).to_string(index=False, float_format="{:.3f}".format))
+        return
+
+    store = load_store(args.folder)
+    start = time.perf_counter()
+    table = {division: learned_weights(store, division, args.objective, args.l2) for division in store.divisions}
+    elapsed = (time.perf_counter() - start) * 1000
+    table["Hand-picked"] = WEIGHTS
+    print(pd.DataFrame(table).T.to_string(float_format="{:.3f}".format))
+    print(f"\nLearned weights for {len(store.divisions)} divisions in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from fighter_store import load_store, FEATURES
+from UFC_winning_margin import WEIGHTS, weight_vector
+
+
+def feature_matrix(df):
+    """
+    Return the N x 10 feature matrix of a division frame in FEATURES order.
+    """
+    return df[FEATURES].to_numpy(dtype=float)
+
+
+def perturbed_weights(count, spread=0.25, seed=42, weights=WEIGHTS):
+    """
+    Draw `count` candidate weightings around the hand-picked weights.
+
+    Every weight is scaled by a log-normal factor, so signs are preserved.
+    Returns a count x 10 matrix in FEATURES order.
+    """
+    rng = np.random.default_rng(seed)
+    base = weight_vector(weights)
+    return base * np.exp(rng.normal(0.0, spread, size=(count, len(base))))
+
+
+def score_matrix(X, W):
+    """
+    Score every fighter under every weighting: (K x 10) @ (10 x N) -> K x N.
+    """
+    return W @ X.T
+
+
+def rank_matrix(scores):
+    """
+    Rank fighters within each weighting (1 = best score), K x N.
+    """
+    order = np.argsort(-scores, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1), axis=1)
+    return ranks
+
+
+def win_chance_tensor(scores):
+    """
+    Pairwise win chances under every weighting, K x N x N.
+
+    chances[k, i, j] is fighter i's chance against fighter j, using the same
+    score-ratio rule as predict_matchup.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return scores[:, :, None] / (scores[:, :, None] + scores[:, None, :]) * 100
+
+
+def iter_sweep(X, W, chunk_size=1024):
+    """
+    Yield (start, scores, ranks) for consecutive chunks of weightings.
+    """
+    for start in range(0, len(W), chunk_size):
+        scores = score_matrix(X, W[start:start + chunk_size])
+        yield start, scores, rank_matrix(scores)
+
+
+def sweep_weights(df, W, chunk_size=1024, keep_ranks=True, baseline=WEIGHTS):
+    """
+    Score a division under every row of the weight matrix W.
+
+    Memory stays bounded by chunk_size; only the K x N rank matrix (when
+    keep_ranks is set) and per-weighting statistics grow with K. Returns a
+    dict with:
+      'ranks'            K x N rank vectors (or None)
+      'spearman'         rank correlation of each weighting with the baseline
+      'stability'        per-fighter rank statistics
+      'win_probability'  N x N share of weightings where i outscores j
+      'mean_win_chance'  N x N average pairwise win chance (%)
+    """
+    X = feature_matrix(df)
+    count, fighters = len(W), len(X)
+    baseline_ranks = rank_matrix(score_matrix(X, weight_vector(baseline)[None, :]))[0]
+
+    ranks_out = np.empty((count, fighters), dtype=np.int32) if keep_ranks else None
+    spearman = np.empty(count)
+    rank_sum = np.zeros(fighters)
+    rank_square_sum = np.zeros(fighters)
+    best_rank = np.full(fighters, fighters)
+    worst_rank = np.zeros(fighters, dtype=np.int64)
+    top_count = np.zeros(fighters, dtype=np.int64)
+    beats = np.zeros((fighters, fighters))
+    chance_sum = np.zeros((fighters, fighters))
+
+    for start, scores, ranks in iter_sweep(X, W, chunk_size):
+        stop = start + len(scores)
+        if keep_ranks:
+            ranks_out[start:stop] = ranks
+        difference = (ranks - baseline_ranks).astype(float)
+        spearman[start:stop] = 1 - 6 * (difference ** 2).sum(axis=1) / (fighters * (fighters ** 2 - 1))
+
+        rank_sum += ranks.sum(axis=0)
+        rank_square_sum += (ranks.astype(float) ** 2).sum(axis=0)
+        best_rank = np.minimum(best_rank, ranks.min(axis=0))
+        worst_rank = np.maximum(worst_rank, ranks.max(axis=0))
+        top_count += (ranks == 1).sum(axis=0)
+        beats += (scores[:, :, None] > scores[:, None, :]).sum(axis=0)
+        chance_sum += np.nansum(win_chance_tensor(scores), axis=0)
+
+    mean_rank = rank_sum / count
+    stability = pd.DataFrame({
+        "Fighter Name": df["Fighter Name"].to_numpy(),
+        "Baseline Rank": baseline_ranks,
+        "Mean Rank": mean_rank,
+        "Rank Std": np.sqrt(np.maximum(rank_square_sum / count - mean_rank ** 2, 0)),
+        "Best Rank": best_rank,
+        "Worst Rank": worst_rank,
+        "Top Share (%)": top_count / count * 100,
+    }).sort_values("Mean Rank", ignore_index=True)
+
+    return {
+        "ranks": ranks_out,
+        "spearman": spearman,
+        "stability": stability,
+        "win_probability": beats / count,
+        "mean_win_chance": chance_sum / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test how stable weighted rankings are across many weightings.")
+    parser.add_argument("division", help="division name, e.g. Lightweight")
+    parser.add_argument("--folder", default="ufc_stats", help="folder containing division CSV files")
+    parser.add_argument("--count", type=int, default=10000, help="number of candidate weightings")
+    parser.add_argument("--spread", type=float, default=0.25, help="log-normal spread around the default weights")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="weightings scored per chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    store = load_store(args.folder)
+    division = args.division.capitalize()
+    if division not in store.divisions:
+        print("Division not found. Exiting.")
+        return
+
+    W = perturbed_weights(args.count, args.spread, args.seed)
+    result = sweep_weights(store.frame(division), W, args.chunk_size, keep_ranks=False)
+    spearman = result["spearman"]
+    print(f"\n{division}: {args.count} weightings (spread {args.spread})")
+    print(f"Rank correlation with the default weights: mean {spearman.mean():.3f}, "
+          f"5th percentile {np.percentile(spearman, 5):.3f}")
+    print(result["stability"].to_string(index=False, float_format="{:.2f}".format))
+
+
+if __name__ == "__main__":
+    main()